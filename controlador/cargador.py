@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from controlador.gestor_pacientes import GestorPacientes
+from controlador.gestor_medicos import GestorMedicos
+from controlador.gestor_especialidades import GestorEspecialidades
+from controlador.gestor_citas import GestorCitas
+from controlador.gestor_diagnosticos import GestorDiagnosticos
+
+
+def cargar_gestores(max_hilos: int = 5) -> tuple:
+    """
+    Crea y carga los gestores de pacientes, médicos, especialidades, citas y diagnósticos.
+
+    Los diagnósticos no se leen aquí: como al crear un GestorDiagnosticos por separado, se cargan la
+    primera vez que se consultan, así que el historial de citas con diagnóstico tampoco se carga.
+
+    La carga se hace en tres fases:
+        1. lectura: los cuatro archivos se leen y decodifican a la vez, cada uno en un hilo.
+        2. construccion: se crean los pacientes y las especialidades (no dependen de nadie) y después
+           los médicos (que apuntan a las especialidades).
+        3. enlace: se crean las citas, enlazadas con pacientes y médicos.
+
+        Args:
+            max_hilos (int): Número máximo de hilos para la lectura.
+
+        Returns:
+            tuple: (gestores, tiempos), donde gestores es un diccionario nombre -> gestor con las claves
+                   'pacientes', 'medicos', 'especialidades', 'citas' y 'diagnosticos', y tiempos es un
+                   diccionario fase -> segundos (incluye 'lectura:<nombre>' para cada archivo y 'total').
+    """
+    inicio = time.perf_counter()
+    tiempos = {}
+
+    gestor_pacientes = GestorPacientes(cargar=False)
+    gestor_especialidades = GestorEspecialidades(cargar=False)
+    gestor_medicos = GestorMedicos(gestor_especialidades, cargar=False)
+    gestor_citas = GestorCitas(gestor_pacientes, gestor_medicos, cargar=False)
+    gestor_diagnosticos = GestorDiagnosticos(gestor_citas)
+    gestores = {
+        'pacientes': gestor_pacientes,
+        'medicos': gestor_medicos,
+        'especialidades': gestor_especialidades,
+        'citas': gestor_citas,
+        'diagnosticos': gestor_diagnosticos,
+    }
+
+    def leer(nombre):
+        inicio_lectura = time.perf_counter()
+        datos = gestores[nombre].leer_datos()
+        return nombre, datos, time.perf_counter() - inicio_lectura
+
+    # Fase 1: lectura y decodificación en paralelo
+    fase = time.perf_counter()
+    datos = {}
+    with ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="carga") as ejecutor:
+        for nombre, datos_leidos, segundos in ejecutor.map(leer, ('pacientes', 'especialidades', 'medicos',
+                                                                  'citas')):
+            datos[nombre] = datos_leidos
+            tiempos[f'lectura:{nombre}'] = segundos
+    tiempos['lectura'] = time.perf_counter() - fase
+
+    # Fase 2: pacientes y especialidades, y los médicos con el objeto compartido de su especialidad
+    fase = time.perf_counter()
+    for nombre in ('pacientes', 'especialidades', 'medicos'):
+        gestores[nombre].cargar_desde_datos(datos[nombre])
+    tiempos['construccion'] = time.perf_counter() - fase
+
+    # Fase 3: enlazar citas -> paciente/médico
+    fase = time.perf_counter()
+    gestor_citas.cargar_desde_datos(datos['citas'])
+    tiempos['enlace'] = time.perf_counter() - fase
+
+    tiempos['total'] = time.perf_counter() - inicio
+    return gestores, tiempos
+
+def informe_tiempos(tiempos: dict) -> str:
+    """
+    Da formato a los tiempos devueltos por `cargar_gestores`.
+
+        Args:
+            tiempos (dict): Diccionario fase -> segundos.
+
+        Returns:
+            str: Una línea por fase con su duración en milisegundos.
+    """
+    return "\n".join(f"{fase}: {segundos * 1000:.1f} ms" for fase, segundos in tiempos.items())
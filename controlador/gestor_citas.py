@@ -1,27 +1,353 @@
+import heapq
 import json
+from bisect import bisect_left, bisect_right
+from datetime import datetime
 from modelo.cita import Cita
 from pathlib import Path
 from utils.validaciones import validar_fecha_citas, generar_id, validar_hora
-from shutil import copyfile
+from utils.eventos import CITA_AGENDADA, CITA_CANCELADA, CITA_COMPLETADA, CITA_REAGENDADA
+from controlador.gestor_persistente import GestorPersistente
+from utils.persistencia import ConflictoEscritura
+from utils.paginacion import Pagina, paginar, clave_id, clave_fecha
+from utils.instrumentacion import instrumentada
 
-class GestorCitas:
+# Meses completos anteriores al actual cuyas citas se mantienen en el archivo principal
+MESES_RECIENTES = 3
+
+# Mayor que cualquier hora: (fecha, FIN_DEL_DIA) queda después de todas las citas de esa fecha en el índice de fechas
+FIN_DEL_DIA = "\uffff"
+
+
+class CursorCitas:
+    """
+    Resultado de una consulta de citas que se recorre por páginas.
+
+    Las citas se obtienen del iterador de origen solo a medida que se piden páginas, de modo que
+    mostrar la primera página no requiere recorrer todas las citas que cumplen la consulta.
+
+        Attributes:
+            _origen (iterator): Iterador de citas que cumplen la consulta.
+            _obtenidas (list): Citas ya extraídas del iterador.
+            _agotado (bool): Indica si el iterador ya no tiene más citas.
+    """
+
+    def __init__(self, citas):
+        """
+        Inicializa el cursor.
+
+            Args:
+                citas (iterable): Citas que cumplen la consulta (puede ser un generador).
+        """
+        self._origen = iter(citas)
+        self._obtenidas = []
+        self._agotado = False
+
+    def _obtener_hasta(self, cantidad: int):
+        """
+        Extrae citas del origen hasta tener `cantidad` citas obtenidas o agotarlo.
+        """
+        while not self._agotado and len(self._obtenidas) < cantidad:
+            try:
+                self._obtenidas.append(next(self._origen))
+            except StopIteration:
+                self._agotado = True
+
+    def pagina(self, numero: int, tamano: int) -> list:
+        """
+        Devuelve las citas de una página.
+
+            Args:
+                numero (int): Número de página, empezando en 0.
+                tamano (int): Cantidad de citas por página.
+
+            Returns:
+                list: Citas de la página (vacía si no existe).
+        """
+        inicio = numero * tamano
+        self._obtener_hasta(inicio + tamano)
+        return self._obtenidas[inicio:inicio + tamano]
+
+    def hay_pagina(self, numero: int, tamano: int) -> bool:
+        """
+        Indica si existe al menos una cita en la página indicada.
+
+            Args:
+                numero (int): Número de página, empezando en 0.
+                tamano (int): Cantidad de citas por página.
+
+            Returns:
+                bool: True si la página tiene citas.
+        """
+        self._obtener_hasta(numero * tamano + 1)
+        return len(self._obtenidas) > numero * tamano
+
+
+class ConsultaCitas:
+    """
+    Consulta de citas que se arma encadenando filtros, por ejemplo:
+
+        gestor.consulta().medico("MED001").estado("pendiente").fechas("01/06/2026", "30/06/2026").ordenar("fecha")
+
+    Los filtros que reciben None se ignoran, para poder pasar directamente los valores de un formulario.
+    La consulta la resuelve el gestor con sus índices (ver `GestorCitas.ejecutar_consulta`).
+
+        Attributes:
+            _gestor (GestorCitas): Gestor sobre el que se consulta.
+            _filtros (dict): Campo indexado ('paciente', 'medico', 'especialidad', 'estado') -> valor buscado.
+            _rango_fechas (tuple): (desde, hasta) como claves AAAA/MM/DD, o None si no se filtra por fecha.
+            _rango_horas (tuple): (desde, hasta) en formato HH:MM, o None si no se filtra por hora.
+            _orden (str): Orden del resultado (ver `GestorCitas.ordenes_pagina`), o None para el orden por ID.
+            _limite (int): Máximo de citas del resultado, o None para todas.
+            _incluir_historial (bool): Si es True, se consultan también las citas archivadas.
+    """
+
+    def __init__(self, gestor):
+        """
+        Inicializa una consulta sin filtros.
+
+            Args:
+                gestor (GestorCitas): Gestor sobre el que se consulta.
+        """
+        self._gestor = gestor
+        self._filtros = {}
+        self._rango_fechas = None
+        self._rango_horas = None
+        self._orden = None
+        self._limite = None
+        self._incluir_historial = False
+
+    def _filtrar(self, campo: str, valor):
+        """
+        Agrega un filtro de igualdad sobre un campo indexado.
+        """
+        if valor is not None:
+            self._filtros[campo] = valor
+        return self
+
+    def paciente(self, id_paciente: str):
+        """
+        Filtra por el ID del paciente.
+        """
+        return self._filtrar('paciente', id_paciente)
+
+    def medico(self, id_medico: str):
+        """
+        Filtra por el ID del médico.
+        """
+        return self._filtrar('medico', id_medico)
+
+    def especialidad(self, nombre: str):
+        """
+        Filtra por el nombre de la especialidad del médico.
+        """
+        return self._filtrar('especialidad', nombre)
+
+    def estado(self, estado: str):
+        """
+        Filtra por estado ('pendiente', 'completada' o 'cancelada').
+        """
+        return self._filtrar('estado', estado)
+
+    def fechas(self, desde: str = None, hasta: str = None):
+        """
+        Filtra por un rango de fechas (ambos extremos incluidos).
+
+            Args:
+                desde (str): Fecha inicial en formato DD/MM/AAAA, o None para no limitar.
+                hasta (str): Fecha final en formato DD/MM/AAAA, o None para no limitar.
+
+            Raises:
+                ValueError: Si alguna de las fechas no tiene el formato correcto.
+        """
+        if desde is None and hasta is None:
+            return self
+        for fecha in (desde, hasta):
+            if fecha is not None:
+                try:
+                    datetime.strptime(fecha, "%d/%m/%Y")
+                except ValueError:
+                    raise ValueError(f"Fecha inválida (DD/MM/AAAA): {fecha}")
+        self._rango_fechas = (clave_fecha(desde) if desde else "", clave_fecha(hasta) if hasta else "9999")
+        return self
+
+    def horas(self, desde: str = None, hasta: str = None):
+        """
+        Filtra por un rango de horas (ambos extremos incluidos).
+
+            Args:
+                desde (str): Hora inicial en formato HH:MM, o None para no limitar.
+                hasta (str): Hora final en formato HH:MM, o None para no limitar.
+
+            Raises:
+                ValueError: Si alguna de las horas no tiene el formato correcto.
+        """
+        if desde is None and hasta is None:
+            return self
+        for hora in (desde, hasta):
+            if hora is not None:
+                try:
+                    datetime.strptime(hora, "%H:%M")
+                except ValueError:
+                    raise ValueError(f"Hora inválida (HH:MM): {hora}")
+        self._rango_horas = (desde or "00:00", hasta or "23:59")
+        return self
+
+    def ordenar(self, orden: str):
+        """
+        Ordena el resultado ('id', 'fecha', 'paciente' o 'medico'; con el prefijo '-' es descendente).
+        """
+        self._orden = orden
+        return self
+
+    def limitar(self, limite: int):
+        """
+        Limita el número de citas del resultado.
+        """
+        self._limite = limite
+        return self
+
+    def con_historial(self):
+        """
+        Incluye en la consulta las citas archivadas de meses anteriores.
+        """
+        self._incluir_historial = True
+        return self
+
+    def cumple(self, cita: Cita) -> bool:
+        """
+        Indica si una cita cumple todos los filtros de la consulta.
+        """
+        valores = GestorCitas._valores_indexados(cita)
+        if any(valores[campo] != valor for campo, valor in self._filtros.items()):
+            return False
+        if self._rango_fechas is not None:
+            fecha = clave_fecha(cita.fecha)
+            if not self._rango_fechas[0] <= fecha <= self._rango_fechas[1]:
+                return False
+        if self._rango_horas is not None and not self._rango_horas[0] <= cita.hora <= self._rango_horas[1]:
+            return False
+        return True
+
+    def ejecutar(self) -> list:
+        """
+        Ejecuta la consulta.
+
+            Returns:
+                list: Citas que cumplen los filtros, ordenadas y limitadas según la consulta.
+        """
+        return self._gestor.ejecutar_consulta(self)
+
+    def cursor(self) -> CursorCitas:
+        """
+        Ejecuta la consulta para recorrer el resultado por páginas.
+
+        Si la consulta no tiene filtros ni orden, las citas se obtienen a medida que se piden páginas.
+
+            Returns:
+                CursorCitas: Cursor sobre el resultado.
+        """
+        if not self._filtros and self._rango_fechas is None and self._rango_horas is None and self._orden is None:
+            citas = self._gestor.listar_citas(self._incluir_historial)
+            return CursorCitas(citas[:self._limite] if self._limite is not None else citas)
+        return CursorCitas(self.ejecutar())
+
+    def pagina(self, offset: int = 0, limite: int = 50, orden: str = "fecha", cursor: str = None) -> Pagina:
+        """
+        Devuelve una página del resultado, como `GestorCitas.listar_citas_pagina`.
+
+        Sin filtros, la página se obtiene directamente de `listar_citas_pagina` (por fecha usa el índice
+        de fechas); con filtros, solo se ordenan los `offset + limite` primeros candidatos. El orden
+        y el límite indicados con `ordenar` y `limitar` no se aplican a la página.
+
+            Args:
+                offset (int): Citas a saltar.
+                limite (int): Máximo de citas de la página.
+                orden (str): Orden de la página (ver `GestorCitas.ordenes_pagina`).
+                cursor (str): Cursor de la página anterior, para continuar después de ella.
+
+            Returns:
+                Pagina: Página de objetos Cita.
+
+            Raises:
+                ValueError: Si el orden, el cursor, el offset o el límite no son válidos.
+        """
+        if not self._filtros and self._rango_fechas is None and self._rango_horas is None:
+            return self._gestor.listar_citas_pagina(offset, limite, orden, cursor, self._incluir_historial)
+        return paginar(self._gestor.ejecutar_consulta(self, contar=True), GestorCitas.ordenes_pagina,
+                       orden, offset, limite, cursor)
+
+    def contar(self) -> int:
+        """
+        Cuenta las citas que cumplen los filtros (sin aplicar el límite).
+        """
+        return len(self._gestor.ejecutar_consulta(self, contar=True))
+
+
+@instrumentada()
+class GestorCitas(GestorPersistente):
     """
     Clase que gestiona las operaciones relacionadas con citas médicas.
 
         Attributes:
             _citas (list): Lista de objetos Cita registrados.
-            file_path (Path): Ruta del archivo JSON donde se almacenan las citas.
+            _indice_citas (dict): Índice id_cita -> Cita.
+            _citas_por_medico (dict): Índice id_medico -> lista de citas del médico.
+            _indice_campos (dict): Campo ('paciente', 'medico', 'especialidad', 'estado') -> valor -> set de IDs.
+            _indice_fechas (list): Claves de orden por fecha de las citas (fecha AAAA/MM/DD, hora, ..., id_cita),
+                                   para consultas por rango y páginas por fecha. Se ordena solo cuando se
+                                   necesita (ver `_fechas_ordenadas`).
+            _valores_por_cita (dict): id_cita -> (valores indexados, clave de fecha) con los que se indexó la cita.
+            file_path (Path): Ruta del archivo JSON donde se almacenan las citas activas.
+            dir_historial (Path): Carpeta con un archivo JSON por mes de citas ya completadas o canceladas.
+            _meses_cargados (set): Meses del historial (AAAA_MM) ya cargados en memoria.
     """
 
-    def __init__(self):
+    nombre_datos = "citas"
+    clave_registro = "id_cita"
+    # Campos con índice de igualdad para `consulta`
+    campos_indexados = ('paciente', 'medico', 'especialidad', 'estado')
+    # Órdenes disponibles en `listar_citas_pagina` (todas las claves terminan en el ID para ser estables)
+    ordenes_pagina = {
+        'id': lambda c: clave_id(c.id_cita),
+        'fecha': lambda c: (clave_fecha(c.fecha), c.hora, *clave_id(c.id_cita)),
+        'paciente': lambda c: (c.paciente.id_paciente, clave_fecha(c.fecha), c.hora, *clave_id(c.id_cita)),
+        'medico': lambda c: (c.medico.id_medico, clave_fecha(c.fecha), c.hora, *clave_id(c.id_cita)),
+    }
+
+    def __init__(self, gestor_pacientes=None, gestor_medicos=None, cargar: bool = True):
         """
-        Inicializa una instancia de GestorCitas, cargando los datos desde el archivo JSON.
+        Inicializa una instancia de GestorCitas, cargando las citas activas desde el archivo JSON.
+
+            Args:
+                gestor_pacientes (GestorPacientes): Gestor con los pacientes ya cargados. Si no se indica, se crea uno.
+                gestor_medicos (GestorMedicos): Gestor con los médicos ya cargados. Si no se indica, se crea uno.
+                cargar (bool): Si es False, no se leen los archivos (los datos se cargan después con `cargar_desde_datos`).
         """
         self.file_path = Path("datos") / 'citas.json'
+        self.dir_historial = Path("datos") / 'historial_citas'
+        self.indice_historial_path = self.dir_historial / 'indice.json'
         self._citas = []
-        self.cargar_datos()
+        self._indice_citas = {}
+        self._citas_por_medico = {}
+        self._indice_campos = {campo: {} for campo in self.campos_indexados}
+        self._indice_fechas = []
+        self._fechas_desordenadas = False
+        self._valores_por_cita = {}
+        self._indice_historial = {}
+        self._mes_por_cita = {}
+        self._meses_cargados = set()
+        self._ultimo_id_historial = None
+
+        # Necesitamos los gestores de pacientes y médicos para reconstruir las citas
+        from controlador.gestor_pacientes import GestorPacientes
+        from controlador.gestor_medicos import GestorMedicos
+
+        self.gestor_pacientes = gestor_pacientes or GestorPacientes()
+        self.gestor_medicos = gestor_medicos or GestorMedicos()
+        if cargar:
+            self.cargar_datos()
 
-    def agendar_cita(self, fecha: str, hora: str, paciente, medico) -> bool:
+    def agendar_cita(self, fecha: str, hora: str, paciente, medico):
         """
         Agrega una nueva cita al sistema si la fecha y hora son válidas.
 
@@ -32,24 +358,26 @@ class GestorCitas:
                 medico (Medico): Objeto Medico.
 
             Returns:
-                bool: True si la cita se agenda exitosamente, False si hay errores de validación.
+                Cita | None: La cita agendada, o None si hay errores de validación.
         """
         # Validar formato y rango de la nueva fecha
         if not validar_fecha_citas(fecha):
-            return False
+            return None
 
         # Validar formato de la nueva hora
         if not validar_hora(hora):
-            return False
+            return None
 
-        # Generar ID automático
-        ultimo_id = max([c.id_cita for c in self._citas], default=None)
+        # Generar ID automático (considerando también las citas archivadas que no están en memoria)
+        ultimo_id = max([c.id_cita for c in self._citas] + [self._ultimo_id_historial or ""], key=clave_id) or None
         id_cita = generar_id("CIT", ultimo_id)
 
         cita = Cita(fecha=fecha, hora=hora, paciente=paciente, medico=medico, id_cita=id_cita)
-        self._citas.append(cita)
-        self.guardar_datos()
-        return True
+        self._agregar_a_memoria(cita)
+        self._al_deshacer(lambda: self._quitar_de_memoria(cita))
+        self.persistir_cambios()
+        self._publicar(CITA_AGENDADA, cita=cita)
+        return cita
 
     def cancelar_cita(self, id_cita: str) -> bool:
         """Marca una cita como cancelada tanto en memoria como en el archivo JSON
@@ -60,28 +388,24 @@ class GestorCitas:
                Returns:
                    bool: True si la cita fue encontrada y cancelada, False en caso contrario
            """
-        cita_encontrada = False
+        cita = self.buscar_cita(id_cita)
+        if not cita or cita.estado != "pendiente":
+            return False
 
         # Actualizar en memoria
-        for cita in self._citas:
-            if cita.id_cita == id_cita and cita.estado == "pendiente":
-                cita.cancelar()
-                cita_encontrada = True
-                break
+        respaldo = [(cita, dict(cita.__dict__))]
+        cita.cancelar()
+        self.reindexar_cita(cita)
+        self._al_deshacer(lambda: self._restaurar_citas(respaldo))
 
-        if cita_encontrada:
-            try:
-                self.guardar_datos()
-            except Exception as e:
-                print(f"Error al guardar los cambios: {e}")
-                # Revertir el cambio en memoria si falla el guardado
-                for cita in self._citas:
-                    if cita.id_cita == id_cita:
-                        cita._estado = "pendiente"  # Accedemos al atributo protegido directamente para revertir
-                        break
-                return False
+        if not self.persistir_cambios():
+            # Revertir el cambio en memoria si falla el guardado
+            cita._estado = "pendiente"  # Accedemos al atributo protegido directamente para revertir
+            self.reindexar_cita(cita)
+            return False
 
-        return cita_encontrada
+        self._publicar(CITA_CANCELADA, cita=cita)
+        return True
 
     def reagendar_cita(self, id_cita: str, nueva_fecha: str, nueva_hora: str):
         """
@@ -93,9 +417,12 @@ class GestorCitas:
                 nueva_hora (str): Nueva hora en formato HH:MM.
 
             Returns:
-                bool: True si la cita fue reagendada exitosamente, False si falla la validación.
+                bool: True si la cita fue reagendada exitosamente, False si no existe, no está pendiente,
+                      falla la validación o no se pudo guardar.
         """
         cita = self.buscar_cita(id_cita)
+        if not cita or cita.estado != "pendiente":
+            return False
 
         # Verificar que la nueva fecha/hora sean diferentes a las actuales
         if cita.fecha == nueva_fecha and cita.hora == nueva_hora:
@@ -109,11 +436,42 @@ class GestorCitas:
         if not validar_hora(nueva_hora):
             return False
 
-        if cita and cita.estado == "pendiente":
-            cita.reagendar(nueva_fecha, nueva_hora)
-            self.guardar_datos()
-            return True
-        return  False
+        fecha_anterior, hora_anterior = cita.fecha, cita.hora
+        respaldo = [(cita, dict(cita.__dict__))]
+        cita.reagendar(nueva_fecha, nueva_hora)
+        self.reindexar_cita(cita)
+        self._al_deshacer(lambda: self._restaurar_citas(respaldo))
+
+        if not self.persistir_cambios():
+            # Revertir el cambio en memoria si falla el guardado, salvo que un conflicto ya haya
+            # dejado en la cita la versión del otro proceso
+            if (cita.fecha, cita.hora) == (nueva_fecha, nueva_hora):
+                cita.reagendar(fecha_anterior, hora_anterior)
+                self.reindexar_cita(cita)
+            return False
+
+        self._publicar(CITA_REAGENDADA, cita=cita, fecha_anterior=fecha_anterior,
+                       hora_anterior=hora_anterior, medico_anterior=cita.medico)
+        return True
+
+    def completar_cita(self, cita: Cita) -> bool:
+        """
+        Marca una cita como completada (por ejemplo, al registrar su diagnóstico).
+
+            Args:
+                cita (Cita): Cita a completar.
+
+            Returns:
+                bool: True si se guardó (o encoló) correctamente, False si ocurrió un error.
+        """
+        respaldo = [(cita, dict(cita.__dict__))]
+        cita.completar()
+        self.reindexar_cita(cita)
+        self._al_deshacer(lambda: self._restaurar_citas(respaldo))
+        if not self.persistir_cambios():
+            return False
+        self._publicar(CITA_COMPLETADA, cita=cita)
+        return True
 
     def citas_por_paciente(self, id_paciente: str) -> list:
         """
@@ -125,6 +483,7 @@ class GestorCitas:
             Returns:
                 list: Lista de objetos Cita correspondientes al paciente.
         """
+        self.cargar_historial()
         return [cita for cita in self._citas if cita.paciente.id_paciente == id_paciente]
 
     def citas_por_medico(self, id_medico: str) -> list:
@@ -136,7 +495,8 @@ class GestorCitas:
             Returns:
                 list: Lista de citas del médico.
         """
-        return [cita for cita in self._citas if cita.medico.id_medico == id_medico]
+        self.cargar_historial()
+        return list(self._citas_por_medico.get(id_medico, []))
 
     def buscar_cita(self, id_cita: str):
         """Busca una cita por su ID.
@@ -147,74 +507,712 @@ class GestorCitas:
             Returns:
                 Cita | None: Objeto Cita si se encuentra, None en caso contrario.
         """
+        if id_cita not in self._indice_citas and id_cita in self._mes_por_cita:
+            self.cargar_mes(self._mes_por_cita[id_cita])
+        return self._indice_citas.get(id_cita)
+
+    def seleccionar_citas(self, predicado=None, id_medico: str = None, fecha: str = None,
+                          estado: str = "pendiente") -> list:
+        """
+        Selecciona las citas que cumplen los criterios indicados.
+
+        Si se indica `id_medico` se parte del índice por médico en lugar de recorrer todas las citas.
+        Solo considera las citas en memoria; las pendientes nunca se archivan en el historial.
+
+            Args:
+                predicado (callable): Función opcional que recibe una Cita y devuelve True si debe incluirse.
+                id_medico (str): ID del médico (clave de índice).
+                fecha (str): Fecha en formato DD/MM/AAAA.
+                estado (str): Estado requerido. None para no filtrar por estado.
+
+            Returns:
+                list: Lista de objetos Cita seleccionados.
+        """
+        if id_medico is not None:
+            candidatas = self._citas_por_medico.get(id_medico, [])
+        else:
+            candidatas = self._citas
+
+        return [cita for cita in candidatas
+                if (fecha is None or cita.fecha == fecha)
+                and (estado is None or cita.estado == estado)
+                and (predicado is None or predicado(cita))]
+
+    def consultar_citas(self, id_paciente: str = None, id_medico: str = None, estado: str = None) -> CursorCitas:
+        """
+        Consulta las citas en memoria de un paciente, médico y/o estado, para recorrerlas por páginas.
+
+            Args:
+                id_paciente (str): ID del paciente, o None para no filtrar por paciente.
+                id_medico (str): ID del médico, o None para no filtrar por médico.
+                estado (str): Estado de la cita, o None para no filtrar por estado.
+
+            Returns:
+                CursorCitas: Cursor sobre las citas que cumplen la consulta.
+        """
+        return self.consulta().paciente(id_paciente).medico(id_medico).estado(estado).cursor()
+
+    def consulta(self) -> ConsultaCitas:
+        """
+        Crea una consulta de citas sin filtros, a la que se agregan filtros encadenando métodos.
+
+            Returns:
+                ConsultaCitas: Consulta nueva sobre este gestor.
+        """
+        return ConsultaCitas(self)
+
+    def ejecutar_consulta(self, consulta: ConsultaCitas, contar: bool = False) -> list:
+        """
+        Resuelve una consulta usando los índices.
+
+        De cada filtro de igualdad se toma el conjunto de IDs de su índice; el rango de fechas se
+        resuelve con búsqueda binaria sobre el índice de fechas y solo se convierte en conjunto si es
+        más pequeño que los demás. Se parte del conjunto más pequeño y se intersecta con el resto,
+        de modo que el costo depende del filtro más selectivo y no del total de citas. Al final se
+        comprueban los filtros sobre cada cita candidata (así se aplica el rango de horas).
+
+            Args:
+                consulta (ConsultaCitas): Consulta a resolver.
+                contar (bool): Si es True, no se ordena ni se limita el resultado.
+
+            Returns:
+                list: Citas que cumplen la consulta.
+
+            Raises:
+                ValueError: Si el orden de la consulta no es válido.
+        """
+        if consulta._incluir_historial:
+            self.cargar_historial()
+
+        conjuntos = [self._indice_campos[campo].get(valor, set()) for campo, valor in consulta._filtros.items()]
+        conjuntos.sort(key=len)
+
+        if consulta._rango_fechas is not None:
+            desde, hasta = consulta._rango_fechas
+            fechas = self._fechas_ordenadas()
+            inicio = bisect_left(fechas, (desde,))
+            fin = bisect_right(fechas, (hasta, FIN_DEL_DIA))
+            if not conjuntos or fin - inicio < len(conjuntos[0]):
+                conjuntos.insert(0, {entrada[-1] for entrada in fechas[inicio:fin]})
+
+        if conjuntos:
+            ids = set(conjuntos[0])
+            for conjunto in conjuntos[1:]:
+                if not ids:
+                    break
+                ids &= conjunto
+            candidatas = (self._indice_citas[id_cita] for id_cita in ids if id_cita in self._indice_citas)
+        else:
+            candidatas = self._citas
+
+        resultado = [cita for cita in candidatas if consulta.cumple(cita)]
+        if contar:
+            return resultado
+
+        orden = consulta._orden or "id"
+        descendente = orden.startswith('-')
+        clave = self.ordenes_pagina.get(orden.lstrip('-'))
+        if clave is None:
+            raise ValueError(f"Orden no válido: {orden}. Opciones: {', '.join(self.ordenes_pagina)}")
+        if consulta._limite is not None:
+            seleccionar = heapq.nlargest if descendente else heapq.nsmallest
+            return seleccionar(consulta._limite, resultado, key=clave)
+        return sorted(resultado, key=clave, reverse=descendente)
+
+    def cancelar_citas_lote(self, citas: list) -> dict:
+        """
+        Cancela un conjunto de citas pendientes y guarda el archivo una sola vez.
+
+            Args:
+                citas (list): Citas a cancelar (por ejemplo, el resultado de `seleccionar_citas`).
+
+            Returns:
+                dict: Reporte del lote (ver `_aplicar_lote`).
+        """
+        return self._aplicar_lote(citas, lambda cita: cita.cancelar(), CITA_CANCELADA)
+
+    def completar_citas_lote(self, citas: list) -> dict:
+        """
+        Marca como completadas un conjunto de citas pendientes y guarda el archivo una sola vez.
+
+            Args:
+                citas (list): Citas a completar.
+
+            Returns:
+                dict: Reporte del lote (ver `_aplicar_lote`).
+        """
+        return self._aplicar_lote(citas, lambda cita: cita.completar(), CITA_COMPLETADA)
+
+    def reagendar_citas_lote(self, citas: list, nueva_fecha: str = None, nueva_hora: str = None,
+                             nuevo_medico=None) -> dict:
+        """
+        Reagenda un conjunto de citas pendientes a otra fecha, hora y/o médico en una sola operación.
+
+        Los valores que no se indiquen se conservan de cada cita. Si no se indica ninguno, no se modifica
+        ninguna cita y el reporte lo indica como error.
+
+            Args:
+                citas (list): Citas a reagendar.
+                nueva_fecha (str): Nueva fecha en formato DD/MM/AAAA.
+                nueva_hora (str): Nueva hora en formato HH:MM.
+                nuevo_medico (Medico): Médico al que se reasignan las citas.
+
+            Returns:
+                dict: Reporte del lote (ver `_aplicar_lote`).
+        """
+        if nueva_fecha is None and nueva_hora is None and nuevo_medico is None:
+            return self._reporte_lote(error="No se indicó la nueva fecha, hora ni médico")
+        # Validar una sola vez los nuevos valores antes de tocar ninguna cita
+        if nueva_fecha is not None and not validar_fecha_citas(nueva_fecha):
+            return self._reporte_lote(error="Fecha inválida")
+        if nueva_hora is not None and not validar_hora(nueva_hora):
+            return self._reporte_lote(error="Hora inválida")
+
+        def reagendar(cita):
+            cita.reagendar(nueva_fecha or cita.fecha, nueva_hora or cita.hora)
+            if nuevo_medico is not None and nuevo_medico is not cita.medico:
+                self._citas_por_medico[cita.medico.id_medico].remove(cita)
+                cita.reasignar_medico(nuevo_medico)
+                self._citas_por_medico.setdefault(nuevo_medico.id_medico, []).append(cita)
+
+        return self._aplicar_lote(citas, reagendar, CITA_REAGENDADA)
+
+    def _aplicar_lote(self, citas: list, accion, evento: str) -> dict:
+        """
+        Aplica una acción a todas las citas pendientes del lote de forma atómica.
+
+        Los cambios se hacen en memoria y se guardan una única vez. Si la acción o el guardado
+        fallan, todas las citas vuelven a su estado anterior; si no, se publica un evento por cita.
+
+            Args:
+                citas (list): Citas sobre las que se aplica la acción.
+                accion (callable): Función que recibe una Cita y la modifica.
+                evento (str): Tipo de evento a publicar por cada cita modificada.
+
+            Returns:
+                dict: Reporte con las claves 'exito' (bool), 'modificadas' (list de IDs),
+                      'omitidas' (list de IDs que no estaban pendientes) y 'error' (str | None).
+        """
+        pendientes = [cita for cita in citas if cita.estado == "pendiente"]
+        omitidas = [cita.id_cita for cita in citas if cita.estado != "pendiente"]
+
+        if not pendientes:
+            return self._reporte_lote(exito=True, omitidas=omitidas)
+
+        # Respaldo del estado en memoria para poder revertir
+        respaldo = [(cita, dict(cita.__dict__)) for cita in pendientes]
+        anteriores = [(cita.fecha, cita.hora, cita.medico) for cita in pendientes]
+        try:
+            for cita in pendientes:
+                accion(cita)
+                self.reindexar_cita(cita)
+            if not self.persistir_cambios():
+                raise IOError("No se pudo guardar el archivo de citas")
+        except Exception as e:
+            self._restaurar_citas(respaldo)
+            return self._reporte_lote(omitidas=omitidas, error=str(e))
+
+        self._al_deshacer(lambda: self._restaurar_citas(respaldo))
+        for cita, anterior in zip(pendientes, anteriores):
+            self._publicar_cambio(evento, cita, *anterior)
+        return self._reporte_lote(exito=True, modificadas=[cita.id_cita for cita in pendientes],
+                                  omitidas=omitidas)
+
+    def _publicar_cambio(self, evento: str, cita: Cita, fecha_anterior: str, hora_anterior: str, medico_anterior):
+        """
+        Publica el evento de un cambio en una cita; solo 'cita_reagendada' lleva los valores anteriores.
+        """
+        if evento == CITA_REAGENDADA:
+            self._publicar(evento, cita=cita, fecha_anterior=fecha_anterior, hora_anterior=hora_anterior,
+                           medico_anterior=medico_anterior)
+        else:
+            self._publicar(evento, cita=cita)
+
+    @staticmethod
+    def _reporte_lote(exito: bool = False, modificadas: list = None, omitidas: list = None,
+                      error: str = None) -> dict:
+        """
+        Construye el reporte devuelto por las operaciones en lote.
+        """
+        return {
+            'exito': exito,
+            'modificadas': modificadas or [],
+            'omitidas': omitidas or [],
+            'error': error
+        }
+
+    def _agregar_a_memoria(self, cita: Cita):
+        """
+        Agrega una cita a la lista en memoria y a los índices.
+
+            Args:
+                cita (Cita): Cita a registrar.
+        """
+        self._citas.append(cita)
+        self._indice_citas[cita.id_cita] = cita
+        self._citas_por_medico.setdefault(cita.medico.id_medico, []).append(cita)
+        self._indexar_cita(cita)
+
+    def _quitar_de_memoria(self, cita: Cita):
+        """
+        Quita una cita de la lista en memoria y de los índices (al deshacer su alta).
+        """
+        self._citas.remove(cita)
+        self._indice_citas.pop(cita.id_cita, None)
+        self._citas_por_medico[cita.medico.id_medico].remove(cita)
+        self._desindexar_cita(cita.id_cita)
+
+    def _restaurar_citas(self, respaldo: list):
+        """
+        Devuelve un grupo de citas al estado guardado en un respaldo y reconstruye los índices.
+
+            Args:
+                respaldo (list): Tuplas (cita, copia de su `__dict__` antes del cambio).
+        """
+        for cita, estado in respaldo:
+            cita.__dict__.update(estado)
+        self._reconstruir_indices()
+
+    def _reconstruir_indices(self):
+        """
+        Reconstruye los índices a partir de la lista de citas en memoria.
+        """
+        self._indice_citas = {}
+        self._citas_por_medico = {}
+        self._indice_campos = {campo: {} for campo in self.campos_indexados}
+        self._indice_fechas = []
+        self._fechas_desordenadas = False
+        self._valores_por_cita = {}
         for cita in self._citas:
-            if cita.id_cita == id_cita:
-                return cita
-        return None
+            self._indice_citas[cita.id_cita] = cita
+            self._citas_por_medico.setdefault(cita.medico.id_medico, []).append(cita)
+            self._indexar_cita(cita)
+
+    @staticmethod
+    def _valores_indexados(cita: Cita) -> dict:
+        """
+        Devuelve los valores de una cita para cada campo con índice de igualdad.
+        """
+        return {
+            'paciente': cita.paciente.id_paciente,
+            'medico': cita.medico.id_medico,
+            'especialidad': cita.medico.especialidad.nombre,
+            'estado': cita.estado,
+        }
+
+    def _indexar_cita(self, cita: Cita):
+        """
+        Agrega una cita a los índices de consulta.
+        """
+        valores = self._valores_indexados(cita)
+        for campo, valor in valores.items():
+            self._indice_campos[campo].setdefault(valor, set()).add(cita.id_cita)
+        # Durante la carga se agregan muchas citas seguidas; se ordenan una sola vez al consultar
+        entrada = self.ordenes_pagina['fecha'](cita)
+        if self._indice_fechas and entrada < self._indice_fechas[-1]:
+            self._fechas_desordenadas = True
+        self._indice_fechas.append(entrada)
+        self._valores_por_cita[cita.id_cita] = (valores, entrada)
+
+    def _fechas_ordenadas(self) -> list:
+        """
+        Devuelve el índice de fechas, ordenándolo antes si se le agregaron citas fuera de orden.
+        """
+        if self._fechas_desordenadas:
+            self._indice_fechas.sort()
+            self._fechas_desordenadas = False
+        return self._indice_fechas
+
+    def _desindexar_cita(self, id_cita: str):
+        """
+        Quita una cita de los índices de consulta, usando los valores con los que se indexó.
+        """
+        valores, entrada = self._valores_por_cita.pop(id_cita)
+        for campo, valor in valores.items():
+            ids = self._indice_campos[campo][valor]
+            ids.discard(id_cita)
+            if not ids:
+                del self._indice_campos[campo][valor]
+        fechas = self._fechas_ordenadas()
+        posicion = bisect_left(fechas, entrada)
+        if posicion < len(fechas) and fechas[posicion] == entrada:
+            del fechas[posicion]
+
+    def reindexar_cita(self, cita: Cita):
+        """
+        Actualiza los índices de consulta después de modificar una cita (estado, fecha o médico).
+
+        Debe llamarse siempre que se modifique una cita fuera de este gestor (por ejemplo, al
+        completarla desde el gestor de diagnósticos).
+
+            Args:
+                cita (Cita): Cita modificada.
+        """
+        if cita.id_cita in self._valores_por_cita:
+            self._desindexar_cita(cita.id_cita)
+        self._indexar_cita(cita)
 
     def cargar_datos(self):
         """
-        Carga las citas desde el archivo JSON, reconstruyendo los objetos Cita con sus respectivos pacientes y médicos.
+        Carga las citas activas desde el archivo JSON, reconstruyendo los objetos Cita con sus respectivos pacientes y médicos.
+
+        Las citas históricas no se cargan aquí; solo se lee el índice del historial para poder cargarlas
+        por mes cuando se necesiten (ver `cargar_mes` y `cargar_historial`).
+        """
+        self.cargar_desde_datos(self.leer_datos())
+
+    def leer_datos(self) -> tuple:
+        """
+        Lee y decodifica el índice del historial y el archivo de citas activas, sin construir los objetos.
+
+            Returns:
+                tuple: (índice del historial, registros de las citas activas). Cada parte queda vacía si su
+                       archivo no existe o no se pudo leer.
         """
+        indice = {}
+        try:
+            indice = self._leer_archivo(self.indice_historial_path) or {}
+        except json.JSONDecodeError as e:
+            print(f"Error al cargar el índice del historial de citas: {e}")
+
+        registros = []
         try:
-            if self.file_path.exists():
-                with open(self.file_path, 'r', encoding='utf-8') as archivo:
-                    datos = json.load(archivo)
-                    # Necesitamos los gestores de pacientes y médicos para reconstruir las citas
-                    from controlador.gestor_pacientes import GestorPacientes
-                    from controlador.gestor_medicos import GestorMedicos
-
-                    gestor_pacientes = GestorPacientes()
-                    gestor_medicos = GestorMedicos()
-
-                    for cita_data in datos:
-                        paciente = gestor_pacientes.buscar_paciente(cita_data['id_paciente'])
-                        medico = gestor_medicos.buscar_medico(cita_data['id_medico'])
-
-                        if paciente and medico:
-                            cita = Cita(
-                                cita_data['id_cita'],
-                                cita_data['fecha'],
-                                cita_data['hora'],
-                                paciente,
-                                medico
-                            )
-                            cita._estado = cita_data['estado']
-                            self._citas.append(cita)
+            registros = self._leer_archivo(self.file_path) or []
         except json.JSONDecodeError as e:
             print(f"Error al cargar citas: {e}")
+        return indice, registros
 
-    def guardar_datos(self):
+    def cargar_desde_datos(self, datos: tuple):
         """
-        Guarda la lista de citas en el archivo JSON de manera persistente.
+        Construye las citas activas, enlazándolas con sus pacientes y médicos, a partir de los datos ya leídos.
+
+        Los gestores de pacientes y médicos deben estar cargados antes de llamar a este método.
+
+            Args:
+                datos (tuple): (índice del historial, registros) devueltos por `leer_datos`.
+        """
+        indice, registros = datos
+        self._cargar_indice_historial(indice)
+        for cita_data in registros:
+            self._registro_a_memoria(cita_data)
+
+    def cargar_mes(self, mes: str):
+        """
+        Carga en memoria las citas históricas de un mes, si no se habían cargado ya.
+
+            Args:
+                mes (str): Mes en formato AAAA_MM.
         """
+        if mes in self._meses_cargados or mes not in self._indice_historial:
+            return
+
+        ruta = self._ruta_mes(mes)
         try:
-            datos = []
-            for cita in self._citas:
-                datos.append({
-                    'id_cita': cita.id_cita,
-                    'fecha': cita.fecha,
-                    'hora': cita.hora,
-                    'estado': cita.estado,
-                    'id_paciente': cita.paciente.id_paciente,
-                    'id_medico': cita.medico.id_medico
-                })
-            # Crear respaldo antes de sobrescribir el archivo
-            if self.file_path.exists():
-                copia = self.file_path.with_suffix('.json.bak')
-                copyfile(self.file_path, copia)
-
-            # Guardar en el archivo original
-            with open(self.file_path, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=4)
-        except Exception as e:
-            print(f"Error al guardar citas: {e}")
+            for cita_data in self._leer_archivo(ruta) or []:
+                # Una cita puede estar aún en el archivo principal si se interrumpió un guardado
+                if cita_data['id_cita'] not in self._indice_citas:
+                    self._registro_a_memoria(cita_data)
+            self._meses_cargados.add(mes)
+        except json.JSONDecodeError as e:
+            print(f"Error al cargar el historial de citas {mes}: {e}")
+
+    def iterar_registros(self, desde: str = None, hasta: str = None):
+        """
+        Recorre los registros de las citas activas e históricas de un rango de fechas, sin cargar
+        el historial en memoria.
+
+        Los meses del historial que no están en memoria se leen de a uno y se descartan después de
+        recorrerlos; solo se leen los meses que caen en el rango. Primero se recorre el historial, en
+        orden cronológico de los meses, y después las citas en memoria, ordenadas por fecha.
+
+            Args:
+                desde (str): Fecha inicial en formato DD/MM/AAAA, o None para no limitar.
+                hasta (str): Fecha final en formato DD/MM/AAAA, o None para no limitar.
+
+            Returns:
+                generator: Registros de las citas, como se guardan en los archivos JSON.
+
+            Raises:
+                ValueError: Si alguna de las fechas no tiene el formato correcto.
+        """
+        inicio, fin = self.consulta().fechas(desde, hasta)._rango_fechas or ("", "9999")
+        return self._iterar_registros(inicio, fin)
+
+    def _iterar_registros(self, inicio: str, fin: str):
+        """
+        Generador de `iterar_registros` para un rango de claves de fecha AAAA/MM/DD ya validado.
+        """
+        for mes in sorted(self._indice_historial):
+            if mes in self._meses_cargados or not inicio[:7] <= mes.replace('_', '/') <= fin[:7]:
+                continue
+            try:
+                registros = self._consultar_archivo(self._ruta_mes(mes)) or []
+            except json.JSONDecodeError as e:
+                print(f"Error al leer el historial de citas {mes}: {e}")
+                continue
+            for cita_data in registros:
+                if cita_data['id_cita'] not in self._indice_citas and inicio <= clave_fecha(cita_data['fecha']) <= fin:
+                    yield cita_data
+
+        citas = sorted((cita for cita in self._citas if inicio <= clave_fecha(cita.fecha) <= fin),
+                       key=lambda cita: (clave_fecha(cita.fecha), cita.hora))
+        for cita in citas:
+            yield self._cita_a_registro(cita)
+
+    def cargar_historial(self):
+        """
+        Carga en memoria todas las citas históricas archivadas por mes.
+        """
+        for mes in sorted(self._indice_historial):
+            self.cargar_mes(mes)
+
+    def _cargar_indice_historial(self, indice: dict):
+        """
+        Carga el índice del historial (meses archivados, IDs por mes y último ID asignado).
 
-    def listar_citas(self) -> list:
+            Args:
+                indice (dict): Contenido del archivo `indice.json` del historial.
+        """
+        self._indice_historial = indice.get('meses', {})
+        self._ultimo_id_historial = indice.get('ultimo_id')
+        self._mes_por_cita = {}
+        for mes, ids in self._indice_historial.items():
+            for id_cita in ids:
+                self._mes_por_cita[id_cita] = mes
+
+    def _registro_a_memoria(self, cita_data: dict):
+        """
+        Reconstruye una Cita a partir de su registro JSON y la agrega a memoria.
+
+            Args:
+                cita_data (dict): Registro de la cita tal como se guarda en el archivo.
+        """
+        paciente = self.gestor_pacientes.buscar_paciente(cita_data['id_paciente'])
+        medico = self.gestor_medicos.buscar_medico(cita_data['id_medico'])
+
+        if paciente and medico:
+            cita = Cita(
+                cita_data['id_cita'],
+                cita_data['fecha'],
+                cita_data['hora'],
+                paciente,
+                medico
+            )
+            cita._estado = cita_data['estado']
+            self._agregar_a_memoria(cita)
+
+    @staticmethod
+    def _cita_a_registro(cita: Cita) -> dict:
+        """
+        Convierte una Cita en el diccionario que se guarda en el archivo JSON.
+        """
+        return {
+            'id_cita': cita.id_cita,
+            'fecha': cita.fecha,
+            'hora': cita.hora,
+            'estado': cita.estado,
+            'id_paciente': cita.paciente.id_paciente,
+            'id_medico': cita.medico.id_medico
+        }
+
+    @staticmethod
+    def _mes_de(fecha: str) -> str:
         """
-        Devuelve la lista completa de citas registradas.
+        Obtiene la clave de mes AAAA_MM de una fecha DD/MM/AAAA.
+        """
+        _, mes, anio = fecha.split('/')
+        return f"{anio}_{mes}"
+
+    @staticmethod
+    def _mes_limite_activo() -> str:
+        """
+        Devuelve el primer mes (AAAA_MM) que se considera reciente.
+
+        Las citas completadas o canceladas de meses anteriores a este se archivan en el historial.
+        """
+        hoy = datetime.now()
+        total_meses = hoy.year * 12 + (hoy.month - 1) - MESES_RECIENTES
+        return f"{total_meses // 12}_{total_meses % 12 + 1:02d}"
+
+    def _ruta_mes(self, mes: str) -> Path:
+        """
+        Devuelve la ruta del archivo de historial de un mes.
+        """
+        return self.dir_historial / f"citas_{mes}.json"
+
+    def _preparar_escrituras(self) -> list:
+        """
+        Prepara el guardado de las citas.
+
+        Las citas pendientes y las de meses recientes van al archivo principal. Las completadas
+        o canceladas de meses anteriores se mueven al archivo de historial de su mes, que solo se reescribe
+        si cambió su contenido.
+
+            Returns:
+                list: Tuplas (ruta, datos); primero el historial y su índice y al final el archivo principal,
+                      para que una interrupción a mitad nunca deje una cita fuera de ambos.
+        """
+        escrituras = []
+        mes_limite = self._mes_limite_activo()
+
+        # Integrar los meses históricos que aún no están en memoria antes de reescribirlos
+        for cita in list(self._citas):
+            if cita.estado != "pendiente" and self._mes_de(cita.fecha) < mes_limite:
+                self.cargar_mes(self._mes_de(cita.fecha))
+
+        activas = []
+        historicas = {}
+        for cita in self._citas:
+            mes = self._mes_de(cita.fecha)
+            if cita.estado != "pendiente" and mes < mes_limite:
+                historicas.setdefault(mes, []).append(cita)
+            else:
+                activas.append(cita)
+
+        # El índice en memoria solo se actualiza al terminar la escritura (ver `_al_guardar`): si
+        # fallara, el siguiente guardado debe volver a escribir los meses y el índice
+        meses = dict(self._indice_historial)
+        for mes, citas_mes in historicas.items():
+            ids = [cita.id_cita for cita in citas_mes]
+            if set(ids) != set(meses.get(mes, [])):
+                escrituras.append((self._ruta_mes(mes), [self._cita_a_registro(c) for c in citas_mes]))
+                meses[mes] = ids
+
+        ultimo_id = max([c.id_cita for c in self._citas] + [self._ultimo_id_historial or ""], key=clave_id)
+        if meses != self._indice_historial or ultimo_id != self._ultimo_id_historial:
+            escrituras.append((self.indice_historial_path, {'ultimo_id': ultimo_id, 'meses': meses}))
+
+        escrituras.append((self.file_path, [self._cita_a_registro(c) for c in activas]))
+        return escrituras
+
+    def _al_guardar(self, error, resultado):
+        """
+        Además de lo que hace `GestorPersistente._al_guardar`, toma como índice del historial en memoria
+        el que se escribió, y marca como cargados los meses del historial escritos.
+
+        Se hace aquí y no al preparar las escrituras para que, si la escritura falla, el índice en memoria
+        siga correspondiendo a lo que hay en disco.
+        """
+        super()._al_guardar(error, resultado)
+        if isinstance(error, ConflictoEscritura):
+            resultado = error.resultado
+        for ruta, (datos, *_) in (resultado or {}).items():
+            if ruta == self.indice_historial_path:
+                self._cargar_indice_historial(datos or {})
+            elif ruta.parent == self.dir_historial:
+                self._meses_cargados.add(ruta.stem[len("citas_"):])
+
+    def _fusionar(self, ruta, base, propios, ajenos) -> tuple:
+        """
+        Fusiona un archivo de citas con lo que otro proceso guardó en él.
+
+        Los archivos de citas se fusionan registro por registro. En el índice del historial se unen
+        los IDs archivados de cada mes y se conserva el último ID más alto.
+        """
+        if ruta != self.indice_historial_path:
+            return super()._fusionar(ruta, base, propios, ajenos)
+
+        propios = propios or {}
+        meses = {mes: list(ids) for mes, ids in ajenos.get('meses', {}).items()}
+        for mes, ids in propios.get('meses', {}).items():
+            ids_mes = meses.setdefault(mes, [])
+            archivados = set(ids_mes)
+            ids_mes.extend(id_cita for id_cita in ids if id_cita not in archivados)
+        ultimo_id = max(propios.get('ultimo_id') or "", ajenos.get('ultimo_id') or "", key=clave_id) or None
+        fusionado = {'ultimo_id': ultimo_id, 'meses': meses}
+        return fusionado, {} if fusionado == propios else {'indice': fusionado}, []
+
+    def _aplicar_cambios_externos(self, ruta, cambios: dict):
+        """
+        Agrega o actualiza en memoria las citas que otro proceso guardó.
+
+        Las citas existentes se modifican sin reemplazar el objeto (los diagnósticos las referencian).
+        Que una cita desaparezca de un archivo solo significa que se movió al historial o desde él,
+        así que las eliminaciones se ignoran.
+
+            Args:
+                ruta (Path): Archivo de citas (activas o de un mes del historial) o índice del historial.
+                cambios (dict): id_cita -> registro nuevo, o None si se quitó del archivo.
+        """
+        if ruta == self.indice_historial_path:
+            self._cargar_indice_historial(cambios['indice'])
+            return
+
+        for id_cita, cita_data in cambios.items():
+            if cita_data is None:
+                continue
+            cita = self._indice_citas.get(id_cita)
+            if cita is None:
+                self._registro_a_memoria(cita_data)
+                if id_cita in self._indice_citas:
+                    self._publicar(CITA_AGENDADA, cita=self._indice_citas[id_cita])
+                continue
+
+            anterior = (cita.fecha, cita.hora, cita.medico)
+            estado_anterior = cita.estado
+            medico = self.gestor_medicos.buscar_medico(cita_data['id_medico'])
+            if medico and medico is not cita.medico:
+                self._citas_por_medico[cita.medico.id_medico].remove(cita)
+                cita.reasignar_medico(medico)
+                self._citas_por_medico.setdefault(medico.id_medico, []).append(cita)
+            cita.reagendar(cita_data['fecha'], cita_data['hora'])
+            cita._estado = cita_data['estado']
+            self.reindexar_cita(cita)
+
+            if anterior != (cita.fecha, cita.hora, cita.medico):
+                self._publicar_cambio(CITA_REAGENDADA, cita, *anterior)
+            if cita.estado != estado_anterior and cita.estado in ("cancelada", "completada"):
+                self._publicar(CITA_CANCELADA if cita.estado == "cancelada" else CITA_COMPLETADA, cita=cita)
+
+    def listar_citas(self, incluir_historial: bool = False) -> list:
+        """
+        Devuelve la lista de citas registradas.
+
+            Args:
+                incluir_historial (bool): Si es True, carga antes las citas archivadas de meses anteriores.
 
             Returns:
                 list: Lista de objetos Cita registrados en el sistema.
         """
-        return self._citas
\ No newline at end of file
+        if incluir_historial:
+            self.cargar_historial()
+        return self._citas
+
+    def listar_citas_pagina(self, offset: int = 0, limite: int = 50, orden: str = "fecha", cursor: str = None,
+                            incluir_historial: bool = False) -> Pagina:
+        """
+        Devuelve una página de citas.
+
+            Args:
+                offset (int): Citas a saltar.
+                limite (int): Máximo de citas de la página.
+                orden (str): 'id', 'fecha', 'paciente' o 'medico' (estos dos, por fecha dentro de cada uno);
+                             con el prefijo '-' es descendente.
+                cursor (str): Cursor de la página anterior, para continuar después de ella.
+                incluir_historial (bool): Si es True, carga antes las citas archivadas de meses anteriores.
+
+            Returns:
+                Pagina: Página de objetos Cita.
+        """
+        return paginar(self.listar_citas(incluir_historial), self.ordenes_pagina, orden, offset, limite, cursor,
+                       {'fecha': self._recorrer_por_fecha})
+
+    def _recorrer_por_fecha(self, desde: tuple, descendente: bool):
+        """
+        Recorre las citas en el orden de fecha usando el índice de fechas, sin ordenar ni recorrer las demás.
+
+            Args:
+                desde (tuple): Clave de orden por fecha después de la cual empezar, o None para empezar por el inicio.
+                descendente (bool): Si es True, se recorre de la fecha más reciente a la más antigua.
+
+            Returns:
+                iterator: Citas en orden.
+        """
+        fechas = self._fechas_ordenadas()
+        if descendente:
+            posicion = len(fechas) if desde is None else bisect_left(fechas, desde)
+            posiciones = range(posicion - 1, -1, -1)
+        else:
+            posicion = 0 if desde is None else bisect_right(fechas, desde)
+            posiciones = range(posicion, len(fechas))
+        return (self._indice_citas[fechas[posicion][-1]] for posicion in posiciones)
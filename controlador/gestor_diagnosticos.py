@@ -1,36 +1,71 @@
+import heapq
 import json
+import math
+import textwrap
+from collections import Counter
 from pathlib import Path
 from modelo.diagnostico import Diagnostico
 from modelo.cita import Cita
 from utils.validaciones import generar_id
-from shutil import copyfile
+from utils.texto import tokenizar
+from utils.persistencia import escribir_bytes, obtener_diario
+from controlador.gestor_persistente import GestorPersistente
+from utils.paginacion import Pagina, paginar, clave_id, clave_fecha
+from utils.eventos import DIAGNOSTICO_REGISTRADO
+from controlador.unidad_trabajo import unidad_de_trabajo
+from utils.instrumentacion import instrumentada, registrar_bytes
 
-class GestorDiagnosticos:
+@instrumentada()
+class GestorDiagnosticos(GestorPersistente):
     """
      Clase que gestiona las operaciones relacionadas con diagnósticos médicos.
 
          Attributes:
              file_path (Path): Ruta del archivo JSON para almacenamiento de diagnósticos.
-             _diagnosticos (list): Lista de objetos Diagnostico registrados.
+             indice_path (Path): Ruta del índice id_cita -> posición del registro dentro del archivo JSON.
+             _diagnosticos (list): Lista de objetos Diagnostico registrados (se carga en el primer acceso).
+             _cargados (bool): Indica si `_diagnosticos` ya se cargó desde el archivo.
+             _indice_terminos (dict): Índice invertido término -> {id_diagnostico: frecuencia} sobre
+                                      descripción, tratamiento y observaciones.
+             _diario_por_cita (tuple): Diagnósticos del diario indexados por cita, mientras no se cargan
+                                       todos (ver `_diagnosticos_en_diario`).
              gestor_citas (GestorCitas): Referencia al gestor de citas para acceso y actualización.
      """
 
+    nombre_datos = "diagnósticos"
+    clave_registro = "id_diagnostico"
+    # Órdenes disponibles en `listar_diagnosticos_pagina` (todas las claves terminan en el ID para ser estables)
+    ordenes_pagina = {
+        'id': lambda d: clave_id(d.id_diagnostico),
+        'fecha': lambda d: (clave_fecha(d.cita.fecha), d.cita.hora, *clave_id(d.id_diagnostico)),
+    }
+
     def __init__(self, gestor_citas):
         """
-        Inicializa una instancia del gestor de diagnósticos y carga los datos existentes desde el archivo.
+        Inicializa una instancia del gestor de diagnósticos.
+
+        Los diagnósticos no se leen aquí, sino la primera vez que se consultan.
 
             Args:
                 gestor_citas (GestorCitas): Instancia del gestor de citas.
         """
         self.file_path = Path("datos") / 'diagnosticos.json'
+        self.indice_path = self.file_path.with_suffix('.idx.json')
         self._diagnosticos = []
+        self._cargados = False
+        self._indice_posiciones = None
+        self._diario_por_cita = None
+        self._indice_terminos = {}
+        self._diagnosticos_por_id = {}
         self.gestor_citas = gestor_citas
-        self.cargar_datos()
 
-    def registrar_diagnostico(self, descripcion: str, tratamiento: str, observaciones: str, cita: Cita) -> bool:
+    def registrar_diagnostico(self, descripcion: str, tratamiento: str, observaciones: str, cita: Cita):
         """
         Registra un nuevo diagnóstico y actualiza la cita como completada.
 
+        Ambos cambios forman una unidad de trabajo: las citas y los diagnósticos se guardan juntos
+        y, si algo falla, ni la cita ni el diagnóstico quedan modificados en memoria.
+
             Args:
                 descripcion (str): Descripción del diagnóstico.
                 tratamiento (str): Tratamiento sugerido.
@@ -38,44 +73,123 @@ class GestorDiagnosticos:
                 cita (Cita): Cita médica relacionada.
 
             Returns:
-                bool: True si el diagnóstico fue registrado correctamente, False en caso de error.
+                Diagnostico | None: El diagnóstico registrado, o None en caso de error.
         """
+        self._asegurar_cargados()
         try:
-            # Generar ID automático
-            ultimo_id = max([d.id_diagnostico for d in self._diagnosticos], default=None)
-            id_diagnostico = generar_id("DIA", ultimo_id)
-
-            # Crear el diagnóstico
-            diagnostico = Diagnostico(
-                id_diagnostico=id_diagnostico,
-                descripcion=descripcion,
-                tratamiento=tratamiento,
-                observaciones=observaciones,
-                cita=cita
-            )
-
-            # Marcar la cita como completada
-            cita.completar()
-            self.gestor_citas.guardar_datos()
-
-            # Guardar el diagnóstico
-            self._diagnosticos.append(diagnostico)
-            self.guardar_datos()
-            return True
+            with unidad_de_trabajo():
+                # Generar ID automático
+                ultimo_id = max([d.id_diagnostico for d in self._diagnosticos], key=clave_id, default=None)
+                id_diagnostico = generar_id("DIA", ultimo_id)
+
+                # Crear el diagnóstico
+                diagnostico = Diagnostico(
+                    id_diagnostico=id_diagnostico,
+                    descripcion=descripcion,
+                    tratamiento=tratamiento,
+                    observaciones=observaciones,
+                    cita=cita
+                )
+
+                # Marcar la cita como completada
+                self.gestor_citas.completar_cita(cita)
+
+                # Guardar el diagnóstico
+                self._diagnosticos.append(diagnostico)
+                self._al_deshacer(lambda: self._quitar_de_memoria(diagnostico))
+                self._indexar(diagnostico)
+                self.persistir_cambios()
+                self._publicar(DIAGNOSTICO_REGISTRADO, diagnostico=diagnostico)
+            return diagnostico
 
         except Exception as e:
             print(f"Error al registrar diagnóstico: {e}")
-            return False
+            return None
+
+    def _quitar_de_memoria(self, diagnostico: Diagnostico):
+        """
+        Quita un diagnóstico de la lista y del índice de términos (al deshacer su registro).
+        """
+        self._diagnosticos.remove(diagnostico)
+        self._diagnosticos_por_id.pop(diagnostico.id_diagnostico, None)
+        for termino, apariciones in list(self._indice_terminos.items()):
+            apariciones.pop(diagnostico.id_diagnostico, None)
+            # Un término sin apariciones no debe quedar en el índice (su idf dividiría por cero)
+            if not apariciones:
+                del self._indice_terminos[termino]
+
+    def buscar_diagnosticos(self, consulta: str, limite: int = 50) -> list:
+        """
+        Busca diagnósticos que contengan los términos de la consulta en su descripción,
+        tratamiento u observaciones, sin distinguir mayúsculas ni acentos.
+
+        Los resultados se ordenan primero por la cantidad de términos distintos encontrados y
+        después por relevancia (frecuencia del término ponderada por lo poco común que es).
+
+            Args:
+                consulta (str): Texto a buscar (por ejemplo, "migraña amoxicilina").
+                limite (int): Número máximo de resultados.
+
+            Returns:
+                list: Lista de objetos Diagnostico ordenada de mayor a menor relevancia.
+        """
+        self._asegurar_cargados()
+        total = len(self._diagnosticos_por_id)
+        presentes = [(termino, self._indice_terminos[termino]) for termino in set(tokenizar(consulta))
+                     if self._indice_terminos.get(termino)]
+        if not presentes:
+            return []
+
+        idf = {termino: math.log(1 + total / len(apariciones)) for termino, apariciones in presentes}
+
+        def puntaje(id_diagnostico):
+            return sum((1 + math.log(apariciones[id_diagnostico])) * idf[termino]
+                       for termino, apariciones in presentes if id_diagnostico in apariciones)
+
+        # Primero los que contienen todos los términos: intersección partiendo de la lista más corta
+        presentes.sort(key=lambda par: len(par[1]))
+        completos = set(presentes[0][1]).intersection(*(apariciones.keys() for _, apariciones in presentes[1:]))
+        mejores = heapq.nlargest(limite, completos, key=puntaje)
+
+        # Si no alcanzan, se completan con los que contienen solo algunos de los términos
+        if len(mejores) < limite and len(presentes) > 1:
+            coincidencias = Counter()
+            for _, apariciones in presentes:
+                coincidencias.update(apariciones.keys())
+            parciales = (id_diag for id_diag in coincidencias if id_diag not in completos)
+            mejores += heapq.nlargest(limite - len(mejores), parciales,
+                                      key=lambda id_diag: (coincidencias[id_diag], puntaje(id_diag)))
+
+        return [self._diagnosticos_por_id[id_diagnostico] for id_diagnostico in mejores]
+
+    def _indexar(self, diagnostico: Diagnostico):
+        """
+        Agrega un diagnóstico al índice invertido de términos.
 
-    def obtener_diagnosticos_completos(self) -> list:
+            Args:
+                diagnostico (Diagnostico): Diagnóstico a indexar.
+        """
+        self._diagnosticos_por_id[diagnostico.id_diagnostico] = diagnostico
+        texto = " ".join((diagnostico.descripcion, diagnostico.tratamiento, diagnostico.observaciones))
+        for termino, frecuencia in Counter(tokenizar(texto)).items():
+            self._indice_terminos.setdefault(termino, {})[diagnostico.id_diagnostico] = frecuencia
+
+    def obtener_diagnosticos_completos(self, diagnosticos: list = None) -> list:
         """
-        Obtiene todos los diagnósticos con información completa.
+        Obtiene los diagnósticos con información completa.
+
+            Args:
+                diagnosticos (list): Diagnósticos a incluir (por ejemplo, el resultado de una búsqueda).
+                                     Si no se indica, se incluyen todos.
 
             Returns:
                 list: Lista de diccionarios con toda la información de cada diagnóstico
         """
+        self._asegurar_cargados()
+        if diagnosticos is None:
+            diagnosticos = self._diagnosticos
         diagnosticos_completos = []
-        for diagnostico in self._diagnosticos:
+        for diagnostico in diagnosticos:
             cita = diagnostico.cita
             diagnosticos_completos.append({
                 'id_diagnostico': diagnostico.id_diagnostico,
@@ -98,6 +212,7 @@ class GestorDiagnosticos:
             Returns:
                 list: Lista de objetos Diagnostico correspondientes al médico.
         """
+        self._asegurar_cargados()
         return [d for d in self._diagnosticos if d.cita.medico.id_medico == id_medico]
 
     def obtener_diagnosticos_por_paciente(self, id_paciente: str) -> list:
@@ -110,59 +225,339 @@ class GestorDiagnosticos:
             Returns:
                 list: Lista de diagnósticos del paciente
         """
+        self._asegurar_cargados()
         return [d for d in self._diagnosticos if d.cita.paciente.id_paciente == id_paciente]
 
+    def obtener_diagnostico_por_cita(self, id_cita: str):
+        """
+        Obtiene el diagnóstico registrado para una cita.
+
+        Si los diagnósticos aún no están en memoria, lee únicamente el registro de esa cita
+        usando el índice de posiciones, sin interpretar el archivo completo. El índice solo cubre
+        el archivo, así que antes se busca la cita entre los diagnósticos que el diario guardó después.
+
+            Args:
+                id_cita (str): ID de la cita.
+
+            Returns:
+                Diagnostico | None: Diagnóstico de la cita, o None si no tiene.
+        """
+        if self._cargados:
+            return next((d for d in reversed(self._diagnosticos) if d.cita.id_cita == id_cita), None)
+        diag_data = self.obtener_registro_por_cita(id_cita)
+        return self._registro_a_diagnostico(diag_data) if diag_data else None
+
+    def obtener_registro_por_cita(self, id_cita: str):
+        """
+        Obtiene el registro del diagnóstico de una cita tal como se guarda en el archivo, sin enlazarlo
+        con su cita (así no se carga la cita si está en el historial).
+
+        Como `obtener_diagnostico_por_cita`, si los diagnósticos aún no están en memoria no se cargan:
+        se lee solo ese registro del diario o, con el índice de posiciones, del archivo.
+
+            Args:
+                id_cita (str): ID de la cita.
+
+            Returns:
+                dict | None: Registro del diagnóstico, o None si la cita no tiene.
+        """
+        if self._cargados:
+            diagnostico = self.obtener_diagnostico_por_cita(id_cita)
+            return self._diagnostico_a_registro(diagnostico) if diagnostico else None
+
+        por_cita, ultimos, reemplazado = self._diagnosticos_en_diario()
+        if id_cita in por_cita:
+            return por_cita[id_cita]
+        if reemplazado:
+            return None
+
+        posicion = self._obtener_indice_posiciones().get(id_cita)
+        if not posicion:
+            return None
+
+        inicio, longitud = posicion
+        try:
+            with open(self.file_path, 'rb') as archivo:
+                archivo.seek(inicio)
+                contenido = archivo.read(longitud)
+            registrar_bytes('leidos', self.file_path, len(contenido))
+            diag_data = json.loads(contenido.decode('utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error al leer diagnóstico de la cita {id_cita}: {e}")
+            return None
+        # El diario tiene una versión posterior de este diagnóstico (eliminado o de otra cita)
+        if diag_data['id_diagnostico'] in ultimos:
+            return None
+        return diag_data
+
+    def _diagnosticos_en_diario(self) -> tuple:
+        """
+        Indexa por cita los diagnósticos que el diario guardó después del archivo.
+
+        Se conserva lo ya recorrido junto con la posición del diario, de modo que cada llamada solo
+        recorre las operaciones nuevas. Si el diario se compactó, el archivo cambió: se vuelve a
+        recorrer desde el inicio y se descarta el índice de posiciones.
+
+            Returns:
+                tuple: (id_cita -> registro del diagnóstico, id_diagnostico -> id_cita de su última
+                       versión en el diario o None si se eliminó, True si el diario reemplazó el
+                       archivo completo y no hay que consultarlo).
+        """
+        diario = obtener_diario()
+        operaciones = None
+        if self._diario_por_cita is not None:
+            posicion, por_cita, ultimos, reemplazado = self._diario_por_cita
+            operaciones, posicion = diario.operaciones(self.file_path, posicion)
+        if operaciones is None:
+            operaciones, posicion = diario.operaciones(self.file_path)
+            por_cita, ultimos, reemplazado = {}, {}, False
+            self._indice_posiciones = None
+
+        for operacion in operaciones:
+            if 'contenido' in operacion:
+                por_cita = {registro['id_cita']: registro for registro in operacion['contenido'] or []}
+                ultimos = {registro['id_diagnostico']: registro['id_cita'] for registro in operacion['contenido'] or []}
+                reemplazado = True
+                continue
+            for registro in operacion['registros']:
+                anterior = ultimos.get(registro['id_diagnostico'])
+                if anterior is not None and anterior != registro['id_cita']:
+                    por_cita.pop(anterior, None)
+                por_cita[registro['id_cita']] = registro
+                ultimos[registro['id_diagnostico']] = registro['id_cita']
+            for id_diagnostico in operacion['eliminados']:
+                anterior = ultimos.get(id_diagnostico)
+                if anterior is not None:
+                    por_cita.pop(anterior, None)
+                ultimos[id_diagnostico] = None
+        self._diario_por_cita = (posicion, por_cita, ultimos, reemplazado)
+        return por_cita, ultimos, reemplazado
+
+    def _asegurar_cargados(self):
+        """
+        Carga los diagnósticos desde el archivo la primera vez que se necesitan.
+        """
+        if not self._cargados:
+            self.cargar_datos()
+
     def cargar_datos(self):
         """
         Carga los datos de diagnósticos desde un archivo JSON,
         reconstruyendo las relaciones con las citas asociadas.
         """
-        self._diagnosticos.clear()
+        self.cargar_desde_datos(self.leer_datos())
+
+    def leer_datos(self) -> list:
+        """
+        Lee y decodifica el archivo `diagnosticos.json`, sin construir los objetos.
+
+            Returns:
+                list: Registros de los diagnósticos (vacía si el archivo no existe o no se pudo leer).
+        """
         try:
-            if self.file_path.exists():
-                with open(self.file_path, 'r', encoding='utf-8') as archivo:
-                    datos = json.load(archivo)
-
-                    for diag_data in datos:
-                        # Buscar la cita asociada
-                        cita = self.gestor_citas.buscar_cita(diag_data['id_cita'])
-
-                        if cita:
-                            diagnostico = Diagnostico(
-                                id_diagnostico=diag_data['id_diagnostico'],
-                                descripcion=diag_data['descripcion'],
-                                tratamiento=diag_data['tratamiento'],
-                                observaciones=diag_data['observaciones'],
-                                cita=cita
-                            )
-                            self._diagnosticos.append(diagnostico)
+            return self._leer_archivo(self.file_path) or []
         except (json.JSONDecodeError, FileNotFoundError) as e:
             print(f"Error al cargar diagnósticos: {e}")
+        return []
+
+    def cargar_desde_datos(self, datos: list):
+        """
+        Construye los diagnósticos, enlazándolos con sus citas, a partir de los registros ya leídos.
+
+            Args:
+                datos (list): Registros devueltos por `leer_datos`.
+        """
+        self._diagnosticos.clear()
+        self._indice_terminos = {}
+        self._diagnosticos_por_id = {}
+        for diag_data in datos:
+            diagnostico = self._registro_a_diagnostico(diag_data)
+            if diagnostico:
+                self._diagnosticos.append(diagnostico)
+                self._indexar(diagnostico)
+        self._cargados = True
+
+    def _registro_a_diagnostico(self, diag_data: dict):
+        """
+        Reconstruye un Diagnostico a partir de su registro JSON, enlazándolo con su cita.
+
+            Args:
+                diag_data (dict): Registro del diagnóstico tal como se guarda en el archivo.
+
+            Returns:
+                Diagnostico | None: Diagnóstico reconstruido, o None si su cita no existe.
+        """
+        # Buscar la cita asociada
+        cita = self.gestor_citas.buscar_cita(diag_data['id_cita'])
+
+        if not cita:
+            return None
+        return Diagnostico(
+            id_diagnostico=diag_data['id_diagnostico'],
+            descripcion=diag_data['descripcion'],
+            tratamiento=diag_data['tratamiento'],
+            observaciones=diag_data['observaciones'],
+            cita=cita
+        )
 
-    def guardar_datos(self):
+    def _obtener_indice_posiciones(self) -> dict:
         """
-        Guarda la lista de diagnósticos en el archivo JSON.
+        Devuelve el índice id_cita -> [inicio, longitud] en bytes de cada registro del archivo.
+
+        El índice se lee de disco si corresponde al archivo actual (mismo tamaño y fecha de modificación);
+        si no, se reconstruye recorriendo el archivo y se vuelve a guardar.
+
+            Returns:
+                dict: Índice de posiciones por ID de cita.
         """
+        if self._indice_posiciones is not None:
+            return self._indice_posiciones
+
+        if not self.file_path.exists():
+            return {}
+
+        estado = self.file_path.stat()
         try:
-            datos = []
-            for diagnostico in self._diagnosticos:
-                datos.append({
-                    'id_diagnostico': diagnostico.id_diagnostico,
-                    'descripcion': diagnostico.descripcion,
-                    'tratamiento': diagnostico.tratamiento,
-                    'observaciones': diagnostico.observaciones,
-                    'id_cita': diagnostico.cita.id_cita
-                })
-            # Crear respaldo antes de sobrescribir el archivo
-            if self.file_path.exists():
-                copia = self.file_path.with_suffix('.json.bak')
-                copyfile(self.file_path, copia)
-
-            # Guardar en el archivo original
-            with open(self.file_path, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=4)
-        except Exception as e:
-            print(f"Error al guardar diagnósticos: {e}")
+            with open(self.indice_path, 'r', encoding='utf-8') as archivo:
+                indice = json.load(archivo)
+            if indice.get('tamano') == estado.st_size and indice.get('mtime_ns') == estado.st_mtime_ns:
+                self._indice_posiciones = indice['citas']
+                return self._indice_posiciones
+        except (OSError, json.JSONDecodeError, KeyError):
+            pass
+
+        self._indice_posiciones = self._reconstruir_indice_posiciones()
+        self._guardar_indice_posiciones()
+        return self._indice_posiciones
+
+    def _reconstruir_indice_posiciones(self) -> dict:
+        """
+        Recorre el archivo de diagnósticos y calcula la posición en bytes de cada registro.
+
+            Returns:
+                dict: Índice id_cita -> [inicio, longitud].
+        """
+        posiciones = {}
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as archivo:
+                texto = archivo.read()
+        except OSError as e:
+            print(f"Error al indexar diagnósticos: {e}")
+            return posiciones
+
+        decodificador = json.JSONDecoder()
+        pos = texto.find('[') + 1
+        pos_bytes = len(texto[:pos].encode('utf-8'))
+        while pos > 0:
+            # Saltar espacios y separadores entre registros
+            siguiente = pos
+            while siguiente < len(texto) and texto[siguiente] in ' \t\r\n,':
+                siguiente += 1
+            pos_bytes += len(texto[pos:siguiente].encode('utf-8'))
+            pos = siguiente
+            if pos >= len(texto) or texto[pos] == ']':
+                break
+            try:
+                diag_data, fin = decodificador.raw_decode(texto, pos)
+            except json.JSONDecodeError as e:
+                print(f"Error al indexar diagnósticos: {e}")
+                break
+            longitud = len(texto[pos:fin].encode('utf-8'))
+            posiciones[diag_data['id_cita']] = [pos_bytes, longitud]
+            pos_bytes += longitud
+            pos = fin
+        return posiciones
+
+    def _guardar_indice_posiciones(self):
+        """
+        Guarda el índice de posiciones junto con el tamaño y la fecha de modificación del archivo indexado.
+        """
+        try:
+            estado = self.file_path.stat()
+            with open(self.indice_path, 'w', encoding='utf-8') as archivo:
+                json.dump({
+                    'tamano': estado.st_size,
+                    'mtime_ns': estado.st_mtime_ns,
+                    'citas': self._indice_posiciones
+                }, archivo)
+        except OSError as e:
+            print(f"Error al guardar el índice de diagnósticos: {e}")
+
+    def _preparar_escrituras(self) -> list:
+        """
+        Serializa los diagnósticos para guardarlos en el archivo JSON.
+
+            Returns:
+                list: Tupla (ruta, registros) del archivo de diagnósticos.
+        """
+        registros = [self._diagnostico_a_registro(diagnostico) for diagnostico in self._diagnosticos]
+        return [(self.file_path, registros)]
+
+    @staticmethod
+    def _diagnostico_a_registro(diagnostico: Diagnostico) -> dict:
+        """
+        Convierte un diagnóstico en su registro JSON.
+        """
+        return {
+            'id_diagnostico': diagnostico.id_diagnostico,
+            'descripcion': diagnostico.descripcion,
+            'tratamiento': diagnostico.tratamiento,
+            'observaciones': diagnostico.observaciones,
+            'id_cita': diagnostico.cita.id_cita
+        }
+
+    def _escribir_archivo(self, ruta, registros: list):
+        """
+        Escribe el archivo de diagnósticos completo (al compactar el diario) y actualiza el índice de posiciones.
+
+        Cada registro se escribe por separado para conocer su posición en bytes; el archivo resultante
+        tiene el mismo formato que `json.dump(..., indent=4)`.
+
+            Args:
+                ruta (Path): Ruta del archivo de diagnósticos.
+                registros (list): Registros preparados por `_preparar_escrituras` (ya fusionados).
+        """
+        contenido = bytearray(b"[")
+        posiciones = {}
+        for i, registro in enumerate(registros):
+            contenido += b",\n    " if i else b"\n    "
+            texto = textwrap.indent(json.dumps(registro, indent=4), "    ")[4:].encode('utf-8')
+            posiciones[registro['id_cita']] = [len(contenido), len(texto)]
+            contenido += texto
+        contenido += b"\n]" if registros else b"]"
+
+        escribir_bytes(ruta, bytes(contenido))
+
+        self._indice_posiciones = posiciones
+        self._guardar_indice_posiciones()
+
+    def _aplicar_cambios_externos(self, ruta, cambios: dict):
+        """
+        Agrega, reemplaza o elimina en memoria los diagnósticos que otro proceso cambió.
+
+            Args:
+                ruta (Path): Archivo de diagnósticos.
+                cambios (dict): id_diagnostico -> registro nuevo, o None si se eliminó.
+        """
+        # El índice de posiciones del archivo ya no corresponde; se reconstruye cuando se necesite
+        self._indice_posiciones = None
+        self._diagnosticos = [d for d in self._diagnosticos if d.id_diagnostico not in cambios]
+        nuevos = []
+        for id_diagnostico, diag_data in cambios.items():
+            if diag_data is None:
+                continue
+            diagnostico = self._registro_a_diagnostico(diag_data)
+            if diagnostico:
+                self._diagnosticos.append(diagnostico)
+                if id_diagnostico not in self._diagnosticos_por_id:
+                    nuevos.append(diagnostico)
+
+        self._indice_terminos = {}
+        self._diagnosticos_por_id = {}
+        for diagnostico in self._diagnosticos:
+            self._indexar(diagnostico)
+        for diagnostico in nuevos:
+            self._publicar(DIAGNOSTICO_REGISTRADO, diagnostico=diagnostico)
 
     def listar_diagnosticos(self) -> list:
         """
@@ -171,4 +566,21 @@ class GestorDiagnosticos:
             Returns:
                 list: Lista de objetos Diagnostico registrados en el sistema
         """
-        return self._diagnosticos
\ No newline at end of file
+        self._asegurar_cargados()
+        return self._diagnosticos
+
+    def listar_diagnosticos_pagina(self, offset: int = 0, limite: int = 50, orden: str = "id",
+                                   cursor: str = None) -> Pagina:
+        """
+        Devuelve una página de diagnósticos.
+
+            Args:
+                offset (int): Diagnósticos a saltar.
+                limite (int): Máximo de diagnósticos de la página.
+                orden (str): 'id' o 'fecha' (fecha de la cita); con el prefijo '-' es descendente.
+                cursor (str): Cursor de la página anterior, para continuar después de ella.
+
+            Returns:
+                Pagina: Página de objetos Diagnostico.
+        """
+        return paginar(self.listar_diagnosticos(), self.ordenes_pagina, orden, offset, limite, cursor)
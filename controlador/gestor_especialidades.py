@@ -1,63 +1,111 @@
-import json
 from pathlib import Path
 from modelo.especialidad import Especialidad
-from shutil import copyfile
+from controlador.gestor_persistente import GestorPersistente
+from utils.paginacion import Pagina, paginar
+from utils.texto import normalizar_texto
+from utils.instrumentacion import instrumentada
 
-class GestorEspecialidades:
+@instrumentada()
+class GestorEspecialidades(GestorPersistente):
     """
     Gestor para operaciones CRUD de especialidades médicas.
 
+    El gestor es dueño de los objetos Especialidad: hay uno solo por nombre, y los médicos (ver
+    GestorMedicos) apuntan a ese mismo objeto en lugar de tener cada uno su propia copia. Si cambia la
+    descripción de una especialidad, se modifica el objeto existente, así que todos los médicos la ven.
+
         Attributes:
             file_path (Path): Ruta del archivo JSON que almacena las especialidades.
             _especialidades (list): Lista de objetos Especialidad cargados en memoria.
+            _por_nombre (dict): Nombre -> Especialidad de todas las especialidades entregadas, incluidas
+                                las de médicos que no están (o ya no están) en el archivo de especialidades.
     """
 
-    def __init__(self):
+    nombre_datos = "especialidades"
+    ensure_ascii = False
+    clave_registro = "nombre"
+    # Órdenes disponibles en `listar_especialidades_pagina` (el nombre es único)
+    ordenes_pagina = {
+        'nombre': lambda e: (normalizar_texto(e.nombre), e.nombre),
+    }
+
+    def __init__(self, cargar: bool = True):
         """
         Inicializa el gestor de especialidades y carga los datos desde el archivo JSON.
+
+            Args:
+                cargar (bool): Si es False, no se lee el archivo (los datos se cargan después con `cargar_desde_datos`).
         """
         self.file_path = Path("datos") / "especialidades.json"
         self._especialidades = []
-        self.cargar_datos()
+        self._por_nombre = {}
+        if cargar:
+            self.cargar_datos()
 
     def cargar_datos(self):
         """
         Carga las especialidades desde el archivo JSON, si existe.
         Si el archivo no existe o contiene errores, imprime un mensaje de error.
         """
-        self._especialidades.clear()
+        self.cargar_desde_datos(self.leer_datos())
+
+    def leer_datos(self) -> list:
+        """
+        Lee y decodifica el archivo de especialidades, sin construir los objetos.
+
+            Returns:
+                list: Registros de las especialidades (vacía si el archivo no existe o no se pudo leer).
+        """
         try:
-            if self.file_path.exists():
-                with open(self.file_path, 'r', encoding='utf-8') as f:
-                    datos = json.load(f)
-                    self._especialidades = [
-                        Especialidad(esp['nombre'], esp['descripcion'])
-                        for esp in datos
-                    ]
+            return self._leer_archivo(self.file_path) or []
         except Exception as e:
             print(f"Error cargando especialidades: {e}")
+        return []
 
-    def guardar_datos(self):
+    def cargar_desde_datos(self, datos: list):
         """
-        Guarda las especialidades en el archivo JSON.
-        Si ocurre un error durante el proceso de escritura, imprime un mensaje de error.
+        Construye los objetos Especialidad a partir de los registros ya leídos, reutilizando los que
+        ya se entregaron a los médicos.
+
+            Args:
+                datos (list): Registros devueltos por `leer_datos`.
         """
+        self._especialidades.clear()
         try:
-            Path("datos").mkdir(exist_ok=True)
-            # Crear respaldo antes de sobrescribir el archivo
-            if self.file_path.exists():
-                copia = self.file_path.with_suffix('.json.bak')
-                copyfile(self.file_path, copia)
-
-            # Guardar en el archivo original
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(
-                    [{"nombre": e.nombre, "descripcion": e.descripcion}
-                     for e in self._especialidades],
-                    f, indent=4, ensure_ascii=False
-                )
+            self._especialidades = [
+                self._internar(esp['nombre'], esp['descripcion'])
+                for esp in datos
+            ]
         except Exception as e:
-            print(f"Error guardando especialidades: {e}")
+            print(f"Error cargando especialidades: {e}")
+
+    def _preparar_escrituras(self) -> list:
+        """
+        Serializa las especialidades para guardarlas en el archivo JSON.
+
+            Returns:
+                list: Tupla (ruta, datos) del archivo de especialidades.
+        """
+        return [(self.file_path, [{"nombre": e.nombre, "descripcion": e.descripcion}
+                                  for e in self._especialidades])]
+
+    def _aplicar_cambios_externos(self, ruta, cambios: dict):
+        """
+        Agrega, reemplaza o elimina en memoria las especialidades que otro proceso cambió.
+
+            Args:
+                ruta (Path): Archivo de especialidades.
+                cambios (dict): nombre -> registro nuevo, o None si se eliminó.
+        """
+        posiciones = {especialidad.nombre: i for i, especialidad in enumerate(self._especialidades)}
+        for nombre, esp in cambios.items():
+            if esp is not None:
+                especialidad = self._internar(esp['nombre'], esp['descripcion'])
+                if nombre not in posiciones:
+                    self._especialidades.append(especialidad)
+        eliminadas = {nombre for nombre, esp in cambios.items() if esp is None}
+        if eliminadas:
+            self._especialidades = [e for e in self._especialidades if e.nombre not in eliminadas]
 
     def agregar_especialidad(self, nombre: str, descripcion: str) -> bool:
         """
@@ -71,11 +119,50 @@ class GestorEspecialidades:
                 bool: True si se añadió correctamente, False si ya existía.
         """
         if not self.buscar_especialidad(nombre):
-            self._especialidades.append(Especialidad(nombre, descripcion))
-            self.guardar_datos()
+            anteriores = self._especialidades.copy()
+            existente = self._por_nombre.get(nombre)
+            descripcion_anterior = existente.descripcion if existente else None
+            self._especialidades.append(self._internar(nombre, descripcion))
+
+            def deshacer():
+                self._especialidades = anteriores
+                if existente is not None:
+                    existente.cambiar_descripcion(descripcion_anterior)
+            self._al_deshacer(deshacer)
+            self.persistir_cambios()
             return True
         return False
 
+    def obtener_especialidad(self, nombre: str, descripcion: str = "") -> Especialidad:
+        """
+        Devuelve el objeto Especialidad compartido con ese nombre, para que los médicos apunten a él.
+
+        Si la especialidad no existe (por ejemplo, un médico guardado con una especialidad que ya no
+        está en el archivo), se crea con la descripción indicada, sin agregarla a la lista de
+        especialidades. Si ya existe, se conserva su descripción.
+
+            Args:
+                nombre (str): Nombre de la especialidad.
+                descripcion (str): Descripción a usar solo si la especialidad no existe.
+
+            Returns:
+                Especialidad: Objeto compartido de la especialidad.
+        """
+        especialidad = self._por_nombre.get(nombre)
+        if especialidad is None:
+            especialidad = self._por_nombre[nombre] = Especialidad(nombre, descripcion)
+        return especialidad
+
+    def _internar(self, nombre: str, descripcion: str) -> Especialidad:
+        """
+        Devuelve el objeto compartido de una especialidad con la descripción indicada, actualizando
+        la del objeto si ya existía.
+        """
+        especialidad = self.obtener_especialidad(nombre, descripcion)
+        if especialidad.descripcion != descripcion:
+            especialidad.cambiar_descripcion(descripcion)
+        return especialidad
+
     def buscar_especialidad(self, nombre: str) -> Especialidad:
         """
         Busca una especialidad por su nombre.
@@ -97,6 +184,22 @@ class GestorEspecialidades:
         """
         return self._especialidades.copy()
 
+    def listar_especialidades_pagina(self, offset: int = 0, limite: int = 50, orden: str = "nombre",
+                                     cursor: str = None) -> Pagina:
+        """
+        Devuelve una página de especialidades.
+
+            Args:
+                offset (int): Especialidades a saltar.
+                limite (int): Máximo de especialidades de la página.
+                orden (str): 'nombre'; con el prefijo '-' es descendente.
+                cursor (str): Cursor de la página anterior, para continuar después de ella.
+
+            Returns:
+                Pagina: Página de objetos Especialidad.
+        """
+        return paginar(self._especialidades, self.ordenes_pagina, orden, offset, limite, cursor)
+
     def eliminar_especialidad(self, nombre: str) -> bool:
         """
         Elimina una especialidad por su nombre.
@@ -107,9 +210,10 @@ class GestorEspecialidades:
             Returns:
                 bool: True si se eliminó correctamente, False si no se encontró.
         """
-        initial_len = len(self._especialidades)
+        anteriores = self._especialidades
         self._especialidades = [e for e in self._especialidades if e.nombre != nombre]
-        if len(self._especialidades) < initial_len:
-            self.guardar_datos()
+        if len(self._especialidades) < len(anteriores):
+            self._al_deshacer(lambda: setattr(self, '_especialidades', anteriores))
+            self.persistir_cambios()
             return True
         return False
\ No newline at end of file
@@ -1,7 +1,10 @@
 from datetime import datetime
 from collections import defaultdict
+from utils.eventos import CITA_AGENDADA, CITA_REAGENDADA
+from utils.instrumentacion import instrumentada
 
 
+@instrumentada()
 class GestorEstadisticas:
     """
     Clase que gestiona las operaciones estadísticas del sistema.
@@ -11,8 +14,92 @@ class GestorEstadisticas:
     - Médico más solicitado
     - Paciente con más citas
     - Promedio de atención mensual
+
+    Si se conecta a un bus de eventos, los conteos de citas se calculan una sola vez y después se
+    actualizan con cada cita agendada o reagendada, en lugar de recorrer todas las citas (incluido
+    el historial) en cada consulta.
+
+        Attributes:
+            _conteos (dict): Conteos de citas por 'especialidad', 'medico', 'paciente' y 'mes', o None
+                             si aún no se calculan (o no hay bus de eventos).
+            _gestor_conteos (GestorCitas): Gestor de citas del que se calcularon los conteos.
     """
 
+    def __init__(self, bus_eventos=None):
+        """
+        Inicializa el gestor de estadísticas.
+
+            Args:
+                bus_eventos (BusEventos): Bus de eventos de los gestores, o None para recalcular
+                                          las estadísticas en cada consulta.
+        """
+        self._conteos = None
+        self._gestor_conteos = None
+        self._conectado = False
+        if bus_eventos is not None:
+            self.conectar(bus_eventos)
+
+    def conectar(self, bus_eventos):
+        """
+        Se suscribe a los eventos de citas para mantener los conteos al día.
+
+            Args:
+                bus_eventos (BusEventos): Bus en el que publica el gestor de citas.
+        """
+        bus_eventos.suscribir(CITA_AGENDADA, self._al_agendar_cita)
+        bus_eventos.suscribir(CITA_REAGENDADA, self._al_reagendar_cita)
+        self._conectado = True
+
+    def _obtener_conteos(self, gestor_citas) -> dict:
+        """
+        Devuelve los conteos de citas, calculándolos si aún no se tienen para este gestor de citas.
+        """
+        if self._conteos is not None and self._gestor_conteos is gestor_citas:
+            return self._conteos
+
+        conteos = {campo: defaultdict(int) for campo in ('especialidad', 'medico', 'paciente', 'mes')}
+        for cita in gestor_citas.listar_citas(incluir_historial=True):
+            self._contar(conteos, cita.medico, cita.paciente.id_paciente, cita.fecha, 1)
+        if self._conectado:
+            self._conteos = conteos
+            self._gestor_conteos = gestor_citas
+        return conteos
+
+    @staticmethod
+    def _contar(conteos: dict, medico, id_paciente: str, fecha: str, cantidad: int):
+        """
+        Suma (o resta, con cantidad negativa) una cita a los conteos.
+        """
+        fecha = datetime.strptime(fecha, "%d/%m/%Y")
+        claves = {
+            'especialidad': medico.especialidad.nombre,
+            'medico': medico.id_medico,
+            'paciente': id_paciente,
+            'mes': f"{fecha.month}/{fecha.year}",
+        }
+        for campo, clave in claves.items():
+            conteos[campo][clave] += cantidad
+            if not conteos[campo][clave]:
+                del conteos[campo][clave]
+
+    def _al_agendar_cita(self, evento):
+        """
+        Suma una cita nueva a los conteos ya calculados.
+        """
+        if self._conteos is not None:
+            cita = evento['cita']
+            self._contar(self._conteos, cita.medico, cita.paciente.id_paciente, cita.fecha, 1)
+
+    def _al_reagendar_cita(self, evento):
+        """
+        Mueve una cita reagendada (o reasignada a otro médico) de su mes y médico anteriores a los nuevos.
+        """
+        if self._conteos is not None:
+            cita = evento['cita']
+            self._contar(self._conteos, evento['medico_anterior'], cita.paciente.id_paciente,
+                         evento['fecha_anterior'], -1)
+            self._contar(self._conteos, cita.medico, cita.paciente.id_paciente, cita.fecha, 1)
+
     def calcular_consultas_por_especialidad(self, gestor_medicos, gestor_citas) -> dict:
         """
         Calcula el número de consultas realizadas por cada especialidad médica.
@@ -24,13 +111,7 @@ class GestorEstadisticas:
             Returns:
                 dict: Diccionario donde las claves son nombres de especialidades y los valores son el número de consultas.
         """
-        estadisticas = defaultdict(int)
-
-        for cita in gestor_citas.listar_citas():
-            especialidad = cita.medico.especialidad.nombre
-            estadisticas[especialidad] += 1
-
-        return dict(estadisticas)
+        return dict(self._obtener_conteos(gestor_citas)['especialidad'])
 
     def medico_mas_solicitado(self, gestor_medicos, gestor_citas):
         """
@@ -44,10 +125,7 @@ class GestorEstadisticas:
                 tuple: Una tupla con el objeto Medico más solicitado y el número de citas asignadas.
                        Si no hay datos, devuelve (None, 0).
         """
-        medicos_citas = {}
-        for cita in gestor_citas.listar_citas():
-            medico_id = cita.medico.id_medico
-            medicos_citas[medico_id] = medicos_citas.get(medico_id, 0) + 1
+        medicos_citas = self._obtener_conteos(gestor_citas)['medico']
 
         if not medicos_citas:
             return None, 0
@@ -69,10 +147,7 @@ class GestorEstadisticas:
                 tuple: Una tupla con el objeto Paciente que tiene más citas y el número de citas.
                        Si no hay datos, devuelve (None, 0).
         """
-        pacientes_citas = {}
-        for cita in gestor_citas.listar_citas():
-            paciente_id = cita.paciente.id_paciente
-            pacientes_citas[paciente_id] = pacientes_citas.get(paciente_id, 0) + 1
+        pacientes_citas = self._obtener_conteos(gestor_citas)['paciente']
 
         if not pacientes_citas:
             return None, 0
@@ -84,7 +159,7 @@ class GestorEstadisticas:
 
     def promedio_atencion_mensual(self, gestor_citas) -> float:
         """
-        Calcula el promedio de citas completadas o pendientes por mes.
+        Calcula el promedio de citas por mes (se cuentan todas las citas registradas).
 
             Args:
                 gestor_citas: Instancia del gestor de citas.
@@ -92,13 +167,7 @@ class GestorEstadisticas:
             Returns:
                 float: Promedio de citas por mes. Devuelve 0.0 si no hay datos.
         """
-        citas_por_mes = defaultdict(int)
-
-        for cita in gestor_citas.listar_citas():
-            if cita.estado == "completada" or "pendiente":
-                fecha = datetime.strptime(cita.fecha, "%d/%m/%Y")
-                mes_anio = f"{fecha.month}/{fecha.year}"
-                citas_por_mes[mes_anio] += 1
+        citas_por_mes = self._obtener_conteos(gestor_citas)['mes']
 
         if not citas_por_mes:
             return 0.0
@@ -106,4 +175,4 @@ class GestorEstadisticas:
         total_citas = sum(citas_por_mes.values())
         total_meses = len(citas_por_mes)
 
-        return total_citas / total_meses
\ No newline at end of file
+        return total_citas / total_meses
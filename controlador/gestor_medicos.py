@@ -1,29 +1,63 @@
-import json
 from modelo.medico import Medico
-from modelo.especialidad import Especialidad
 from pathlib import Path
-from utils.validaciones import validar_telefono, validar_nombre, validar_fecha_medico, generar_id, validar_persona_duplicado
-from shutil import copyfile
+from utils.validaciones import validar_telefono, validar_nombre, validar_fecha_medico, generar_id
+from utils.validaciones import CAMPOS_PERSONA, clave_persona, errores_personas, generar_ids, validar_fechas_medico
+from utils.indices import IndiceNgramas
+from utils.paginacion import Pagina, paginar, clave_id
+from utils.texto import normalizar_texto
+from controlador.gestor_persistente import GestorPersistente
+from controlador.gestor_especialidades import GestorEspecialidades
+from utils.instrumentacion import instrumentada
 
-class GestorMedicos:
+@instrumentada()
+class GestorMedicos(GestorPersistente):
     """
     Clase que gestiona las operaciones relacionadas con médicos.
 
     Esta clase permite agregar, buscar, listar y filtrar médicos, así como cargar y guardar datos desde/hacia archivos JSON.
 
+    La especialidad de cada médico es el objeto compartido de GestorEspecialidades (ver
+    `GestorEspecialidades.obtener_especialidad`), no la copia guardada en `medicos.json`: todos los
+    médicos de una especialidad apuntan al mismo objeto, con la descripción del archivo de especialidades.
+
         Attributes:
+            gestor_especialidades (GestorEspecialidades): Gestor dueño de los objetos Especialidad.
             _medicos (list): Lista de objetos Medico registrados.
+            _indice_medicos (dict): Índice id_medico -> Medico.
+            _claves_personas (dict): Índice clave de duplicado (ver `clave_persona`) -> id_medico.
+            _indice_similares (IndiceNgramas): Índice de trigramas del nombre completo para búsquedas aproximadas.
+            _etiquetas (dict): Caché de listas de etiquetas para los combobox, con o sin especialidad.
     """
 
-    def __init__(self):
+    nombre_datos = "médicos"
+    clave_registro = "id_medico"
+    # Órdenes disponibles en `listar_medicos_pagina` (todas las claves terminan en el ID para ser estables)
+    ordenes_pagina = {
+        'id': lambda m: clave_id(m.id_medico),
+        'nombre': lambda m: (normalizar_texto(m.apellido), normalizar_texto(m.nombre), *clave_id(m.id_medico)),
+        'especialidad': lambda m: (normalizar_texto(m.especialidad.nombre), normalizar_texto(m.apellido),
+                                   normalizar_texto(m.nombre), *clave_id(m.id_medico)),
+    }
+
+    def __init__(self, gestor_especialidades=None, cargar: bool = True):
         """
         Inicializa el gestor de médicos cargando datos desde un archivo JSON.
 
         Crea una lista vacía de médicos y carga los datos existentes desde el archivo `medicos.json`.
+
+            Args:
+                gestor_especialidades (GestorEspecialidades): Gestor con las especialidades ya cargadas. Si no se indica, se crea uno.
+                cargar (bool): Si es False, no se lee el archivo (los datos se cargan después con `cargar_desde_datos`).
         """
         self.file_path = Path('datos') / 'medicos.json'
+        self.gestor_especialidades = gestor_especialidades or GestorEspecialidades()
         self._medicos = []
-        self.cargar_datos()
+        self._indice_medicos = {}
+        self._claves_personas = {}
+        self._indice_similares = IndiceNgramas()
+        self._etiquetas = {}
+        if cargar:
+            self.cargar_datos()
 
     def agregar_medico(self, medico_data: dict) -> bool:
         """
@@ -48,20 +82,100 @@ class GestorMedicos:
         ]):
             return False
 
-        # Validar que no haya un paciente con la misma información
-        if validar_persona_duplicado('datos/medicos.json', medico_data):
+        # Validar que no haya un médico con la misma información (se compara con los médicos
+        # en memoria, porque el archivo no incluye los cambios que están en el diario)
+        if clave_persona(medico_data) in self._claves_personas:
             raise ValueError(
                 "Error: Ya existe un médico idéntico (mismo nombre, apellido, fecha nacimiento y teléfono)")
 
         # Generar ID automático
-        ultimo_id = max([m.id_medico for m in self._medicos], default=None)
+        ultimo_id = max([m.id_medico for m in self._medicos], key=clave_id, default=None)
         medico_data['id_medico'] = generar_id("MED", ultimo_id)
+        especialidad = medico_data['especialidad']
+        medico_data['especialidad'] = self.gestor_especialidades.obtener_especialidad(especialidad.nombre,
+                                                                                      especialidad.descripcion)
 
         medico = Medico(**medico_data)
-        self._medicos.append(medico)
-        self.guardar_datos()
+        self._agregar_a_memoria(medico)
+        self._al_deshacer(lambda: self._quitar_de_memoria(medico))
+        self.persistir_cambios()
         return True
 
+    def importar_medicos(self, filas, especialidades: list) -> tuple:
+        """
+        Agrega muchos médicos a la vez (por ejemplo, las filas de un CSV) y los guarda una sola vez.
+
+        Las filas se validan por columnas (ver `errores_personas`) con las mismas reglas que en
+        `agregar_medico`, y su especialidad debe existir. Los duplicados se buscan en un conjunto con
+        las claves de los médicos existentes y de las filas ya aceptadas, y los IDs se asignan en un
+        solo bloque. Las filas con errores se omiten y se informan.
+
+            Args:
+                filas (iterable): Diccionarios con nombre, apellido, fecha_nacimiento, telefono y
+                                  especialidad (nombre de la especialidad).
+                especialidades (list): Objetos Especialidad disponibles.
+
+            Returns:
+                tuple: (médicos agregados, errores), donde errores es una lista de tuplas
+                       (posición de la fila empezando en 0, mensaje). Los mensajes numeran las filas desde 1.
+        """
+        por_nombre = {especialidad.nombre: self.gestor_especialidades.obtener_especialidad(especialidad.nombre,
+                                                                                           especialidad.descripcion)
+                      for especialidad in especialidades}
+        existentes = dict(self._claves_personas)
+        filas = list(filas)
+        datos = [{campo: (fila.get(campo) or "").strip() for campo in CAMPOS_PERSONA} for fila in filas]
+        aceptados = []
+        errores = []
+        validaciones = errores_personas(datos, validar_fechas_medico)
+        for numero, (fila, medico_data, mensajes) in enumerate(zip(filas, datos, validaciones)):
+            nombre_especialidad = (fila.get('especialidad') or "").strip()
+            if nombre_especialidad not in por_nombre:
+                mensajes.append(f"Especialidad no encontrada: {nombre_especialidad}")
+            clave = clave_persona(medico_data)
+            if not mensajes and clave in existentes:
+                mensajes = [f"Ya existe un médico idéntico ({existentes[clave]})"]
+            if mensajes:
+                errores.append((numero, "; ".join(mensajes)))
+                continue
+            existentes[clave] = f"fila {numero + 1}"
+            medico_data['especialidad'] = por_nombre[nombre_especialidad]
+            aceptados.append(medico_data)
+
+        ultimo_id = max([m.id_medico for m in self._medicos], key=clave_id, default=None)
+        medicos = [Medico(**medico_data, id_medico=id_medico) for medico_data, id_medico
+                   in zip(aceptados, generar_ids("MED", ultimo_id, len(aceptados)))]
+        if not medicos:
+            return [], errores
+
+        # Los índices se reconstruyen una sola vez en lugar de insertar cada elemento por separado
+        self._medicos.extend(medicos)
+        self._etiquetas = {}
+        self._reconstruir_indices()
+        self._al_deshacer(lambda: self._quitar_de_memoria(*medicos))
+        self.persistir_cambios()
+        return medicos, errores
+
+    def _agregar_a_memoria(self, medico: Medico):
+        """
+        Agrega un médico a la lista, a los índices y a las etiquetas en memoria.
+        """
+        self._medicos.append(medico)
+        self._indice_medicos[medico.id_medico] = medico
+        self._claves_personas.setdefault(clave_persona(medico), medico.id_medico)
+        self._indice_similares.agregar(medico.id_medico, f"{medico.apellido} {medico.nombre}")
+        for con_especialidad, etiquetas in self._etiquetas.items():
+            etiquetas.append(self._formatear_etiqueta(medico, con_especialidad))
+
+    def _quitar_de_memoria(self, *medicos: Medico):
+        """
+        Quita uno o varios médicos de la lista, de los índices y de las etiquetas en memoria (al deshacer su alta).
+        """
+        quitados = {medico.id_medico for medico in medicos}
+        self._medicos[:] = [m for m in self._medicos if m.id_medico not in quitados]
+        self._etiquetas = {}
+        self._reconstruir_indices()
+
     def buscar_medico(self, id_medico: str) -> Medico:
         """
         Busca un médico por su ID único.
@@ -72,10 +186,24 @@ class GestorMedicos:
             Returns:
                 Medico: Objeto Medico si se encuentra, o None si no existe.
         """
-        for medico in self._medicos:
-            if medico.id_medico == id_medico:
-                return medico
-        return None
+        return self._indice_medicos.get(id_medico)
+
+    def buscar_similares(self, nombre: str, apellido: str, limite: int = 5, umbral: float = 0.8) -> list:
+        """
+        Busca médicos con un nombre parecido, sin distinguir mayúsculas ni acentos y tolerando
+        letras cambiadas, faltantes o intercambiadas.
+
+            Args:
+                nombre (str): Nombre del médico.
+                apellido (str): Apellido del médico.
+                limite (int): Número máximo de resultados.
+                umbral (float): Similitud mínima (0 a 1) del nombre completo.
+
+            Returns:
+                list: Tuplas (Medico, similitud) ordenadas de mayor a menor similitud.
+        """
+        return [(self._indice_medicos[id_medico], similitud) for id_medico, similitud
+                in self._indice_similares.buscar(f"{apellido} {nombre}", limite, umbral)]
 
     def listar_medicos(self) -> list:
         """
@@ -86,6 +214,50 @@ class GestorMedicos:
         """
         return self._medicos
 
+    def listar_medicos_pagina(self, offset: int = 0, limite: int = 50, orden: str = "id", cursor: str = None) -> Pagina:
+        """
+        Devuelve una página de médicos.
+
+            Args:
+                offset (int): Médicos a saltar.
+                limite (int): Máximo de médicos de la página.
+                orden (str): 'id', 'nombre' o 'especialidad'; con el prefijo '-' es descendente.
+                cursor (str): Cursor de la página anterior, para continuar después de ella.
+
+            Returns:
+                Pagina: Página de objetos Medico.
+        """
+        return paginar(self._medicos, self.ordenes_pagina, orden, offset, limite, cursor)
+
+    def etiquetas(self, con_especialidad: bool = False) -> list:
+        """
+        Devuelve el texto con el que se muestra cada médico en los combobox, en el mismo orden que `listar_medicos`.
+
+        La lista se construye una vez y después solo se le agregan los médicos nuevos, por lo que
+        no debe modificarse.
+
+            Args:
+                con_especialidad (bool): Si es True, se agrega la especialidad entre paréntesis.
+
+            Returns:
+                list: Etiquetas "ID - Apellido, Nombre" (o "ID - Apellido, Nombre (Especialidad)").
+        """
+        etiquetas = self._etiquetas.get(con_especialidad)
+        if etiquetas is None:
+            etiquetas = [self._formatear_etiqueta(medico, con_especialidad) for medico in self._medicos]
+            self._etiquetas[con_especialidad] = etiquetas
+        return etiquetas
+
+    @staticmethod
+    def _formatear_etiqueta(medico: Medico, con_especialidad: bool) -> str:
+        """
+        Da formato a la etiqueta de un médico.
+        """
+        etiqueta = f"{medico.id_medico} - {medico.get_nombre_completo()}"
+        if con_especialidad:
+            etiqueta += f" ({medico.especialidad.nombre})"
+        return etiqueta
+
     def medicos_por_especialidad(self, especialidad: str) -> list:
         """
         Filtra los médicos que pertenecen a una especialidad específica.
@@ -105,56 +277,112 @@ class GestorMedicos:
         Intenta leer el archivo `medicos.json` y construir objetos Medico a partir de los datos almacenados.
         En caso de error, imprime un mensaje de error.
         """
-        self._medicos.clear()
+        self.cargar_desde_datos(self.leer_datos())
+
+    def leer_datos(self) -> list:
+        """
+        Lee y decodifica el archivo `medicos.json`, sin construir los objetos.
+
+            Returns:
+                list: Registros de los médicos (vacía si el archivo no existe o no se pudo leer).
+        """
         try:
-            if self.file_path.exists():
-                with open(self.file_path, 'r', encoding='utf-8') as archivo:
-                    datos = json.load(archivo)
-                    for medico_data in datos:
-                        especialidad = Especialidad(
-                            medico_data['especialidad']['nombre'],
-                            medico_data['especialidad']['descripcion']
-                        )
-                        medico = Medico(
-                            medico_data['nombre'],
-                            medico_data['apellido'],
-                            medico_data['fecha_nacimiento'],
-                            medico_data['telefono'],
-                            medico_data['id_medico'],
-                            especialidad
-                        )
-                        self._medicos.append(medico)
+            return self._leer_archivo(self.file_path) or []
         except Exception as e:
             print(f"Error al cargar médicos: {e}")
+        return []
 
-    def guardar_datos(self):
+    def cargar_desde_datos(self, datos: list):
         """
-        Guarda los datos actuales de los médicos en un archivo JSON.
+        Construye los objetos Medico y sus índices a partir de los registros ya leídos.
 
-        Serializa los objetos Medico en formato JSON y los guarda en `medicos.json`.
-        En caso de error, imprime un mensaje de error.
+            Args:
+                datos (list): Registros devueltos por `leer_datos`.
         """
+        self._medicos.clear()
+        self._etiquetas = {}
         try:
-            datos = []
-            for medico in self._medicos:
-                datos.append({
-                    'nombre': medico.nombre,
-                    'apellido': medico.apellido,
-                    'fecha_nacimiento': medico.fecha_nacimiento,
-                    'telefono': medico.telefono,
-                    'id_medico': medico.id_medico,
-                    'especialidad': {
-                        'nombre': medico.especialidad.nombre,
-                        'descripcion': medico.especialidad.descripcion
-                    }
-                })
-            # Crear respaldo antes de sobrescribir el archivo
-            if self.file_path.exists():
-                copia = self.file_path.with_suffix('.json.bak')
-                copyfile(self.file_path, copia)
-
-            # Guardar en el archivo original
-            with open(self.file_path, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=4)
+            for medico_data in datos:
+                self._medicos.append(self._registro_a_medico(medico_data))
         except Exception as e:
-            print(f"Error al guardar médicos: {e}")
\ No newline at end of file
+            print(f"Error al cargar médicos: {e}")
+        self._reconstruir_indices()
+
+    def _registro_a_medico(self, medico_data: dict) -> Medico:
+        """
+        Construye un objeto Medico a partir de un registro del archivo, con el objeto compartido de su especialidad.
+        """
+        especialidad = self.gestor_especialidades.obtener_especialidad(
+            medico_data['especialidad']['nombre'],
+            medico_data['especialidad']['descripcion']
+        )
+        return Medico(
+            medico_data['nombre'],
+            medico_data['apellido'],
+            medico_data['fecha_nacimiento'],
+            medico_data['telefono'],
+            medico_data['id_medico'],
+            especialidad
+        )
+
+    def _reconstruir_indices(self):
+        """
+        Reconstruye los índices de búsqueda a partir de la lista de médicos.
+        """
+        self._indice_medicos = {medico.id_medico: medico for medico in self._medicos}
+        self._claves_personas = {}
+        for medico in self._medicos:
+            self._claves_personas.setdefault(clave_persona(medico), medico.id_medico)
+        self._indice_similares = IndiceNgramas()
+        for medico in self._medicos:
+            self._indice_similares.agregar(medico.id_medico, f"{medico.apellido} {medico.nombre}")
+
+    def _preparar_escrituras(self) -> list:
+        """
+        Serializa los objetos Medico para guardarlos en `medicos.json`.
+
+            Returns:
+                list: Tupla (ruta, datos) del archivo de médicos.
+        """
+        datos = []
+        for medico in self._medicos:
+            datos.append({
+                'nombre': medico.nombre,
+                'apellido': medico.apellido,
+                'fecha_nacimiento': medico.fecha_nacimiento,
+                'telefono': medico.telefono,
+                'id_medico': medico.id_medico,
+                'especialidad': {
+                    'nombre': medico.especialidad.nombre,
+                    'descripcion': medico.especialidad.descripcion
+                }
+            })
+        return [(self.file_path, datos)]
+
+    def _aplicar_cambios_externos(self, ruta, cambios: dict):
+        """
+        Agrega o actualiza en memoria los médicos que otro proceso guardó.
+
+        Los médicos existentes se actualizan sin reemplazar el objeto, para conservar sus citas.
+        Los médicos nunca se eliminan, así que las eliminaciones se ignoran.
+
+            Args:
+                ruta (Path): Archivo de médicos.
+                cambios (dict): id_medico -> registro nuevo, o None si se eliminó.
+        """
+        actualizados = False
+        for id_medico, medico_data in cambios.items():
+            if medico_data is None:
+                continue
+            nuevo = self._registro_a_medico(medico_data)
+            existente = self._indice_medicos.get(id_medico)
+            if existente is None:
+                self._agregar_a_memoria(nuevo)
+            else:
+                existente.actualizar_datos(nuevo.nombre, nuevo.apellido, nuevo.fecha_nacimiento, nuevo.telefono)
+                existente.cambiar_especialidad(nuevo.especialidad)
+                actualizados = True
+
+        if actualizados:
+            self._etiquetas = {}
+            self._reconstruir_indices()
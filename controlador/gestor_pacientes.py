@@ -1,10 +1,16 @@
-import json
 from modelo.paciente import Paciente
 from pathlib import Path
-from utils.validaciones import validar_nombre,validar_telefono,validar_fecha_paciente, generar_id, validar_persona_duplicado
-from shutil import copyfile
+from utils.validaciones import validar_nombre,validar_telefono,validar_fecha_paciente, generar_id
+from utils.validaciones import CAMPOS_PERSONA, clave_persona, errores_personas, generar_ids, validar_fechas_paciente
+from utils.indices import IndicePrefijos, IndiceNgramas
+from utils.paginacion import Pagina, paginar, clave_id
+from utils.texto import normalizar_texto
+from utils.eventos import PACIENTE_AGREGADO
+from controlador.gestor_persistente import GestorPersistente
+from utils.instrumentacion import instrumentada
 
-class GestorPacientes:
+@instrumentada()
+class GestorPacientes(GestorPersistente):
     """
     Clase que gestiona las operaciones relacionadas con pacientes.
 
@@ -12,17 +18,40 @@ class GestorPacientes:
 
         Attributes:
             _pacientes (list): Lista de objetos Paciente registrados.
+            _indice_pacientes (dict): Índice id_paciente -> Paciente.
+            _claves_personas (dict): Índice clave de duplicado (ver `clave_persona`) -> id_paciente.
+            _indice_prefijos (IndicePrefijos): Índice para buscar por prefijo de ID, nombre, apellido o teléfono.
+            _indice_similares (IndiceNgramas): Índice de trigramas del nombre completo para búsquedas aproximadas.
+            _etiquetas (dict): Caché id_paciente -> "ID - Apellido, Nombre" para mostrar en la interfaz.
     """
 
-    def __init__(self):
+    nombre_datos = "pacientes"
+    clave_registro = "id_paciente"
+    # Órdenes disponibles en `listar_pacientes_pagina` (todas las claves terminan en el ID para ser estables)
+    ordenes_pagina = {
+        'id': lambda p: clave_id(p.id_paciente),
+        'nombre': lambda p: (normalizar_texto(p.apellido), normalizar_texto(p.nombre), *clave_id(p.id_paciente)),
+    }
+
+    def __init__(self, cargar: bool = True):
         """
         Inicializa el gestor de pacientes y carga los datos desde el archivo JSON.
 
         Crea una lista vacía y la rellena con pacientes cargados desde el archivo `pacientes.json` si existe.
+
+            Args:
+                cargar (bool): Si es False, no se lee el archivo (los datos se cargan después con `cargar_desde_datos`).
         """
         self.file_path = Path('datos') / 'pacientes.json'
         self._pacientes = []
-        self.cargar_datos()
+        self._indice_pacientes = {}
+        self._claves_personas = {}
+        self._indice_prefijos = IndicePrefijos()
+        self._indice_similares = IndiceNgramas()
+        self._etiquetas = {}
+        self._lista_etiquetas = None
+        if cargar:
+            self.cargar_datos()
 
     def agregar_paciente(self, paciente_data: dict)  -> bool:
         """
@@ -47,20 +76,92 @@ class GestorPacientes:
         ]):
             return False
 
-        # Validar que no haya un paciente con la misma información
-        if validar_persona_duplicado('datos/pacientes.json', paciente_data):
+        # Validar que no haya un paciente con la misma información (se compara con los pacientes
+        # en memoria, porque el archivo no incluye los cambios que están en el diario)
+        if clave_persona(paciente_data) in self._claves_personas:
             raise ValueError(
                 "Error: Ya existe un paciente idéntico (mismo nombre, apellido, fecha nacimiento y teléfono)")
 
         # Generar ID automático
-        ultimo_id = max([p.id_paciente for p in self._pacientes], default=None)
+        ultimo_id = max([p.id_paciente for p in self._pacientes], key=clave_id, default=None)
         paciente_data['id_paciente'] = generar_id("PAC", ultimo_id)
 
         paciente = Paciente(**paciente_data)
-        self._pacientes.append(paciente)
-        self.guardar_datos()
+        self._agregar_a_memoria(paciente)
+        self._al_deshacer(lambda: self._quitar_de_memoria(paciente))
+        self.persistir_cambios()
+        self._publicar(PACIENTE_AGREGADO, paciente=paciente)
         return True
 
+    def importar_pacientes(self, filas) -> tuple:
+        """
+        Agrega muchos pacientes a la vez (por ejemplo, las filas de un CSV) y los guarda una sola vez.
+
+        Las filas se validan por columnas (ver `errores_personas`) con las mismas reglas que en
+        `agregar_paciente`, pero los duplicados se buscan en un conjunto con las claves de los
+        pacientes existentes y de las filas ya aceptadas, y los IDs se asignan en un solo bloque. Las filas con errores se omiten y se informan.
+
+            Args:
+                filas (iterable): Diccionarios con nombre, apellido, fecha_nacimiento y telefono.
+
+            Returns:
+                tuple: (pacientes agregados, errores), donde errores es una lista de tuplas
+                       (posición de la fila empezando en 0, mensaje). Los mensajes numeran las filas desde 1.
+        """
+        existentes = dict(self._claves_personas)
+        datos = [{campo: (fila.get(campo) or "").strip() for campo in CAMPOS_PERSONA} for fila in filas]
+        aceptados = []
+        errores = []
+        validaciones = errores_personas(datos, validar_fechas_paciente)
+        for numero, (paciente_data, mensajes) in enumerate(zip(datos, validaciones)):
+            clave = clave_persona(paciente_data)
+            if not mensajes and clave in existentes:
+                mensajes = [f"Ya existe un paciente idéntico ({existentes[clave]})"]
+            if mensajes:
+                errores.append((numero, "; ".join(mensajes)))
+                continue
+            existentes[clave] = f"fila {numero + 1}"
+            aceptados.append(paciente_data)
+
+        ultimo_id = max([p.id_paciente for p in self._pacientes], key=clave_id, default=None)
+        pacientes = [Paciente(**paciente_data, id_paciente=id_paciente) for paciente_data, id_paciente
+                     in zip(aceptados, generar_ids("PAC", ultimo_id, len(aceptados)))]
+        if not pacientes:
+            return [], errores
+
+        # Los índices se reconstruyen una sola vez en lugar de insertar cada elemento por separado
+        self._pacientes.extend(pacientes)
+        self._lista_etiquetas = None
+        self._reconstruir_indices()
+        self._al_deshacer(lambda: self._quitar_de_memoria(*pacientes))
+        self.persistir_cambios()
+        for paciente in pacientes:
+            self._publicar(PACIENTE_AGREGADO, paciente=paciente)
+        return pacientes, errores
+
+    def _agregar_a_memoria(self, paciente: Paciente):
+        """
+        Agrega un paciente a la lista y a los índices en memoria.
+        """
+        self._pacientes.append(paciente)
+        self._indice_pacientes[paciente.id_paciente] = paciente
+        self._claves_personas.setdefault(clave_persona(paciente), paciente.id_paciente)
+        self._indice_prefijos.agregar(paciente.id_paciente, self._claves_busqueda(paciente))
+        self._indice_similares.agregar(paciente.id_paciente, f"{paciente.apellido} {paciente.nombre}")
+        if self._lista_etiquetas is not None:
+            self._lista_etiquetas.append(self.etiqueta(paciente))
+
+    def _quitar_de_memoria(self, *pacientes: Paciente):
+        """
+        Quita uno o varios pacientes de la lista y de los índices en memoria (al deshacer su alta).
+        """
+        quitados = {paciente.id_paciente for paciente in pacientes}
+        self._pacientes[:] = [p for p in self._pacientes if p.id_paciente not in quitados]
+        for id_paciente in quitados:
+            self._etiquetas.pop(id_paciente, None)
+        self._lista_etiquetas = None
+        self._reconstruir_indices()
+
     def buscar_paciente(self, id_paciente: str) -> Paciente:
         """
         Busca un paciente por su ID único.
@@ -71,10 +172,57 @@ class GestorPacientes:
             Returns:
                 Paciente: Objeto Paciente si se encuentra, o None si no existe.
         """
-        for paciente in self._pacientes:
-            if paciente.id_paciente == id_paciente:
-                return paciente
-        return None
+        return self._indice_pacientes.get(id_paciente)
+
+    def buscar_por_prefijo(self, texto: str, limite: int = 20) -> list:
+        """
+        Busca pacientes cuyo ID, nombre, apellido, "apellido nombre" o teléfono empiece con el texto indicado.
+
+        La comparación no distingue mayúsculas ni acentos. Está pensada para sugerencias mientras se escribe.
+
+            Args:
+                texto (str): Texto escrito por el usuario.
+                limite (int): Número máximo de pacientes a devolver.
+
+            Returns:
+                list: Lista de objetos Paciente encontrados.
+        """
+        if not texto.strip():
+            return self._pacientes[:limite]
+        return [self._indice_pacientes[id_paciente]
+                for id_paciente in self._indice_prefijos.buscar(texto, limite)]
+
+    def buscar_similares(self, nombre: str, apellido: str, limite: int = 5, umbral: float = 0.8) -> list:
+        """
+        Busca pacientes con un nombre parecido, sin distinguir mayúsculas ni acentos y tolerando
+        letras cambiadas, faltantes o intercambiadas (por ejemplo, "Gomez" encuentra a "Gómez").
+
+        Sirve para avisar de un posible duplicado antes de registrar un paciente nuevo.
+
+            Args:
+                nombre (str): Nombre del paciente.
+                apellido (str): Apellido del paciente.
+                limite (int): Número máximo de resultados.
+                umbral (float): Similitud mínima (0 a 1) del nombre completo.
+
+            Returns:
+                list: Tuplas (Paciente, similitud) ordenadas de mayor a menor similitud.
+        """
+        return [(self._indice_pacientes[id_paciente], similitud) for id_paciente, similitud
+                in self._indice_similares.buscar(f"{apellido} {nombre}", limite, umbral)]
+
+    @staticmethod
+    def _claves_busqueda(paciente: Paciente) -> list:
+        """
+        Devuelve los textos por los que se puede encontrar a un paciente con `buscar_por_prefijo`.
+        """
+        return [
+            paciente.id_paciente,
+            paciente.nombre,
+            paciente.apellido,
+            f"{paciente.apellido} {paciente.nombre}",
+            paciente.telefono
+        ]
 
     def listar_pacientes(self) -> list:
         """
@@ -85,6 +233,51 @@ class GestorPacientes:
         """
         return self._pacientes
 
+    def listar_pacientes_pagina(self, offset: int = 0, limite: int = 50, orden: str = "id", cursor: str = None) -> Pagina:
+        """
+        Devuelve una página de pacientes.
+
+            Args:
+                offset (int): Pacientes a saltar.
+                limite (int): Máximo de pacientes de la página.
+                orden (str): 'id' o 'nombre' (apellido y nombre); con el prefijo '-' es descendente.
+                cursor (str): Cursor de la página anterior, para continuar después de ella.
+
+            Returns:
+                Pagina: Página de objetos Paciente.
+        """
+        return paginar(self._pacientes, self.ordenes_pagina, orden, offset, limite, cursor)
+
+    def etiqueta(self, paciente: Paciente) -> str:
+        """
+        Devuelve el texto con el que se muestra un paciente en los combobox ("ID - Apellido, Nombre").
+
+            Args:
+                paciente (Paciente): Paciente a mostrar.
+
+            Returns:
+                str: Etiqueta del paciente (se calcula una sola vez por paciente).
+        """
+        etiqueta = self._etiquetas.get(paciente.id_paciente)
+        if etiqueta is None:
+            etiqueta = f"{paciente.id_paciente} - {paciente.get_nombre_completo()}"
+            self._etiquetas[paciente.id_paciente] = etiqueta
+        return etiqueta
+
+    def etiquetas(self) -> list:
+        """
+        Devuelve las etiquetas de todos los pacientes, en el mismo orden que `listar_pacientes`.
+
+        La lista se construye una vez y después solo se le agregan los pacientes nuevos, por lo que
+        no debe modificarse.
+
+            Returns:
+                list: Etiquetas "ID - Apellido, Nombre".
+        """
+        if self._lista_etiquetas is None:
+            self._lista_etiquetas = [self.etiqueta(paciente) for paciente in self._pacientes]
+        return self._lista_etiquetas
+
     def cargar_datos(self):
         """
         Carga los datos de los pacientes desde un archivo JSON.
@@ -92,48 +285,109 @@ class GestorPacientes:
         Intenta leer el archivo `pacientes.json` y construir objetos Paciente a partir de los datos almacenados.
         En caso de error, imprime un mensaje.
         """
-        self._pacientes.clear()
+        self.cargar_desde_datos(self.leer_datos())
+
+    def leer_datos(self) -> list:
+        """
+        Lee y decodifica el archivo `pacientes.json`, sin construir los objetos.
+
+            Returns:
+                list: Registros de los pacientes (vacía si el archivo no existe o no se pudo leer).
+        """
         try:
-            if self.file_path.exists():
-                with open(self.file_path, 'r', encoding='utf-8') as archivo:
-                    datos = json.load(archivo)
-                    for paciente_data in datos:
-                        paciente = Paciente(
-                            paciente_data['nombre'],
-                            paciente_data['apellido'],
-                            paciente_data['fecha_nacimiento'],
-                            paciente_data['telefono'],
-                            paciente_data['id_paciente']
-                        )
-                        self._pacientes.append(paciente)
+            return self._leer_archivo(self.file_path) or []
         except Exception as e:
             print(f"Error al cargar pacientes: {e}")
+        return []
 
-    def guardar_datos(self):
+    def cargar_desde_datos(self, datos: list):
         """
-        Guarda los datos actuales de los pacientes en un archivo JSON.
+        Construye los objetos Paciente y sus índices a partir de los registros ya leídos.
 
-        Serializa los objetos Paciente en formato JSON y los guarda en `pacientes.json`.
-        En caso de error, imprime un mensaje.
+            Args:
+                datos (list): Registros devueltos por `leer_datos`.
         """
+        self._pacientes.clear()
+        self._etiquetas = {}
+        self._lista_etiquetas = None
         try:
-            datos = []
-            for paciente in self._pacientes:
-                datos.append({
-                    'nombre': paciente.nombre,
-                    'apellido': paciente.apellido,
-                    'fecha_nacimiento': paciente.fecha_nacimiento,
-                    'telefono': paciente.telefono,
-                    'id_paciente': paciente.id_paciente
-                })
-
-            # Crear respaldo antes de sobrescribir el archivo
-            if self.file_path.exists():
-                copia = self.file_path.with_suffix('.json.bak')
-                copyfile(self.file_path, copia)
-
-            # Guardar en el archivo original
-            with open(self.file_path, 'w', encoding='utf-8') as archivo:
-                json.dump(datos, archivo, indent=4)
+            for paciente_data in datos:
+                self._pacientes.append(self._registro_a_paciente(paciente_data))
         except Exception as e:
-            print(f"Error al guardar pacientes: {e}")
\ No newline at end of file
+            print(f"Error al cargar pacientes: {e}")
+        self._reconstruir_indices()
+
+    @staticmethod
+    def _registro_a_paciente(paciente_data: dict) -> Paciente:
+        """
+        Construye un objeto Paciente a partir de un registro del archivo.
+        """
+        return Paciente(
+            paciente_data['nombre'],
+            paciente_data['apellido'],
+            paciente_data['fecha_nacimiento'],
+            paciente_data['telefono'],
+            paciente_data['id_paciente']
+        )
+
+    def _reconstruir_indices(self):
+        """
+        Reconstruye los índices de búsqueda a partir de la lista de pacientes.
+        """
+        self._indice_pacientes = {paciente.id_paciente: paciente for paciente in self._pacientes}
+        self._claves_personas = {}
+        for paciente in self._pacientes:
+            self._claves_personas.setdefault(clave_persona(paciente), paciente.id_paciente)
+        self._indice_prefijos.construir(
+            (paciente.id_paciente, self._claves_busqueda(paciente)) for paciente in self._pacientes
+        )
+        self._indice_similares = IndiceNgramas()
+        for paciente in self._pacientes:
+            self._indice_similares.agregar(paciente.id_paciente, f"{paciente.apellido} {paciente.nombre}")
+
+    def _preparar_escrituras(self) -> list:
+        """
+        Serializa los objetos Paciente para guardarlos en `pacientes.json`.
+
+            Returns:
+                list: Tupla (ruta, datos) del archivo de pacientes.
+        """
+        datos = []
+        for paciente in self._pacientes:
+            datos.append({
+                'nombre': paciente.nombre,
+                'apellido': paciente.apellido,
+                'fecha_nacimiento': paciente.fecha_nacimiento,
+                'telefono': paciente.telefono,
+                'id_paciente': paciente.id_paciente
+            })
+        return [(self.file_path, datos)]
+
+    def _aplicar_cambios_externos(self, ruta, cambios: dict):
+        """
+        Agrega o actualiza en memoria los pacientes que otro proceso guardó.
+
+        Los pacientes existentes se actualizan sin reemplazar el objeto, para que las citas que los
+        referencian vean los cambios. Los pacientes nunca se eliminan, así que las eliminaciones se ignoran.
+
+            Args:
+                ruta (Path): Archivo de pacientes.
+                cambios (dict): id_paciente -> registro nuevo, o None si se eliminó.
+        """
+        actualizados = False
+        for id_paciente, paciente_data in cambios.items():
+            if paciente_data is None:
+                continue
+            nuevo = self._registro_a_paciente(paciente_data)
+            existente = self._indice_pacientes.get(id_paciente)
+            if existente is None:
+                self._agregar_a_memoria(nuevo)
+                self._publicar(PACIENTE_AGREGADO, paciente=nuevo)
+            else:
+                existente.actualizar_datos(nuevo.nombre, nuevo.apellido, nuevo.fecha_nacimiento, nuevo.telefono)
+                actualizados = True
+
+        if actualizados:
+            self._etiquetas = {}
+            self._lista_etiquetas = None
+            self._reconstruir_indices()
@@ -0,0 +1,390 @@
+import json
+import threading
+from contextlib import ExitStack
+from utils.persistencia import (escribir_json, VersionArchivo, ConflictoEscritura, fusionar_registros,
+                                completar_transacciones, obtener_diario, diferencias, aplicar_operaciones,
+                                anotar_operaciones)
+from controlador.unidad_trabajo import unidad_actual
+from utils.instrumentacion import registrar_bytes
+
+# Las transacciones interrumpidas se completan una vez por proceso, antes de la primera lectura
+_transacciones_revisadas = False
+_bloqueo_transacciones = threading.Lock()
+
+
+class GestorPersistente:
+    """
+    Clase base con el guardado común de los gestores que almacenan sus datos en archivos JSON.
+
+    Cada gestor indica qué archivos escribir en `_preparar_escrituras`. La preparación se hace en el
+    hilo que llama (copiando los datos a diccionarios); la escritura puede hacerse en ese momento o
+    delegarse a un TrabajadorPersistencia para no bloquear la interfaz.
+
+    Dentro de una unidad de trabajo (ver controlador.unidad_trabajo), `persistir_cambios` no escribe:
+    el gestor se anota en la unidad y sus archivos se escriben al confirmarla, junto con los de los
+    demás gestores modificados.
+
+    Varios procesos pueden trabajar sobre la misma carpeta de datos: cada archivo tiene un contador
+    de versión que además sirve de bloqueo (ver `VersionArchivo`). Si al guardar otro proceso ya
+    escribió el archivo, los cambios se fusionan registro por registro con los suyos (ver
+    `fusionar_registros`) y después se aplican en memoria solo los registros que cambió el otro proceso.
+
+    Los archivos no se reescriben completos en cada guardado: los registros que cambiaron se agregan
+    al diario de la carpeta de datos, y al leer un archivo se aplican sobre él las operaciones del
+    diario (ver utils.persistencia.Diario).
+
+        Attributes:
+            trabajador_io (TrabajadorPersistencia): Trabajador para guardar en segundo plano, o None
+                                                    para guardar de inmediato.
+            bus_eventos (BusEventos): Bus en el que se publican los cambios, o None para no publicarlos.
+            _versiones (dict): Ruta -> versión del archivo que se leyó o escribió por última vez.
+            _bases (dict): Ruta -> registros del archivo que se leyeron o escribieron por última vez.
+            _posiciones (dict): Ruta -> posición del diario hasta la que la base ya incluye sus operaciones.
+    """
+
+    # Nombre de los datos en los mensajes de error (por ejemplo, "pacientes")
+    nombre_datos = "datos"
+    # Si es False, los caracteres no ASCII se guardan sin escapar
+    ensure_ascii = True
+    # Campo que identifica cada registro en los archivos (lista de registros) que se fusionan
+    # con los cambios de otros procesos; None para que la última escritura reemplace el archivo
+    clave_registro = None
+    trabajador_io = None
+    bus_eventos = None
+    _versiones = None
+    _bases = None
+    _posiciones = None
+
+    def __getstate__(self) -> dict:
+        """
+        Estado del gestor para guardarlo con pickle, sin el trabajador de persistencia (que es un hilo)
+        ni el bus de eventos (sus suscriptores pertenecen a la sesión actual).
+        """
+        estado = self.__dict__.copy()
+        estado.pop('trabajador_io', None)
+        estado.pop('bus_eventos', None)
+        return estado
+
+    def _publicar(self, tipo: str, **datos):
+        """
+        Publica un evento en el bus de eventos, si el gestor tiene uno asignado.
+
+            Args:
+                tipo (str): Tipo de evento (ver utils.eventos).
+                **datos: Datos del evento.
+        """
+        if self.bus_eventos is None:
+            return
+        unidad = unidad_actual()
+        if unidad is not None:
+            unidad.retener_evento(self.bus_eventos, tipo, datos)
+        else:
+            self.bus_eventos.publicar(tipo, **datos)
+
+    def _al_deshacer(self, funcion):
+        """
+        Anota cómo deshacer un cambio en memoria, por si falla la unidad de trabajo activa.
+
+        Fuera de una unidad de trabajo no hace nada.
+
+            Args:
+                funcion (callable): Función sin argumentos que deshace el cambio.
+        """
+        unidad = unidad_actual()
+        if unidad is not None:
+            unidad.al_deshacer(funcion)
+
+    def _preparar_escrituras(self) -> list:
+        """
+        Prepara los datos a guardar.
+
+            Returns:
+                list: Tuplas (ruta, datos) con los datos serializables a JSON de cada archivo.
+        """
+        raise NotImplementedError
+
+    def _leer_archivo(self, ruta):
+        """
+        Lee un archivo JSON (con las operaciones del diario) junto con su versión y lo registra como
+        punto de partida para fusionar.
+
+            Args:
+                ruta (Path): Ruta del archivo.
+
+            Returns:
+                Datos del archivo, o None si no existe.
+        """
+        global _transacciones_revisadas
+        with _bloqueo_transacciones:
+            if not _transacciones_revisadas:
+                completar_transacciones()
+                _transacciones_revisadas = True
+
+        with VersionArchivo(ruta) as version:
+            datos, posicion = self._leer_en_disco(ruta)
+        obtener_diario().registrar_escritor(ruta, self._escribir_archivo)
+        self._registrar_sincronizacion(ruta, datos, version.actual, posicion)
+        return datos
+
+    def _consultar_archivo(self, ruta):
+        """
+        Lee el contenido actual de un archivo (con las operaciones del diario) sin registrarlo como
+        punto de partida para fusionar, para recorrerlo sin conservarlo en memoria.
+
+            Args:
+                ruta (Path): Ruta del archivo.
+
+            Returns:
+                Datos del archivo, o None si no existe.
+        """
+        with VersionArchivo(ruta):
+            datos, _ = self._leer_en_disco(ruta)
+        return datos
+
+    def _leer_en_disco(self, ruta, base=None, desde: tuple = None) -> tuple:
+        """
+        Obtiene el contenido actual de un archivo: el punto de control más las operaciones del diario.
+
+        Si se indica una posición del diario cuyas operaciones ya están incluidas en `base`, solo se
+        aplican sobre ella las posteriores, sin leer el archivo. Debe llamarse con el archivo bloqueado.
+
+            Args:
+                ruta (Path): Ruta del archivo.
+                base: Contenido conocido del archivo.
+                desde (tuple): Posición del diario que corresponde a `base`.
+
+            Returns:
+                tuple: (contenido o None si no existe, posición del diario).
+        """
+        diario = obtener_diario()
+        if desde is not None:
+            operaciones, posicion = diario.operaciones(ruta, desde)
+            if operaciones is not None:
+                return aplicar_operaciones(base, operaciones), posicion
+
+        datos = None
+        if ruta.exists():
+            with open(ruta, 'rb') as archivo:
+                contenido = archivo.read()
+            registrar_bytes('leidos', ruta, len(contenido))
+            datos = json.loads(contenido)
+        operaciones, posicion = diario.operaciones(ruta)
+        return aplicar_operaciones(datos, operaciones), posicion
+
+    def _registrar_sincronizacion(self, ruta, datos, version: int, posicion: tuple = None):
+        """
+        Recuerda el contenido, la versión y la posición en el diario de un archivo tal como se leyó o escribió.
+        """
+        if self._versiones is None:
+            self._versiones = {}
+            self._bases = {}
+        if self._posiciones is None:
+            self._posiciones = {}
+        self._versiones[ruta] = version
+        self._bases[ruta] = datos
+        self._posiciones[ruta] = posicion
+
+    def _preparar(self) -> list:
+        """
+        Prepara las escrituras junto con la versión y el contenido de partida de cada archivo.
+
+            Returns:
+                list: Tuplas (ruta, datos, base, versión conocida).
+        """
+        versiones = self._versiones or {}
+        bases = self._bases or {}
+        return [(ruta, datos, bases.get(ruta), versiones.get(ruta))
+                for ruta, datos in self._preparar_escrituras()]
+
+    def _escribir(self, escrituras: list, versiones: dict = None) -> dict:
+        """
+        Guarda los datos preparados por `_preparar`, fusionándolos con los cambios de otros procesos.
+
+        Solo se agregan al diario los registros que difieren de lo que ya hay en disco, todos los
+        archivos en una misma entrada (o en la de la Transaccion activa).
+
+            Args:
+                escrituras (list): Tuplas (ruta, datos, base, versión conocida).
+                versiones (dict): Ruta -> VersionArchivo ya bloqueado por quien llama (en una unidad de
+                                  trabajo); si no se indica, los archivos se bloquean mientras se escriben.
+
+            Returns:
+                dict: Ruta -> (datos escritos, nueva versión, cambios de otros procesos, posición del diario).
+
+            Raises:
+                ConflictoEscritura: Si otro proceso cambió los mismos registros (el resto sí se guarda).
+        """
+        resultado = {}
+        conflictos = []
+        with ExitStack() as bloqueos:
+            if versiones is None:
+                rutas = sorted({escritura[0] for escritura in escrituras}, key=str)
+                versiones = {ruta: bloqueos.enter_context(VersionArchivo(ruta)) for ruta in rutas}
+
+            diario = obtener_diario()
+            operaciones = []
+            for ruta, datos, base, version_conocida in escrituras:
+                en_disco = base
+                cambios = {}
+                if versiones[ruta].actual != version_conocida:
+                    en_disco, _ = self._leer_en_disco(ruta)
+                    if en_disco is not None:
+                        datos, cambios, en_conflicto = self._fusionar(ruta, base, datos, en_disco)
+                        conflictos.extend((ruta, id_registro) for id_registro in en_conflicto)
+                operaciones.extend(diferencias(ruta, en_disco, datos, self.clave_registro))
+                diario.registrar_escritor(ruta, self._escribir_archivo)
+                resultado[ruta] = (datos, cambios)
+
+            # Lo anterior a esta posición ya está incluido en los datos escritos
+            posicion = diario.posicion()
+            anotar_operaciones(operaciones)
+            modificadas = {operacion['ruta'] for operacion in operaciones}
+            for ruta, (datos, cambios) in resultado.items():
+                version = versiones[ruta]
+                numero = version.incrementar() if str(ruta) in modificadas else version.actual
+                resultado[ruta] = (datos, numero, cambios, posicion)
+
+        if conflictos:
+            raise ConflictoEscritura(conflictos, resultado)
+        return resultado
+
+    def _fusionar(self, ruta, base, propios, ajenos) -> tuple:
+        """
+        Fusiona los datos propios de un archivo con los que otro proceso guardó en él.
+
+        Por omisión se fusionan registro por registro las listas de registros con `clave_registro`;
+        cualquier otro archivo se reemplaza con los datos propios (gana la última escritura).
+
+            Args:
+                ruta (Path): Ruta del archivo.
+                base: Datos del archivo tal como se leyeron o escribieron la última vez.
+                propios: Datos que se quieren guardar.
+                ajenos: Datos que tiene ahora el archivo.
+
+            Returns:
+                tuple: (datos fusionados, cambios ajenos, IDs en conflicto), como en `fusionar_registros`.
+        """
+        if not self.clave_registro or not isinstance(propios or [], list) or not isinstance(ajenos, list):
+            return propios, {}, []
+        return fusionar_registros(base or [], propios or [], ajenos, self.clave_registro)
+
+    def _escribir_archivo(self, ruta, datos):
+        """
+        Escribe un archivo de datos completo (al compactar el diario).
+
+            Args:
+                ruta (Path): Ruta del archivo.
+                datos: Datos serializables a JSON.
+        """
+        escribir_json(ruta, datos, ensure_ascii=self.ensure_ascii)
+
+    def _al_guardar(self, error, resultado):
+        """
+        Actualiza las versiones conocidas y aplica en memoria los cambios de otros procesos después de guardar.
+
+        Se ejecuta en el hilo que modifica los datos (en la GUI, el hilo de Tk).
+        """
+        if isinstance(error, ConflictoEscritura):
+            resultado = error.resultado
+        for ruta, (datos, version, cambios, posicion) in (resultado or {}).items():
+            self._registrar_sincronizacion(ruta, datos, version, posicion)
+            if cambios:
+                self._aplicar_cambios_externos(ruta, cambios)
+
+    def _aplicar_cambios_externos(self, ruta, cambios: dict):
+        """
+        Aplica en memoria los registros que otro proceso agregó, modificó o eliminó en un archivo.
+
+            Args:
+                ruta (Path): Archivo en el que ocurrieron los cambios.
+                cambios (dict): id -> registro nuevo, o None si se eliminó.
+        """
+        raise NotImplementedError
+
+    def sincronizar(self) -> bool:
+        """
+        Aplica en memoria los cambios que otros procesos guardaron desde la última lectura o escritura.
+
+        Solo se revisa un archivo si su versión cambió; en ese caso basta con aplicar las operaciones
+        nuevas del diario, y en memoria solo se tocan los registros que difieren. No debe llamarse
+        mientras haya escrituras propias pendientes.
+
+            Returns:
+                bool: True si se aplicó algún cambio.
+        """
+        if not self._versiones:
+            return False
+
+        hubo_cambios = False
+        for ruta, version_conocida in list(self._versiones.items()):
+            base = self._bases.get(ruta)
+            with VersionArchivo(ruta) as version:
+                if version.actual == version_conocida:
+                    continue
+                ajenos, posicion = self._leer_en_disco(ruta, base, (self._posiciones or {}).get(ruta))
+            cambios = {}
+            if ajenos is not None:
+                _, cambios, _ = self._fusionar(ruta, base, base, ajenos)
+            self._registrar_sincronizacion(ruta, ajenos, version.actual, posicion)
+            if cambios:
+                self._aplicar_cambios_externos(ruta, cambios)
+                hubo_cambios = True
+        return hubo_cambios
+
+    def guardar_datos(self) -> bool:
+        """
+        Guarda los datos de inmediato en el hilo actual.
+
+            Returns:
+                bool: True si se guardó correctamente, False si ocurrió un error.
+        """
+        try:
+            resultado = self._escribir(self._preparar())
+        except ConflictoEscritura as e:
+            print(f"Error al guardar {self.nombre_datos}: {e}")
+            self._al_guardar(e, None)
+            return False
+        except Exception as e:
+            print(f"Error al guardar {self.nombre_datos}: {e}")
+            return False
+        self._al_guardar(None, resultado)
+        return True
+
+    def persistir_cambios(self) -> bool:
+        """
+        Guarda los cambios después de una modificación.
+
+        Si hay una unidad de trabajo activa, el guardado se deja para cuando se confirme. Si no, y hay un
+        trabajador de persistencia asignado, la escritura se encola y los errores se informan a través
+        del trabajador; si no, se guarda de inmediato.
+
+            Returns:
+                bool: True si se guardó (o encoló) correctamente, False si ocurrió un error.
+        """
+        unidad = unidad_actual()
+        if unidad is not None:
+            unidad.registrar(self)
+            return True
+        if self.trabajador_io is None:
+            return self.guardar_datos()
+
+        try:
+            escrituras = self._preparar()
+        except Exception as e:
+            print(f"Error al guardar {self.nombre_datos}: {e}")
+            return False
+        self.trabajador_io.encolar(id(self), self._escribir, escrituras, al_terminar=self._al_guardar,
+                                   combinar=self._combinar_escrituras)
+        return True
+
+    @staticmethod
+    def _combinar_escrituras(args_pendientes: tuple, args_nuevos: tuple) -> tuple:
+        """
+        Combina una escritura pendiente con una nueva del mismo gestor.
+
+        De cada archivo se conserva solo la versión más reciente; los archivos que solo estaban en la
+        escritura pendiente se escriben primero, para respetar el orden en que se prepararon.
+        """
+        nuevas = args_nuevos[0]
+        rutas_nuevas = {escritura[0] for escritura in nuevas}
+        return ([escritura for escritura in args_pendientes[0] if escritura[0] not in rutas_nuevas] + nuevas,)
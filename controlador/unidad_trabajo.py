@@ -0,0 +1,203 @@
+import threading
+from contextlib import contextmanager, ExitStack
+from utils.persistencia import Transaccion, VersionArchivo, ConflictoEscritura
+
+# Unidad de trabajo activa en cada hilo
+_hilo_local = threading.local()
+
+
+class UnidadDeTrabajo:
+    """
+    Conjunto de cambios en uno o varios gestores que se guardan juntos o se deshacen juntos.
+
+    Mientras la unidad está activa (ver `unidad_de_trabajo`), los gestores no escriben al llamar a
+    `persistir_cambios`: solo se anotan en la unidad. Cada cambio en memoria deja además una función
+    para deshacerlo, y los eventos se retienen hasta confirmar.
+
+        Attributes:
+            _gestores (list): Gestores modificados, en el orden en que se modificaron por primera vez.
+            _deshacer (list): Funciones que deshacen los cambios en memoria, en el orden en que se hicieron.
+            _eventos (list): Tuplas (bus, tipo, datos) de los eventos retenidos.
+    """
+
+    def __init__(self):
+        """
+        Inicializa una unidad de trabajo vacía.
+        """
+        self._gestores = []
+        self._deshacer = []
+        self._eventos = []
+
+    def registrar(self, gestor):
+        """
+        Anota un gestor cuyos datos hay que guardar al confirmar.
+        """
+        if not any(registrado is gestor for registrado in self._gestores):
+            self._gestores.append(gestor)
+
+    def al_deshacer(self, funcion):
+        """
+        Anota la función que deshace un cambio en memoria.
+        """
+        self._deshacer.append(funcion)
+
+    def retener_evento(self, bus, tipo: str, datos: dict):
+        """
+        Retiene un evento para publicarlo solo si la unidad se confirma.
+        """
+        self._eventos.append((bus, tipo, datos))
+
+    def marca(self) -> tuple:
+        """
+        Devuelve la posición actual, para deshacer después solo lo que se haga a partir de aquí.
+        """
+        return len(self._deshacer), len(self._eventos)
+
+    def deshacer(self, marca: tuple = (0, 0)):
+        """
+        Deshace en orden inverso los cambios en memoria hechos desde la marca y descarta sus eventos.
+
+            Args:
+                marca (tuple): Posición devuelta por `marca` (por omisión, el inicio de la unidad).
+        """
+        cambios, eventos = marca
+        while len(self._deshacer) > cambios:
+            funcion = self._deshacer.pop()
+            try:
+                funcion()
+            except Exception as e:
+                print(f"Error al deshacer un cambio: {e}")
+        del self._eventos[eventos:]
+
+    def confirmar(self):
+        """
+        Guarda una sola vez los archivos de cada gestor modificado, todos en una misma transacción,
+        y publica los eventos retenidos.
+
+        Si los gestores tienen un trabajador de persistencia, la escritura se encola en él; si no, se
+        hace de inmediato y, si falla (también si otro proceso cambió alguno de los mismos registros,
+        en cuyo caso no se escribe ningún archivo), se deshacen los cambios en memoria, no se publican
+        los eventos y se propaga el error.
+
+        Con un trabajador los eventos se publican al encolar, y si después la escritura falla, los
+        cambios en memoria no se deshacen: otros cambios pueden haberse hecho ya sobre los mismos
+        objetos. El error se entrega en `TrabajadorPersistencia.procesar_resultados`, y como los
+        gestores conservan la versión de los archivos anterior a la unidad, su próximo guardado
+        vuelve a fusionar esos cambios con lo que haya en disco.
+
+            Raises:
+                ConflictoEscritura: Si, al escribir de inmediato, otro proceso cambió los mismos registros.
+        """
+        if self._gestores:
+            preparadas = [(gestor, gestor._preparar()) for gestor in self._gestores]
+            trabajador = next((gestor.trabajador_io for gestor in self._gestores
+                               if gestor.trabajador_io is not None), None)
+            if trabajador is None:
+                try:
+                    resultados = escribir_unidad(preparadas)
+                except Exception:
+                    self.deshacer()
+                    raise
+                _al_escribir_unidad(None, resultados)
+            else:
+                trabajador.encolar(('unidad', id(self)), escribir_unidad, preparadas,
+                                   al_terminar=_al_escribir_unidad)
+
+        for bus, tipo, datos in self._eventos:
+            bus.publicar(tipo, **datos)
+
+
+def unidad_actual():
+    """
+    Devuelve la unidad de trabajo activa en el hilo actual, o None si no hay ninguna.
+    """
+    return getattr(_hilo_local, 'unidad', None)
+
+
+@contextmanager
+def unidad_de_trabajo():
+    """
+    Agrupa los cambios hechos dentro del bloque en una unidad de trabajo.
+
+    Al salir del bloque sin errores, cada archivo afectado se escribe una sola vez y todos se
+    reemplazan juntos; si ocurre una excepción, los objetos en memoria vuelven a como estaban
+    y no se escribe nada:
+
+        with unidad_de_trabajo():
+            gestor_citas.completar_cita(cita)
+            gestor_diagnosticos...
+
+    Si ya hay una unidad activa en el hilo, el bloque forma parte de ella: una excepción dentro
+    del bloque deshace solo lo hecho en él, y el guardado ocurre al terminar la unidad exterior.
+
+        Yields:
+            UnidadDeTrabajo: Unidad activa.
+    """
+    exterior = unidad_actual()
+    if exterior is not None:
+        marca = exterior.marca()
+        try:
+            yield exterior
+        except BaseException:
+            exterior.deshacer(marca)
+            raise
+        return
+
+    unidad = UnidadDeTrabajo()
+    _hilo_local.unidad = unidad
+    try:
+        yield unidad
+    except BaseException:
+        unidad.deshacer()
+        raise
+    finally:
+        _hilo_local.unidad = None
+    unidad.confirmar()
+
+
+def escribir_unidad(preparadas: list) -> list:
+    """
+    Escribe los archivos de varios gestores como una sola transacción.
+
+    Se bloquean todos los archivos (en orden de ruta, para que dos procesos no se esperen mutuamente)
+    antes de escribir el primero, y se liberan después de reemplazar el último. Si algún gestor tiene
+    un conflicto con otro proceso, se descarta la transacción completa: no se reemplaza ningún archivo,
+    tampoco los de los gestores que no tenían conflictos.
+
+        Args:
+            preparadas (list): Tuplas (gestor, escrituras preparadas por `gestor._preparar`).
+
+        Returns:
+            list: Tuplas (gestor, resultado de `gestor._escribir`).
+
+        Raises:
+            ConflictoEscritura: Con los registros en conflicto de todos los gestores.
+    """
+    rutas = sorted({escritura[0] for _, escrituras in preparadas for escritura in escrituras}, key=str)
+    resultados = []
+    with ExitStack() as bloqueos:
+        versiones = {ruta: bloqueos.enter_context(VersionArchivo(ruta)) for ruta in rutas}
+        transaccion = Transaccion()
+        with transaccion.activa():
+            conflictos = []
+            for gestor, escrituras in preparadas:
+                try:
+                    resultados.append((gestor, gestor._escribir(escrituras, versiones)))
+                except ConflictoEscritura as e:
+                    conflictos.extend(e.conflictos)
+        if conflictos:
+            transaccion.descartar()
+            raise ConflictoEscritura(conflictos)
+        transaccion.confirmar()
+    return resultados
+
+
+def _al_escribir_unidad(error, resultados):
+    """
+    Entrega a cada gestor el resultado de su parte de la transacción.
+    """
+    # Los errores ya los informa el trabajador de persistencia (ver `procesar_resultados`)
+    if error is not None:
+        return
+    for gestor, resultado in resultados:
+        gestor._al_guardar(None, resultado)
@@ -1,9 +1,66 @@
-from vista.gui import GUI
+import argparse
+import atexit
+
 
 def main():
-    """Función principal que inicia la aplicación."""
+    """
+    Función principal que inicia la aplicación (la interfaz gráfica o, con --servidor, la API HTTP/JSON)
+    o, con --importar o --exportar, importa pacientes o médicos desde un CSV o exporta las citas.
+    Con --instrumentar se miden además las operaciones (ver utils.instrumentacion).
+    """
+    parser = argparse.ArgumentParser(description="Sistema de Gestión Clínica")
+    parser.add_argument("--servidor", action="store_true",
+                        help="inicia la API HTTP/JSON sin interfaz gráfica, para compartir los datos entre varios puestos")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección de la API (por defecto 127.0.0.1)")
+    parser.add_argument("--puerto", type=int, default=8080, help="puerto de la API (por defecto 8080)")
+    parser.add_argument("--importar", nargs=2, metavar=("TIPO", "ARCHIVO"),
+                        help="importa 'pacientes' o 'medicos' desde un archivo CSV con encabezados")
+    parser.add_argument("--errores", metavar="ARCHIVO",
+                        help="informe de las filas rechazadas al importar (por defecto <ARCHIVO>.errores.csv)")
+    parser.add_argument("--exportar", nargs=2, metavar=("FORMATO", "ARCHIVO"),
+                        help="exporta las citas con pacientes, médicos y diagnósticos en 'csv' o 'ndjson' "
+                             "(ARCHIVO '-' para la salida estándar)")
+    parser.add_argument("--desde", metavar="DD/MM/AAAA", help="fecha inicial de las citas a exportar")
+    parser.add_argument("--hasta", metavar="DD/MM/AAAA", help="fecha final de las citas a exportar")
+    parser.add_argument("--instrumentar", nargs="?", const="", metavar="ARCHIVO",
+                        help="mide la duración de las operaciones y los bytes leídos y escritos; si se indica "
+                             "ARCHIVO, al terminar se guardan ahí las mediciones en JSON")
+    args = parser.parse_args()
+
+    from utils import instrumentacion
+    if args.instrumentar is not None:
+        instrumentacion.activar()
+        if args.instrumentar:
+            atexit.register(instrumentacion.guardar_resumen, args.instrumentar)
+    else:
+        instrumentacion.activar_desde_entorno()
+
+    if args.exportar:
+        from vista.exportacion import exportar, FORMATOS_EXPORTACION
+        formato, archivo = args.exportar
+        if formato not in FORMATOS_EXPORTACION:
+            parser.error(f"FORMATO debe ser uno de: {', '.join(FORMATOS_EXPORTACION)}")
+        if not exportar(formato, archivo, args.desde, args.hasta):
+            raise SystemExit(1)
+        return
+
+    if args.importar:
+        from vista.importacion import importar_csv, COLUMNAS_IMPORTACION
+        tipo, archivo = args.importar
+        if tipo not in COLUMNAS_IMPORTACION:
+            parser.error(f"TIPO debe ser uno de: {', '.join(COLUMNAS_IMPORTACION)}")
+        if not importar_csv(tipo, archivo, args.errores):
+            raise SystemExit(1)
+        return
+
+    if args.servidor:
+        from vista.servidor_api import ServidorApi
+        ServidorApi(args.host, args.puerto).ejecutar()
+        return
+
+    from vista.gui import GUI
     app = GUI()
     app.ejecutar()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -59,6 +59,15 @@ class Cita:
         self._fecha = nueva_fecha
         self._hora = nueva_hora
 
+    def reasignar_medico(self, nuevo_medico: Medico):
+        """
+        Asigna la cita a otro médico.
+
+            Args:
+                nuevo_medico (Medico): Médico que atenderá la cita.
+        """
+        self._medico = nuevo_medico
+
     @property
     def id_cita(self) -> str:
         """
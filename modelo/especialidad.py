@@ -35,6 +35,15 @@ class Especialidad:
         """
         return self._descripcion
 
+    def cambiar_descripcion(self, descripcion: str):
+        """
+        Cambia la descripción de la especialidad.
+
+            Args:
+                descripcion (str): Nueva descripción.
+        """
+        self._descripcion = descripcion
+
     def __str__(self):
         """
        Devuelve una representación legible de la especialidad.
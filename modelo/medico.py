@@ -41,6 +41,15 @@ class Medico(Persona):
         """
         self._citas.append(cita)
 
+    def cambiar_especialidad(self, especialidad: Especialidad):
+        """
+        Cambia la especialidad del médico.
+
+            Args:
+                especialidad (Especialidad): Nueva especialidad.
+        """
+        self._especialidad = especialidad
+
     def obtener_citas(self) -> list:
         """
         Obtiene la lista de citas asignadas al médico.
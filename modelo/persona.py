@@ -24,6 +24,21 @@ class Persona:
         self._fecha_nacimiento = fecha_nacimiento
         self._telefono = telefono
 
+    def actualizar_datos(self, nombre: str, apellido: str, fecha_nacimiento: str, telefono: str):
+        """
+        Reemplaza los datos básicos de la persona (por ejemplo, con los que guardó otro proceso).
+
+            Args:
+                nombre (str): Nombre de la persona.
+                apellido (str): Apellido de la persona.
+                fecha_nacimiento (str): Fecha de nacimiento en formato DD/MM/AAAA.
+                telefono (str): Número de teléfono de contacto.
+        """
+        self._nombre = nombre
+        self._apellido = apellido
+        self._fecha_nacimiento = fecha_nacimiento
+        self._telefono = telefono
+
     def get_nombre_completo(self) -> str:
         """
         Obtiene el nombre completo de la persona.
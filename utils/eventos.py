@@ -0,0 +1,135 @@
+PACIENTE_AGREGADO = "paciente_agregado"
+CITA_AGENDADA = "cita_agendada"
+CITA_CANCELADA = "cita_cancelada"
+CITA_COMPLETADA = "cita_completada"
+CITA_REAGENDADA = "cita_reagendada"
+DIAGNOSTICO_REGISTRADO = "diagnostico_registrado"
+
+# Tipo de evento -> datos que lleva cada evento de ese tipo
+TIPOS_EVENTO = {
+    PACIENTE_AGREGADO: ('paciente',),
+    CITA_AGENDADA: ('cita',),
+    CITA_CANCELADA: ('cita',),
+    CITA_COMPLETADA: ('cita',),
+    CITA_REAGENDADA: ('cita', 'fecha_anterior', 'hora_anterior', 'medico_anterior'),
+    DIAGNOSTICO_REGISTRADO: ('diagnostico',),
+}
+
+
+class Evento:
+    """
+    Cambio ocurrido en los datos, publicado a través de un BusEventos.
+
+        Attributes:
+            tipo (str): Tipo del evento (una de las claves de TIPOS_EVENTO).
+            datos (dict): Datos del evento (por ejemplo, {'cita': Cita} en 'cita_agendada').
+    """
+
+    def __init__(self, tipo: str, datos: dict):
+        """
+        Inicializa un evento.
+
+            Args:
+                tipo (str): Tipo del evento.
+                datos (dict): Datos del evento.
+        """
+        self._tipo = tipo
+        self._datos = datos
+
+    @property
+    def tipo(self) -> str:
+        """
+        str: Devuelve el tipo del evento.
+        """
+        return self._tipo
+
+    @property
+    def datos(self) -> dict:
+        """
+        dict: Devuelve los datos del evento.
+        """
+        return self._datos
+
+    def __getitem__(self, clave: str):
+        """
+        Devuelve un dato del evento (por ejemplo, evento['cita']).
+        """
+        return self._datos[clave]
+
+
+class BusEventos:
+    """
+    Bus de publicación/suscripción dentro del proceso.
+
+    Los gestores publican un evento después de cada cambio que ya quedó en memoria, y los índices,
+    cachés, estadísticas o pantallas suscritos se actualizan con ese cambio en lugar de recalcularlo
+    todo. Los suscriptores se llaman en el mismo hilo que publica, en el orden en que se suscribieron;
+    un error en un suscriptor se informa y no impide avisar a los demás.
+
+        bus = BusEventos()
+        bus.suscribir(CITA_AGENDADA, lambda evento: print(evento['cita'].id_cita))
+        gestor_citas.bus_eventos = bus
+
+        Attributes:
+            _suscriptores (dict): Tipo de evento -> lista de funciones suscritas.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un bus sin suscriptores.
+        """
+        self._suscriptores = {tipo: [] for tipo in TIPOS_EVENTO}
+
+    def suscribir(self, tipo: str, manejador):
+        """
+        Suscribe una función a un tipo de evento.
+
+            Args:
+                tipo (str): Tipo de evento.
+                manejador (callable): Función que recibe el Evento.
+
+            Raises:
+                ValueError: Si el tipo de evento no existe.
+        """
+        if tipo not in self._suscriptores:
+            raise ValueError(f"Tipo de evento no válido: {tipo}")
+        self._suscriptores[tipo].append(manejador)
+
+    def cancelar_suscripcion(self, tipo: str, manejador):
+        """
+        Quita una función de los suscriptores de un tipo de evento, si estaba suscrita.
+
+            Args:
+                tipo (str): Tipo de evento.
+                manejador (callable): Función suscrita.
+        """
+        suscriptores = self._suscriptores.get(tipo, [])
+        if manejador in suscriptores:
+            suscriptores.remove(manejador)
+
+    def publicar(self, tipo: str, **datos):
+        """
+        Avisa a los suscriptores de un tipo de evento.
+
+            Args:
+                tipo (str): Tipo de evento.
+                **datos: Datos del evento; deben ser exactamente los indicados en TIPOS_EVENTO.
+
+            Raises:
+                ValueError: Si el tipo de evento no existe o los datos no son los esperados.
+        """
+        campos = TIPOS_EVENTO.get(tipo)
+        if campos is None:
+            raise ValueError(f"Tipo de evento no válido: {tipo}")
+        if set(datos) != set(campos):
+            raise ValueError(f"El evento {tipo} debe llevar los datos: {', '.join(campos)}")
+
+        suscriptores = self._suscriptores[tipo]
+        if not suscriptores:
+            return
+        evento = Evento(tipo, datos)
+        for manejador in list(suscriptores):
+            try:
+                manejador(evento)
+            except Exception as e:
+                print(f"Error al procesar el evento {tipo}: {e}")
@@ -0,0 +1,176 @@
+from bisect import bisect_left, insort
+from collections import Counter
+
+from utils.texto import normalizar_texto
+
+
+class IndicePrefijos:
+    """
+    Índice ordenado para buscar elementos por el prefijo de cualquiera de sus claves de texto.
+
+    Cada elemento se registra con una o varias claves (por ejemplo, nombre, apellido y teléfono).
+    Las claves se normalizan (minúsculas y sin acentos) y se mantienen en una lista ordenada,
+    de modo que una búsqueda por prefijo cuesta una búsqueda binaria más los resultados devueltos.
+
+        Attributes:
+            _entradas (list): Lista ordenada de tuplas (clave_normalizada, id_elemento).
+    """
+
+    def __init__(self):
+        """
+        Inicializa un índice vacío.
+        """
+        self._entradas = []
+
+    def construir(self, elementos):
+        """
+        Construye el índice completo de una sola vez (más rápido que agregar uno por uno).
+
+            Args:
+                elementos (iterable): Pares (id_elemento, claves), donde claves es una lista de textos.
+        """
+        self._entradas = sorted(
+            (normalizar_texto(clave), id_elemento)
+            for id_elemento, claves in elementos
+            for clave in claves if clave
+        )
+
+    def agregar(self, id_elemento: str, claves: list):
+        """
+        Agrega un elemento al índice manteniendo el orden.
+
+            Args:
+                id_elemento (str): Identificador del elemento.
+                claves (list): Textos por los que se podrá encontrar el elemento.
+        """
+        for clave in claves:
+            if clave:
+                insort(self._entradas, (normalizar_texto(clave), id_elemento))
+
+    def buscar(self, prefijo: str, limite: int = 20) -> list:
+        """
+        Busca los elementos que tienen alguna clave que empieza con el prefijo.
+
+            Args:
+                prefijo (str): Texto inicial a buscar (se normaliza igual que las claves).
+                limite (int): Número máximo de elementos a devolver.
+
+            Returns:
+                list: IDs de los elementos encontrados, sin repetidos, en orden alfabético de la clave.
+        """
+        prefijo = normalizar_texto(prefijo.strip())
+        encontrados = []
+        vistos = set()
+        posicion = bisect_left(self._entradas, (prefijo,))
+        while posicion < len(self._entradas) and len(encontrados) < limite:
+            clave, id_elemento = self._entradas[posicion]
+            if not clave.startswith(prefijo):
+                break
+            if id_elemento not in vistos:
+                vistos.add(id_elemento)
+                encontrados.append(id_elemento)
+            posicion += 1
+        return encontrados
+
+
+class IndiceNgramas:
+    """
+    Índice de trigramas para búsquedas aproximadas de texto (nombres con errores de escritura).
+
+    En lugar de comparar la consulta contra todos los elementos, se obtienen como candidatos solo los
+    que comparten trigramas con ella y después se calcula la similitud exacta de los mejores candidatos.
+
+        Attributes:
+            _textos (dict): id_elemento -> texto normalizado.
+            _trigramas (dict): trigrama -> set de IDs de elementos que lo contienen.
+    """
+
+    # Candidatos (por trigramas compartidos) a los que se calcula la similitud exacta
+    MAX_CANDIDATOS = 100
+
+    def __init__(self):
+        """
+        Inicializa un índice vacío.
+        """
+        self._textos = {}
+        self._trigramas = {}
+
+    @staticmethod
+    def _obtener_trigramas(texto: str) -> set:
+        """
+        Devuelve el conjunto de trigramas de un texto ya normalizado (con espacios de relleno en los extremos).
+        """
+        texto = f"  {texto} "
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    def agregar(self, id_elemento: str, texto: str):
+        """
+        Agrega un elemento al índice.
+
+            Args:
+                id_elemento (str): Identificador del elemento.
+                texto (str): Texto por el que se buscará el elemento.
+        """
+        normalizado = " ".join(normalizar_texto(texto).split())
+        self._textos[id_elemento] = normalizado
+        for trigrama in self._obtener_trigramas(normalizado):
+            self._trigramas.setdefault(trigrama, set()).add(id_elemento)
+
+    def buscar(self, texto: str, limite: int = 5, umbral: float = 0.75) -> list:
+        """
+        Busca los elementos cuyo texto se parece al indicado.
+
+            Args:
+                texto (str): Texto a buscar.
+                limite (int): Número máximo de resultados.
+                umbral (float): Similitud mínima (0 a 1) para incluir un resultado.
+
+            Returns:
+                list: Tuplas (id_elemento, similitud) ordenadas de mayor a menor similitud.
+        """
+        normalizado = " ".join(normalizar_texto(texto).split())
+        trigramas = self._obtener_trigramas(normalizado)
+
+        compartidos = Counter()
+        for trigrama in trigramas:
+            compartidos.update(self._trigramas.get(trigrama, ()))
+
+        # Preselección de los que más trigramas comparten con la consulta
+        resultados = []
+        for id_elemento, _ in compartidos.most_common(self.MAX_CANDIDATOS):
+            similitud = similitud_textos(normalizado, self._textos[id_elemento])
+            if similitud >= umbral:
+                resultados.append((id_elemento, similitud))
+        resultados.sort(key=lambda par: par[1], reverse=True)
+        return resultados[:limite]
+
+
+def similitud_textos(a: str, b: str) -> float:
+    """
+    Calcula la similitud entre dos textos a partir de la distancia de edición con transposiciones
+    (una letra cambiada, sobrante, faltante o dos letras contiguas intercambiadas cuentan como un error).
+
+        Args:
+            a (str): Primer texto (normalizado).
+            b (str): Segundo texto (normalizado).
+
+        Returns:
+            float: 1.0 si son iguales, 0.0 si no tienen nada en común.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    anterior2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            costo = 0 if a[i - 1] == b[j - 1] else 1
+            actual[j] = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + costo)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                actual[j] = min(actual[j], anterior2[j - 2] + 1)
+        anterior2, anterior = anterior, actual
+
+    return 1.0 - anterior[len(b)] / max(len(a), len(b))
@@ -0,0 +1,171 @@
+import hashlib
+import hmac
+import os
+import pickle
+from pathlib import Path
+from utils.persistencia import NOMBRE_DIARIO
+
+# Se incrementa cuando cambia el formato de la instantánea, para descartar las anteriores
+VERSION_INSTANTANEA = 4
+
+# Clave con la que se firma la instantánea. Está fuera de la carpeta de datos (que se comparte entre
+# puestos y usuarios) porque cargar una instantánea ejecuta el código que contenga: solo se carga si
+# la firmó alguien con acceso a esta clave
+RUTA_CLAVE = Path.home() / ".ezmed" / "instantanea.key"
+
+# Bytes leídos por vez al calcular el hash de un archivo
+TAMANO_BLOQUE = 1024 * 1024
+
+
+def _archivos_fuente(dir_datos: Path) -> list:
+    """
+    Lista los archivos JSON de los que se cargan los datos (incluido el historial de citas) y el diario
+    con los cambios posteriores a su último punto de control.
+
+        Args:
+            dir_datos (Path): Carpeta de datos.
+
+        Returns:
+            list: Rutas ordenadas de los archivos fuente.
+    """
+    archivos = [ruta for ruta in Path(dir_datos).rglob('*.json') if not ruta.name.endswith('.idx.json')]
+    diario = Path(dir_datos) / NOMBRE_DIARIO
+    if diario.exists():
+        archivos.append(diario)
+    return sorted(archivos)
+
+def _huella(ruta: Path) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo.
+    """
+    huella = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(TAMANO_BLOQUE), b''):
+            huella.update(bloque)
+    return huella.hexdigest()
+
+def _obtener_clave(ruta_clave: Path, crear: bool) -> bytes:
+    """
+    Lee la clave con la que se firman las instantáneas, creándola (solo legible por el usuario) si no existe.
+
+        Args:
+            ruta_clave (Path): Archivo de la clave.
+            crear (bool): Si es False y la clave no existe, se devuelve None.
+
+        Returns:
+            bytes: Clave, o None si no existe y no se pidió crearla.
+    """
+    ruta_clave = Path(ruta_clave)
+    if not ruta_clave.exists():
+        if not crear:
+            return None
+        ruta_clave.parent.mkdir(parents=True, exist_ok=True)
+        descriptor = os.open(ruta_clave, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(os.urandom(32))
+    with open(ruta_clave, 'rb') as archivo:
+        return archivo.read()
+
+def _firma(clave: bytes, contenido: bytes) -> bytes:
+    """
+    Calcula la firma HMAC-SHA256 del contenido de una instantánea.
+    """
+    return hmac.new(clave, contenido, hashlib.sha256).digest()
+
+def guardar_instantanea(ruta: Path, objetos: dict, dir_datos: Path, ruta_clave: Path = None) -> bool:
+    """
+    Guarda en un archivo binario los objetos ya cargados, junto con el estado de los archivos fuente.
+
+    El archivo empieza con la firma HMAC del resto, calculada con la clave de `ruta_clave`.
+
+    Debe llamarse solo cuando los datos en memoria coinciden con los archivos (por ejemplo, al cerrar
+    después de terminar todas las escrituras).
+
+        Args:
+            ruta (Path): Ruta del archivo de la instantánea.
+            objetos (dict): Objetos a guardar (por ejemplo, nombre -> gestor).
+            dir_datos (Path): Carpeta con los archivos JSON de los que provienen los objetos.
+            ruta_clave (Path): Archivo de la clave de firma (por omisión, RUTA_CLAVE).
+
+        Returns:
+            bool: True si se guardó correctamente, False si ocurrió un error.
+    """
+    ruta = Path(ruta)
+    try:
+        clave = _obtener_clave(ruta_clave or RUTA_CLAVE, crear=True)
+        fuentes = {}
+        for archivo in _archivos_fuente(dir_datos):
+            estado = archivo.stat()
+            fuentes[str(archivo)] = (estado.st_size, estado.st_mtime_ns, _huella(archivo))
+
+        contenido = pickle.dumps({
+            'version': VERSION_INSTANTANEA,
+            'fuentes': fuentes,
+            'objetos': objetos,
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_suffix('.tmp')
+        with open(temporal, 'wb') as archivo:
+            archivo.write(_firma(clave, contenido) + contenido)
+        os.replace(temporal, ruta)
+        return True
+    except Exception as e:
+        print(f"Error al guardar la instantánea: {e}")
+        return False
+
+def cargar_instantanea(ruta: Path, dir_datos: Path, ruta_clave: Path = None):
+    """
+    Carga los objetos de una instantánea si sigue correspondiendo a los archivos fuente.
+
+    Antes de decodificarla se comprueba su firma: una instantánea que no se firmó con la clave de
+    `ruta_clave` (por ejemplo, una que otro usuario dejó en la carpeta de datos compartida) no se carga.
+
+    Un archivo se considera sin cambios si conserva su tamaño y fecha de modificación; si solo
+    cambió la fecha, se compara su hash. Si falta algún archivo, aparece uno nuevo o la instantánea
+    no se puede leer, se devuelve None para que los datos se carguen desde los JSON.
+
+        Args:
+            ruta (Path): Ruta del archivo de la instantánea.
+            dir_datos (Path): Carpeta con los archivos JSON de los que provienen los objetos.
+            ruta_clave (Path): Archivo de la clave de firma (por omisión, RUTA_CLAVE).
+
+        Returns:
+            dict | None: Los objetos guardados, o None si la instantánea no existe o no es válida.
+    """
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return None
+
+    try:
+        clave = _obtener_clave(ruta_clave or RUTA_CLAVE, crear=False)
+        if clave is None:
+            return None
+        with open(ruta, 'rb') as archivo:
+            firma = archivo.read(hashlib.sha256().digest_size)
+            contenido = archivo.read()
+        if not hmac.compare_digest(firma, _firma(clave, contenido)):
+            print("La instantánea no tiene una firma válida, se cargarán los archivos JSON")
+            return None
+        instantanea = pickle.loads(contenido)
+
+        if instantanea.get('version') != VERSION_INSTANTANEA:
+            return None
+
+        fuentes = instantanea['fuentes']
+        archivos = _archivos_fuente(dir_datos)
+        if sorted(fuentes) != sorted(str(archivo) for archivo in archivos):
+            return None
+
+        for archivo in archivos:
+            tamano, mtime_ns, huella = fuentes[str(archivo)]
+            estado = archivo.stat()
+            if estado.st_size != tamano:
+                return None
+            if estado.st_mtime_ns != mtime_ns and _huella(archivo) != huella:
+                return None
+
+        return instantanea['objetos']
+    except Exception as e:
+        print(f"Instantánea no válida, se cargarán los archivos JSON: {e}")
+        return None
@@ -0,0 +1,326 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import types
+from bisect import bisect_left
+from pathlib import Path
+
+# Si la variable de entorno tiene un valor distinto de vacío o "0", la medición se activa al iniciar
+VARIABLE_ENTORNO = "EZMED_INSTRUMENTACION"
+
+# Límites superiores (en milisegundos) de las cubetas de los histogramas de duración
+LIMITES_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Límites superiores (en bytes) de las cubetas de los histogramas de bytes leídos y escritos
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histograma:
+    """
+    Distribución de los valores medidos de una operación, agrupados en cubetas con límites fijos.
+
+        Attributes:
+            _limites (tuple): Límite superior de cada cubeta; los valores mayores al último van a una cubeta extra.
+            _cubetas (list): Cantidad de valores en cada cubeta.
+            _cantidad (int): Cantidad de valores registrados.
+            _total (float): Suma de los valores registrados.
+            _minimo (float): Menor valor registrado, o None si no hay ninguno.
+            _maximo (float): Mayor valor registrado, o None si no hay ninguno.
+    """
+
+    def __init__(self, limites: tuple):
+        """
+        Inicializa un histograma vacío.
+
+            Args:
+                limites (tuple): Límites superiores de las cubetas, en orden creciente.
+        """
+        self._limites = limites
+        self._cubetas = [0] * (len(limites) + 1)
+        self._cantidad = 0
+        self._total = 0
+        self._minimo = None
+        self._maximo = None
+
+    @property
+    def cantidad(self) -> int:
+        return self._cantidad
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def registrar(self, valor: float):
+        """
+        Agrega un valor al histograma.
+        """
+        self._cubetas[bisect_left(self._limites, valor)] += 1
+        self._cantidad += 1
+        self._total += valor
+        if self._minimo is None or valor < self._minimo:
+            self._minimo = valor
+        if self._maximo is None or valor > self._maximo:
+            self._maximo = valor
+
+    def percentil(self, fraccion: float) -> float:
+        """
+        Estima un percentil como el límite superior de la cubeta en la que cae.
+
+            Args:
+                fraccion (float): Percentil entre 0 y 1 (por ejemplo, 0.95).
+
+            Returns:
+                float: Valor estimado (el máximo registrado si cae en la última cubeta), o None si no
+                       hay valores.
+        """
+        if not self._cantidad:
+            return None
+        objetivo = fraccion * self._cantidad
+        acumulado = 0
+        for indice, cantidad in enumerate(self._cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo and cantidad:
+                limite = self._limites[indice] if indice < len(self._limites) else self._maximo
+                return min(limite, self._maximo)
+        return self._maximo
+
+    def a_diccionario(self) -> dict:
+        """
+        Convierte el histograma en un diccionario serializable a JSON.
+
+            Returns:
+                dict: Cantidad, total, mínimo, máximo, promedio, percentiles 50/95/99 y cubetas
+                      (límite superior como texto -> cantidad, solo las que tienen valores).
+        """
+        cubetas = {}
+        for indice, cantidad in enumerate(self._cubetas):
+            if cantidad:
+                limite = str(self._limites[indice]) if indice < len(self._limites) else "inf"
+                cubetas[limite] = cantidad
+        return {
+            'cantidad': self._cantidad,
+            'total': self._total,
+            'minimo': self._minimo,
+            'maximo': self._maximo,
+            'promedio': self._total / self._cantidad if self._cantidad else None,
+            'p50': self.percentil(0.5),
+            'p95': self.percentil(0.95),
+            'p99': self.percentil(0.99),
+            'cubetas': cubetas,
+        }
+
+
+# Estado de la medición en el proceso
+_activa = False
+_bloqueo = threading.RLock()
+# Nombre de la operación ("Clase.metodo") -> Histograma de duraciones en milisegundos
+_tiempos = {}
+# 'leidos'/'escritos' -> nombre del archivo -> Histograma de bytes por lectura o escritura
+_bytes = {'leidos': {}, 'escritos': {}}
+# Clases registradas con `instrumentada`, con los métodos que se miden en cada una
+_clases = []
+# Tuplas (clase, nombre, atributo original o None si era heredado) de los métodos reemplazados
+_originales = []
+
+
+def esta_activa() -> bool:
+    """
+    Indica si se están midiendo las operaciones.
+    """
+    return _activa
+
+
+def instrumentada(metodos: tuple = None):
+    """
+    Decorador de clase que registra sus métodos para medirlos cuando se active la medición.
+
+    Mientras la medición está desactivada la clase no se modifica, así que sus métodos no tienen
+    ningún costo adicional. Al activarla (ver `activar`), cada método se reemplaza en la clase por
+    uno que registra su duración con el nombre "Clase.metodo"; al desactivarla se restauran.
+
+        Args:
+            metodos (tuple): Nombres de los métodos a medir; por omisión, todos los métodos públicos
+                             de la clase y de sus clases base (los que no empiezan con "_").
+
+        Returns:
+            callable: Decorador que devuelve la misma clase.
+    """
+    def registrar(clase):
+        with _bloqueo:
+            _clases.append((clase, metodos))
+            if _activa:
+                _instrumentar(clase, metodos)
+        return clase
+    return registrar
+
+
+def _metodos_publicos(clase) -> list:
+    """
+    Devuelve los nombres de los atributos públicos de una clase y de sus clases base, sin los de object.
+    """
+    nombres = []
+    for base in clase.__mro__[:-1]:
+        for nombre in vars(base):
+            if not nombre.startswith('_') and nombre not in nombres:
+                nombres.append(nombre)
+    return nombres
+
+
+def _instrumentar(clase, metodos: tuple):
+    """
+    Reemplaza en una clase los métodos a medir por versiones que registran su duración.
+
+    Debe llamarse con `_bloqueo` tomado.
+    """
+    for nombre in metodos or _metodos_publicos(clase):
+        funcion = inspect.getattr_static(clase, nombre, None)
+        # Los métodos estáticos y de clase, las propiedades y los demás atributos no se miden
+        if not isinstance(funcion, types.FunctionType):
+            continue
+        original = vars(clase).get(nombre)
+        setattr(clase, nombre, _medida(f"{clase.__name__}.{nombre}", funcion))
+        _originales.append((clase, nombre, original))
+
+
+def _medida(nombre: str, funcion):
+    """
+    Envuelve una función para registrar su duración con el nombre indicado.
+    """
+    @functools.wraps(funcion)
+    def medida(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            registrar_tiempo(nombre, time.perf_counter() - inicio)
+    return medida
+
+
+def activar():
+    """
+    Activa la medición: instrumenta las clases registradas y empieza a contar los bytes leídos y escritos.
+
+    Los métodos que ya se guardaron antes como funciones enlazadas (por ejemplo, el comando de un
+    botón creado antes de activar) siguen llamando a la versión sin medir.
+    """
+    global _activa
+    with _bloqueo:
+        if _activa:
+            return
+        _activa = True
+        for clase, metodos in _clases:
+            _instrumentar(clase, metodos)
+
+
+def desactivar():
+    """
+    Desactiva la medición y restaura los métodos originales. Las mediciones hechas se conservan.
+    """
+    global _activa
+    with _bloqueo:
+        _activa = False
+        while _originales:
+            clase, nombre, original = _originales.pop()
+            if original is None:
+                delattr(clase, nombre)
+            else:
+                setattr(clase, nombre, original)
+
+
+def activar_desde_entorno() -> bool:
+    """
+    Activa la medición si así lo indica la variable de entorno VARIABLE_ENTORNO.
+
+        Returns:
+            bool: True si la medición quedó activa.
+    """
+    if os.environ.get(VARIABLE_ENTORNO, "") not in ("", "0"):
+        activar()
+    return _activa
+
+
+def registrar_tiempo(nombre: str, segundos: float):
+    """
+    Registra la duración de una operación.
+
+        Args:
+            nombre (str): Nombre de la operación (por ejemplo, "GestorCitas.agendar_cita").
+            segundos (float): Duración en segundos.
+    """
+    with _bloqueo:
+        histograma = _tiempos.get(nombre)
+        if histograma is None:
+            histograma = _tiempos[nombre] = Histograma(LIMITES_MS)
+        histograma.registrar(segundos * 1000)
+
+
+def registrar_bytes(tipo: str, ruta, cantidad: int):
+    """
+    Registra los bytes de una lectura o escritura de un archivo de datos. No hace nada si la medición
+    está desactivada.
+
+        Args:
+            tipo (str): 'leidos' o 'escritos'.
+            ruta (Path): Archivo leído o escrito (se agrupa por su nombre).
+            cantidad (int): Cantidad de bytes.
+    """
+    if not _activa:
+        return
+    with _bloqueo:
+        por_archivo = _bytes[tipo]
+        nombre = Path(ruta).name
+        histograma = por_archivo.get(nombre)
+        if histograma is None:
+            histograma = por_archivo[nombre] = Histograma(LIMITES_BYTES)
+        histograma.registrar(cantidad)
+
+
+def reiniciar():
+    """
+    Descarta todas las mediciones hechas hasta ahora.
+    """
+    with _bloqueo:
+        _tiempos.clear()
+        for por_archivo in _bytes.values():
+            por_archivo.clear()
+
+
+def resumen() -> dict:
+    """
+    Devuelve las mediciones hechas hasta ahora.
+
+        Returns:
+            dict: {'activa': bool, 'tiempos_ms': {operación: histograma}, 'bytes': {'leidos': {archivo:
+                  histograma}, 'escritos': {...}}}, con cada histograma como en `Histograma.a_diccionario`
+                  y las operaciones ordenadas por tiempo total, de mayor a menor.
+    """
+    with _bloqueo:
+        tiempos = sorted(_tiempos.items(), key=lambda item: item[1].total, reverse=True)
+        return {
+            'activa': _activa,
+            'tiempos_ms': {nombre: histograma.a_diccionario() for nombre, histograma in tiempos},
+            'bytes': {tipo: {nombre: histograma.a_diccionario() for nombre, histograma in sorted(por_archivo.items())}
+                      for tipo, por_archivo in _bytes.items()},
+        }
+
+
+def guardar_resumen(ruta) -> bool:
+    """
+    Guarda las mediciones (ver `resumen`) en un archivo JSON.
+
+        Args:
+            ruta (Path): Archivo de salida.
+
+        Returns:
+            bool: True si se guardó correctamente, False si ocurrió un error.
+    """
+    try:
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(resumen(), archivo, indent=4, ensure_ascii=False)
+    except OSError as e:
+        print(f"Error al guardar las mediciones: {e}")
+        return False
+    return True
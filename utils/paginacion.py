@@ -0,0 +1,166 @@
+import heapq
+import json
+from itertools import islice
+
+
+class Pagina:
+    """
+    Página de resultados de una consulta.
+
+        Attributes:
+            elementos (list): Elementos de la página.
+            total (int): Número total de elementos de la colección consultada.
+            siguiente_cursor (str): Cursor para pedir la página siguiente, o None si esta es la última.
+    """
+
+    def __init__(self, elementos: list, total: int, siguiente_cursor: str = None):
+        """
+        Inicializa una página de resultados.
+
+            Args:
+                elementos (list): Elementos de la página.
+                total (int): Número total de elementos de la colección consultada.
+                siguiente_cursor (str): Cursor de la página siguiente, o None si no hay más.
+        """
+        self._elementos = elementos
+        self._total = total
+        self._siguiente_cursor = siguiente_cursor
+
+    @property
+    def elementos(self) -> list:
+        """
+        list: Devuelve los elementos de la página.
+        """
+        return self._elementos
+
+    @property
+    def total(self) -> int:
+        """
+        int: Devuelve el número total de elementos de la colección.
+        """
+        return self._total
+
+    @property
+    def siguiente_cursor(self) -> str:
+        """
+        str: Devuelve el cursor de la página siguiente, o None si esta es la última.
+        """
+        return self._siguiente_cursor
+
+
+def clave_id(id_registro: str) -> tuple:
+    """
+    Clave de orden para IDs autoincrementales ('PAC999' va antes que 'PAC1000').
+
+        Args:
+            id_registro (str): ID con prefijo y número.
+
+        Returns:
+            tuple: (longitud, id).
+    """
+    return len(id_registro), id_registro
+
+def clave_fecha(fecha: str) -> str:
+    """
+    Convierte una fecha DD/MM/AAAA en una clave que se ordena cronológicamente (AAAA/MM/DD).
+    """
+    return f"{fecha[6:]}/{fecha[3:5]}/{fecha[:2]}"
+
+def codificar_cursor(orden: str, clave: tuple) -> str:
+    """
+    Convierte la clave de orden del último elemento de una página en un cursor de texto.
+
+        Args:
+            orden (str): Nombre del orden de la página (sin el prefijo '-').
+            clave (tuple): Clave de orden del último elemento.
+    """
+    return json.dumps([orden, *clave], ensure_ascii=False)
+
+def decodificar_cursor(cursor: str, orden: str, muestra: tuple = None) -> tuple:
+    """
+    Recupera la clave de orden guardada en un cursor.
+
+        Args:
+            cursor (str): Cursor devuelto en una página anterior.
+            orden (str): Nombre del orden de la consulta (sin el prefijo '-').
+            muestra (tuple): Clave de orden de un elemento cualquiera de la colección; si se indica, la
+                             clave del cursor debe tener sus mismos tipos para poder compararse con ella.
+
+        Raises:
+            ValueError: Si el cursor no es válido o se generó para otro orden.
+    """
+    try:
+        clave = json.loads(cursor)
+    except (TypeError, json.JSONDecodeError):
+        raise ValueError(f"Cursor no válido: {cursor}")
+    if not isinstance(clave, list) or not clave or clave[0] != orden:
+        raise ValueError(f"Cursor no válido para el orden '{orden}': {cursor}")
+    clave = tuple(clave[1:])
+    if muestra is not None and [type(valor) for valor in clave] != [type(valor) for valor in muestra]:
+        raise ValueError(f"Cursor no válido para el orden '{orden}': {cursor}")
+    return clave
+
+def paginar(elementos: list, ordenes: dict, orden: str, offset: int = 0, limite: int = 50, cursor: str = None,
+            recorridos: dict = None) -> Pagina:
+    """
+    Devuelve una página de una colección ordenada por una clave estable.
+
+    Las claves de orden son tuplas planas de textos y números que terminan en el ID del elemento, de
+    modo que dos elementos nunca empatan y el orden no cambia entre una página y la siguiente. Con
+    `cursor` se continúa justo después del último elemento de la página anterior, aunque mientras
+    tanto se hayan agregado elementos; `offset` se cuenta a partir del cursor (o del inicio).
+
+    Si para el orden pedido hay un recorrido en `recorridos` (un índice que ya mantiene la colección
+    ordenada), la página cuesta una búsqueda binaria más los `offset + limite` elementos devueltos.
+    Si no, se recorre la colección completa en cada página, pero solo se ordenan los `offset + limite`
+    primeros elementos; es lo que se hace con los catálogos pequeños (pacientes, médicos, especialidades).
+
+        Args:
+            elementos (list): Colección a paginar.
+            ordenes (dict): Nombre del orden -> función que da la clave de orden de un elemento.
+            orden (str): Nombre del orden; con el prefijo '-' el orden es descendente (por ejemplo, '-fecha').
+            offset (int): Elementos a saltar.
+            limite (int): Máximo de elementos de la página.
+            cursor (str): Cursor devuelto en la página anterior (`Pagina.siguiente_cursor`).
+            recorridos (dict): Nombre del orden -> función (desde, descendente) que devuelve un iterador de
+                               los elementos en ese orden, empezando después de la clave `desde` (o desde
+                               el inicio si es None).
+
+        Returns:
+            Pagina: Página con los elementos pedidos.
+
+        Raises:
+            ValueError: Si el orden, el cursor, el offset o el límite no son válidos.
+    """
+    descendente = orden.startswith('-')
+    nombre = orden.lstrip('-')
+    clave = ordenes.get(nombre)
+    if clave is None:
+        raise ValueError(f"Orden no válido: {orden}. Opciones: {', '.join(ordenes)}")
+    if offset < 0 or limite < 1:
+        raise ValueError("El offset no puede ser negativo y el límite debe ser al menos 1")
+
+    desde = None
+    if cursor is not None:
+        desde = decodificar_cursor(cursor, nombre, clave(elementos[0]) if elementos else None)
+
+    # Se pide un elemento de más para saber si existe una página siguiente
+    cantidad = offset + limite + 1
+    recorrido = (recorridos or {}).get(nombre)
+    if recorrido is not None:
+        seleccion = list(islice(recorrido(desde, descendente), cantidad))
+    else:
+        candidatos = elementos
+        if desde is not None:
+            if descendente:
+                candidatos = (elemento for elemento in elementos if clave(elemento) < desde)
+            else:
+                candidatos = (elemento for elemento in elementos if clave(elemento) > desde)
+        seleccionar = heapq.nlargest if descendente else heapq.nsmallest
+        seleccion = seleccionar(cantidad, candidatos, key=clave)
+    pagina = seleccion[offset:offset + limite]
+
+    siguiente_cursor = None
+    if len(seleccion) > offset + limite:
+        siguiente_cursor = codificar_cursor(nombre, clave(pagina[-1]))
+    return Pagina(pagina, len(elementos), siguiente_cursor)
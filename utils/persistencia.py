@@ -0,0 +1,822 @@
+import copy
+import json
+import os
+import queue
+import struct
+import threading
+import zlib
+from contextlib import contextmanager, ExitStack
+from pathlib import Path
+from shutil import copyfile
+from utils.instrumentacion import registrar_bytes
+
+try:
+    import fcntl
+except ImportError:
+    # En Windows no existe fcntl; se usa msvcrt para el bloqueo entre procesos
+    fcntl = None
+    import msvcrt
+
+
+class VersionArchivo:
+    """
+    Contador de versión de un archivo de datos, que además sirve de bloqueo entre procesos.
+
+    La versión se guarda en `<archivo>.version` y se incrementa cada vez que se escribe el archivo.
+    Mientras se está dentro del bloque `with`, ningún otro proceso (o hilo) puede leer ni escribir
+    el archivo a través de VersionArchivo:
+
+        with VersionArchivo(ruta) as version:
+            if version.actual != version_conocida:
+                ...  # otro proceso escribió el archivo
+            escribir_json(ruta, datos)
+            version.incrementar()
+
+        Attributes:
+            actual (int): Versión del archivo al entrar al bloque (0 si nunca se ha escrito).
+    """
+
+    def __init__(self, ruta: Path):
+        """
+        Inicializa el contador de un archivo de datos.
+
+            Args:
+                ruta (Path): Ruta del archivo de datos (no del archivo de versión).
+        """
+        ruta = Path(ruta)
+        self._ruta_version = ruta.with_name(ruta.name + '.version')
+        self._archivo = None
+        self.actual = 0
+
+    def __enter__(self):
+        self._ruta_version.parent.mkdir(parents=True, exist_ok=True)
+        self._archivo = open(self._ruta_version, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self._archivo.fileno(), fcntl.LOCK_EX)
+        else:
+            self._archivo.seek(0)
+            msvcrt.locking(self._archivo.fileno(), msvcrt.LK_LOCK, 1)
+        self._archivo.seek(0)
+        contenido = self._archivo.read().strip()
+        self.actual = int(contenido) if contenido.isdigit() else 0
+        return self
+
+    def incrementar(self) -> int:
+        """
+        Incrementa y guarda la versión del archivo.
+
+            Returns:
+                int: Nueva versión.
+        """
+        self.actual += 1
+        self._archivo.seek(0)
+        self._archivo.truncate()
+        self._archivo.write(str(self.actual).encode('ascii'))
+        self._archivo.flush()
+        return self.actual
+
+    def __exit__(self, tipo, valor, traza):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+            else:
+                self._archivo.seek(0)
+                msvcrt.locking(self._archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._archivo.close()
+            self._archivo = None
+
+
+class ConflictoEscritura(Exception):
+    """
+    Otro proceso modificó los mismos registros que se intentaban guardar.
+
+    Los cambios en conflicto se rechazan (se conserva la versión del otro proceso); el resto
+    de los cambios sí se guardan.
+
+        Attributes:
+            conflictos (list): Tuplas (ruta, id del registro) en conflicto.
+            resultado: Resultado de la escritura (lo que sí se guardó).
+    """
+
+    def __init__(self, conflictos: list, resultado=None):
+        ids = ", ".join(str(id_registro) for _, id_registro in conflictos)
+        super().__init__(f"Otro proceso modificó los mismos registros; se conservaron sus cambios: {ids}")
+        self.conflictos = conflictos
+        self.resultado = resultado
+
+
+def fusionar_registros(base: list, propios: list, ajenos: list, clave: str) -> tuple:
+    """
+    Fusiona a nivel de registro los cambios propios con los que otro proceso ya guardó.
+
+    Para cada registro se compara la versión de la que se partió (base), la propia y la del otro
+    proceso (ajena): si solo uno de los dos la cambió, se toma ese cambio; si ambos la cambiaron de
+    forma distinta, hay un conflicto y se conserva la versión ajena.
+
+        Args:
+            base (list): Registros del archivo tal como se leyeron o escribieron la última vez.
+            propios (list): Registros que se quieren guardar.
+            ajenos (list): Registros que tiene ahora el archivo.
+            clave (str): Campo que identifica a cada registro.
+
+        Returns:
+            tuple: (registros fusionados, cambios ajenos, conflictos). Los cambios ajenos son un diccionario
+                   id -> registro (o None si se eliminó) con lo que difiere de `propios`, para aplicarlo en
+                   memoria; los conflictos son la lista de IDs en conflicto.
+    """
+    en_base = {registro[clave]: registro for registro in base}
+    en_propios = {registro[clave]: registro for registro in propios}
+    en_ajenos = {registro[clave]: registro for registro in ajenos}
+
+    # Se respeta el orden del archivo y los registros propios nuevos van al final
+    ids = list(en_ajenos) + [id_registro for id_registro in en_propios if id_registro not in en_ajenos]
+
+    fusionados = []
+    cambios_ajenos = {}
+    conflictos = []
+    for id_registro in ids:
+        anterior = en_base.get(id_registro)
+        propio = en_propios.get(id_registro)
+        ajeno = en_ajenos.get(id_registro)
+
+        if propio == anterior or propio == ajeno:
+            final = ajeno
+        elif ajeno == anterior:
+            final = propio
+        else:
+            conflictos.append(id_registro)
+            final = ajeno
+
+        if final is not None:
+            fusionados.append(final)
+        if final != propio:
+            cambios_ajenos[id_registro] = final
+    return fusionados, cambios_ajenos, conflictos
+
+
+# Transacción activa en cada hilo (ver Transaccion.activa)
+_hilo_local = threading.local()
+
+
+class Transaccion:
+    """
+    Escritura de varios archivos que se aplica completa o no se aplica.
+
+    Mientras la transacción está activa en un hilo, `escribir_bytes` (y por lo tanto `escribir_json`)
+    no reemplaza los archivos: deja el contenido nuevo en un temporal junto a cada uno. Al confirmar
+    se guarda un registro con la lista de reemplazos y después se hacen los reemplazos; si el proceso
+    se interrumpe a mitad, `completar_transacciones` termina los reemplazos pendientes la próxima vez
+    que se leen los datos, de modo que nunca queda aplicada solo una parte.
+
+        with transaccion.activa():
+            escribir_json(ruta_citas, citas)
+            escribir_json(ruta_diagnosticos, diagnosticos)
+        transaccion.confirmar()
+
+    Las operaciones que se anotan en el diario durante la transacción (ver `anotar_operaciones`) se
+    agregan como una sola entrada al confirmar, antes de los reemplazos.
+
+        Attributes:
+            _ruta_registro (Path): Archivo con la lista de reemplazos pendientes.
+            _reemplazos (list): Pares (temporal, ruta) ya escritos.
+            _operaciones (list): Operaciones para el diario de la carpeta de datos.
+    """
+
+    _contador = 0
+    _bloqueo_contador = threading.Lock()
+
+    def __init__(self, dir_datos: Path = Path("datos")):
+        """
+        Inicializa una transacción vacía.
+
+            Args:
+                dir_datos (Path): Carpeta de datos donde se guarda el registro de la transacción.
+        """
+        with Transaccion._bloqueo_contador:
+            Transaccion._contador += 1
+            numero = Transaccion._contador
+        self._sufijo = f".{os.getpid()}-{numero}.tx"
+        self._dir_datos = Path(dir_datos)
+        self._ruta_registro = self._dir_datos / f"transaccion-{os.getpid()}-{numero}.json"
+        self._reemplazos = []
+        self._operaciones = []
+
+    @contextmanager
+    def activa(self):
+        """
+        Contexto durante el cual las escrituras del hilo actual forman parte de la transacción.
+
+        Si ocurre un error dentro del contexto, se descartan los archivos ya preparados.
+        """
+        _hilo_local.transaccion = self
+        try:
+            yield self
+        except BaseException:
+            self.descartar()
+            raise
+        finally:
+            _hilo_local.transaccion = None
+
+    def preparar(self, ruta: Path, contenido: bytes):
+        """
+        Escribe el contenido nuevo de un archivo en un temporal, sin tocar todavía el archivo.
+
+            Args:
+                ruta (Path): Ruta del archivo.
+                contenido (bytes): Contenido completo del archivo.
+        """
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_name(ruta.name + self._sufijo)
+        with open(temporal, 'wb') as archivo:
+            archivo.write(contenido)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        self._reemplazos = [(t, r) for t, r in self._reemplazos if r != ruta] + [(temporal, ruta)]
+
+    def anotar(self, operaciones: list):
+        """
+        Anota operaciones para agregarlas al diario al confirmar.
+
+            Args:
+                operaciones (list): Operaciones devueltas por `diferencias`.
+        """
+        self._operaciones.extend(operaciones)
+
+    def confirmar(self):
+        """
+        Agrega al diario las operaciones anotadas y reemplaza todos los archivos preparados.
+        """
+        if self._operaciones:
+            obtener_diario(self._dir_datos).agregar(self._operaciones)
+            self._operaciones = []
+        if not self._reemplazos:
+            return
+        self._ruta_registro.parent.mkdir(parents=True, exist_ok=True)
+        temporal_registro = self._ruta_registro.with_suffix('.tmp')
+        with open(temporal_registro, 'w', encoding='utf-8') as archivo:
+            json.dump([[str(temporal), str(ruta)] for temporal, ruta in self._reemplazos], archivo)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal_registro, self._ruta_registro)
+
+        for temporal, ruta in self._reemplazos:
+            if ruta.exists():
+                copyfile(ruta, ruta.with_suffix('.json.bak'))
+            os.replace(temporal, ruta)
+        _borrar_si_existe(self._ruta_registro)
+        self._reemplazos = []
+
+    def descartar(self):
+        """
+        Borra los temporales sin reemplazar ningún archivo.
+        """
+        for temporal, _ in self._reemplazos:
+            _borrar_si_existe(temporal)
+        self._reemplazos = []
+        self._operaciones = []
+
+
+def _borrar_si_existe(ruta: Path):
+    """
+    Borra un archivo si existe (equivale a `Path.unlink(missing_ok=True)`, que requiere Python 3.8).
+    """
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def completar_transacciones(dir_datos: Path = Path("datos")):
+    """
+    Termina los reemplazos de las transacciones que se interrumpieron después de confirmarse.
+
+        Args:
+            dir_datos (Path): Carpeta de datos.
+    """
+    for ruta_registro in Path(dir_datos).glob("transaccion-*.json"):
+        try:
+            with open(ruta_registro, 'r', encoding='utf-8') as archivo:
+                reemplazos = json.load(archivo)
+            for temporal, ruta in reemplazos:
+                if os.path.exists(temporal):
+                    os.replace(temporal, ruta)
+            _borrar_si_existe(ruta_registro)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error al completar la transacción {ruta_registro.name}: {e}")
+
+
+# Nombre del diario dentro de la carpeta de datos
+NOMBRE_DIARIO = "diario.log"
+# Tamaño del diario (en bytes) a partir del cual se compacta en segundo plano
+LIMITE_DIARIO = 256 * 1024
+
+# Cabecera de cada entrada del diario: longitud y CRC32 del contenido
+_CABECERA = struct.Struct('>II')
+
+
+def diferencias(ruta: Path, anterior, nuevos, clave: str = None) -> list:
+    """
+    Calcula las operaciones que llevan el contenido de un archivo de `anterior` a `nuevos`.
+
+    Si el archivo es una lista de registros con clave, solo se incluyen los registros agregados o
+    modificados y los IDs eliminados; si no, se incluye el contenido completo cuando cambió.
+
+        Args:
+            ruta (Path): Ruta del archivo.
+            anterior: Contenido actual del archivo (None si no existe).
+            nuevos: Contenido que se quiere guardar.
+            clave (str): Campo que identifica a cada registro, o None.
+
+        Returns:
+            list: Operaciones (una como máximo) para `Diario.agregar`; vacía si no hay cambios.
+    """
+    if clave and isinstance(nuevos, list) and isinstance(anterior or [], list):
+        en_anterior = {registro[clave]: registro for registro in anterior or []}
+        registros = [registro for registro in nuevos if en_anterior.get(registro[clave]) != registro]
+        ids_nuevos = {registro[clave] for registro in nuevos}
+        eliminados = [id_registro for id_registro in en_anterior if id_registro not in ids_nuevos]
+        if not registros and not eliminados:
+            return []
+        return [{'ruta': str(ruta), 'clave': clave, 'registros': registros, 'eliminados': eliminados}]
+
+    if anterior == nuevos:
+        return []
+    return [{'ruta': str(ruta), 'contenido': nuevos}]
+
+def aplicar_operaciones(datos, operaciones: list):
+    """
+    Aplica sobre el contenido de un archivo las operaciones del diario, en orden.
+
+    Los registros modificados conservan su posición y los nuevos van al final. Aplicar de nuevo
+    operaciones que ya estaban incluidas no cambia el resultado.
+
+        Args:
+            datos: Contenido de partida (no se modifica), o None si el archivo no existe.
+            operaciones (list): Operaciones del archivo, como las devuelve `diferencias`.
+
+        Returns:
+            Contenido resultante.
+    """
+    registros = None
+    for operacion in operaciones:
+        if 'contenido' in operacion:
+            datos, registros = copy.deepcopy(operacion['contenido']), None
+            continue
+        clave = operacion['clave']
+        if registros is None:
+            registros = {registro[clave]: registro for registro in datos or []}
+        for registro in operacion['registros']:
+            registros[registro[clave]] = copy.deepcopy(registro)
+        for id_registro in operacion['eliminados']:
+            registros.pop(id_registro, None)
+
+    if registros is not None:
+        datos = list(registros.values())
+    return datos
+
+
+class DiarioCorrupto(Exception):
+    """
+    El diario tiene una entrada dañada seguida de otras entradas.
+
+    Un corte mientras se escribía solo puede dañar la última entrada; si hay datos después de la
+    entrada dañada, el diario no se recorta (se perderían las entradas posteriores) y hay que revisarlo.
+
+        Attributes:
+            ruta (Path): Ruta del diario.
+            posicion (int): Posición en bytes de la entrada dañada.
+    """
+
+    def __init__(self, ruta: Path, posicion: int):
+        super().__init__(f"El diario {ruta} tiene una entrada dañada en el byte {posicion}, seguida de más datos")
+        self.ruta = ruta
+        self.posicion = posicion
+
+
+class Diario:
+    """
+    Registro de las operaciones guardadas en la carpeta de datos desde el último punto de control.
+
+    Los archivos JSON son el punto de control. Cada guardado agrega al final del diario solo los
+    registros que cambiaron, en lugar de reescribir los archivos completos, y al leer un archivo se
+    le aplican las operaciones del diario (ver `operaciones`). Así, recuperar los datos después de
+    un corte solo requiere repasar el diario, no reescribir nada.
+
+    Cada entrada se guarda como longitud y CRC32 (4 bytes cada uno) seguidos del JSON de sus
+    operaciones. Una entrada incompleta o dañada al final (por un corte mientras se escribía) se
+    ignora, y se recorta antes de la siguiente escritura; si la entrada dañada no es la última, se
+    lanza DiarioCorrupto en lugar de ignorar las posteriores.
+
+    Cuando el diario supera LIMITE_DIARIO bytes, un hilo en segundo plano reescribe los archivos
+    afectados como un nuevo punto de control y vacía el diario (ver `compactar`). El contador de
+    `diario.log.version` sirve de bloqueo entre procesos y de número de generación: cambia en cada
+    compactación, y con él las posiciones del diario dejan de ser válidas.
+
+        Attributes:
+            _ruta (Path): Ruta del diario.
+            _generacion (int): Generación del diario leída por última vez.
+            _leido_hasta (int): Fin de la última entrada válida leída.
+            _operaciones (dict): Ruta -> lista de (fin de la entrada, operación) de ese archivo.
+            _escritores (dict): Ruta -> función que escribe el archivo completo al compactar.
+    """
+
+    def __init__(self, ruta: Path, limite: int = LIMITE_DIARIO):
+        """
+        Inicializa el diario.
+
+            Args:
+                ruta (Path): Ruta del diario.
+                limite (int): Tamaño en bytes a partir del cual se compacta.
+        """
+        self._ruta = Path(ruta)
+        self._limite = limite
+        self._bloqueo = threading.Lock()
+        self._generacion = None
+        self._leido_hasta = 0
+        self._operaciones = {}
+        self._escritores = {}
+        self._compactando = False
+
+    def _actualizar(self, generacion: int):
+        """
+        Lee las entradas agregadas desde la última lectura (o todo el diario, si cambió la generación).
+
+        Debe llamarse con el diario bloqueado.
+
+            Raises:
+                DiarioCorrupto: Si hay una entrada dañada que no llega hasta el final del archivo.
+        """
+        if generacion != self._generacion:
+            self._generacion = generacion
+            self._leido_hasta = 0
+            self._operaciones = {}
+        if not self._ruta.exists():
+            return
+
+        with open(self._ruta, 'rb') as archivo:
+            tamano = os.fstat(archivo.fileno()).st_size
+            archivo.seek(self._leido_hasta)
+            inicio = self._leido_hasta
+            while True:
+                cabecera = archivo.read(_CABECERA.size)
+                if len(cabecera) < _CABECERA.size:
+                    break
+                longitud, crc = _CABECERA.unpack(cabecera)
+                contenido = archivo.read(longitud)
+                operaciones = None
+                if len(contenido) == longitud and zlib.crc32(contenido) == crc:
+                    try:
+                        operaciones = json.loads(contenido.decode('utf-8'))
+                    except ValueError:
+                        pass
+                if operaciones is None:
+                    # Solo la última entrada puede haber quedado a medias por un corte
+                    if self._leido_hasta + _CABECERA.size + longitud < tamano:
+                        raise DiarioCorrupto(self._ruta, self._leido_hasta)
+                    break
+                self._leido_hasta += _CABECERA.size + longitud
+                self._registrar(operaciones)
+        if self._leido_hasta > inicio:
+            registrar_bytes('leidos', self._ruta, self._leido_hasta - inicio)
+
+    def _registrar(self, operaciones: list):
+        """
+        Agrega a la copia en memoria las operaciones de una entrada que termina en `_leido_hasta`.
+        """
+        for operacion in operaciones:
+            self._operaciones.setdefault(operacion['ruta'], []).append((self._leido_hasta, operacion))
+
+    def operaciones(self, ruta: Path, desde: tuple = None) -> tuple:
+        """
+        Devuelve las operaciones del diario sobre un archivo.
+
+        Para que el resultado corresponda al contenido del archivo, debe llamarse con el archivo
+        bloqueado (ver VersionArchivo).
+
+            Args:
+                ruta (Path): Ruta del archivo.
+                desde (tuple): Posición devuelta antes por este método o por `posicion`; si se indica,
+                               solo se devuelven las operaciones posteriores.
+
+            Returns:
+                tuple: (operaciones, posición actual). Las operaciones son None si la posición indicada
+                       ya no es válida porque el diario se compactó.
+        """
+        with VersionArchivo(self._ruta) as version, self._bloqueo:
+            self._actualizar(version.actual)
+            posicion = (self._generacion, self._leido_hasta)
+            if desde is not None and desde[0] != self._generacion:
+                return None, posicion
+            inicio = desde[1] if desde is not None else 0
+            return [operacion for fin, operacion in self._operaciones.get(str(ruta), [])
+                    if fin > inicio], posicion
+
+    def posicion(self) -> tuple:
+        """
+        Devuelve la posición actual del diario, como (generación, fin de la última entrada).
+        """
+        with VersionArchivo(self._ruta) as version, self._bloqueo:
+            self._actualizar(version.actual)
+            return self._generacion, self._leido_hasta
+
+    def registrar_escritor(self, ruta: Path, escritor):
+        """
+        Indica cómo escribir un archivo completo al compactar (por omisión se usa `escribir_json`).
+
+            Args:
+                ruta (Path): Ruta del archivo.
+                escritor (callable): Función que recibe la ruta y el contenido.
+        """
+        self._escritores[str(ruta)] = escritor
+
+    def agregar(self, operaciones: list):
+        """
+        Agrega una entrada al final del diario y la fuerza a disco.
+
+        Los archivos afectados deben estar bloqueados por quien llama. Si el diario supera el
+        límite, se inicia su compactación en segundo plano.
+
+            Args:
+                operaciones (list): Operaciones de la entrada (ver `diferencias`).
+
+            Raises:
+                DiarioCorrupto: Si el diario tiene una entrada dañada antes del final (no se agrega nada).
+        """
+        contenido = json.dumps(operaciones).encode('utf-8')
+        with VersionArchivo(self._ruta) as version, self._bloqueo:
+            self._actualizar(version.actual)
+            with open(self._ruta, 'ab') as archivo:
+                # Recortar la entrada incompleta que haya dejado un corte (`_actualizar` ya
+                # comprobó que llega hasta el final del archivo)
+                if archivo.tell() > self._leido_hasta:
+                    archivo.truncate(self._leido_hasta)
+                archivo.write(_CABECERA.pack(len(contenido), zlib.crc32(contenido)) + contenido)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            registrar_bytes('escritos', self._ruta, _CABECERA.size + len(contenido))
+            self._leido_hasta += _CABECERA.size + len(contenido)
+            self._registrar(operaciones)
+            compactar = self._leido_hasta > self._limite and not self._compactando
+            if compactar:
+                self._compactando = True
+
+        if compactar:
+            threading.Thread(target=self._compactar_en_segundo_plano, name="compactacion", daemon=True).start()
+
+    def _compactar_en_segundo_plano(self):
+        """
+        Compacta el diario desde el hilo de compactación.
+        """
+        try:
+            self.compactar()
+        except Exception as e:
+            print(f"Error al compactar el diario de datos: {e}")
+        finally:
+            with self._bloqueo:
+                self._compactando = False
+
+    def compactar(self) -> bool:
+        """
+        Reescribe como punto de control los archivos que tienen operaciones en el diario y vacía el diario.
+
+        Los archivos se reemplazan todos juntos en una Transaccion. Si el proceso se interrumpe antes
+        de vaciar el diario, sus operaciones se vuelven a aplicar sobre el punto de control nuevo, lo
+        que no cambia el resultado.
+
+            Returns:
+                bool: True si se compactó; False si no había operaciones o si otro archivo se agregó
+                      al diario mientras se bloqueaban los afectados (se reintenta en la próxima escritura).
+        """
+        with VersionArchivo(self._ruta) as version, self._bloqueo:
+            self._actualizar(version.actual)
+            rutas = sorted(self._operaciones)
+        if not rutas:
+            return False
+
+        # Los archivos se bloquean antes que el diario, en el mismo orden que al escribirlos
+        with ExitStack() as bloqueos:
+            for ruta in rutas:
+                bloqueos.enter_context(VersionArchivo(Path(ruta)))
+            version = bloqueos.enter_context(VersionArchivo(self._ruta))
+            with self._bloqueo:
+                self._actualizar(version.actual)
+                if sorted(self._operaciones) != rutas:
+                    return False
+                pendientes = {ruta: [operacion for _, operacion in operaciones]
+                              for ruta, operaciones in self._operaciones.items()}
+                escritores = dict(self._escritores)
+
+            transaccion = Transaccion(self._ruta.parent)
+            with transaccion.activa():
+                for ruta, operaciones in pendientes.items():
+                    datos = None
+                    if os.path.exists(ruta):
+                        with open(ruta, 'rb') as archivo:
+                            contenido = archivo.read()
+                        registrar_bytes('leidos', ruta, len(contenido))
+                        datos = json.loads(contenido)
+                    escritor = escritores.get(ruta, escribir_json)
+                    escritor(Path(ruta), aplicar_operaciones(datos, operaciones))
+            transaccion.confirmar()
+
+            with self._bloqueo:
+                with open(self._ruta, 'r+b') as archivo:
+                    archivo.truncate(0)
+                    os.fsync(archivo.fileno())
+                self._actualizar(version.incrementar())
+        return True
+
+
+# Diario de cada carpeta de datos, compartido por todos los gestores del proceso
+_diarios = {}
+_bloqueo_diarios = threading.Lock()
+
+
+def obtener_diario(dir_datos: Path = Path("datos")) -> Diario:
+    """
+    Devuelve el diario de una carpeta de datos.
+
+        Args:
+            dir_datos (Path): Carpeta de datos.
+
+        Returns:
+            Diario: Diario de la carpeta (el mismo objeto en todo el proceso).
+    """
+    ruta = Path(dir_datos) / NOMBRE_DIARIO
+    with _bloqueo_diarios:
+        if ruta not in _diarios:
+            _diarios[ruta] = Diario(ruta)
+        return _diarios[ruta]
+
+def anotar_operaciones(operaciones: list, dir_datos: Path = Path("datos")):
+    """
+    Guarda operaciones en el diario, o las anota en la Transaccion activa del hilo para guardarlas al confirmarla.
+
+        Args:
+            operaciones (list): Operaciones devueltas por `diferencias`.
+            dir_datos (Path): Carpeta de datos.
+    """
+    if not operaciones:
+        return
+    transaccion = getattr(_hilo_local, 'transaccion', None)
+    if transaccion is not None:
+        transaccion.anotar(operaciones)
+    else:
+        obtener_diario(dir_datos).agregar(operaciones)
+
+
+def escribir_json(ruta: Path, datos, ensure_ascii: bool = True):
+    """
+    Escribe datos en un archivo JSON creando antes un respaldo (.json.bak) del archivo existente.
+
+    El contenido se escribe primero en un archivo temporal que después reemplaza al original,
+    para que quien lea el archivo nunca encuentre una escritura a medias.
+
+        Args:
+            ruta (Path): Ruta del archivo a escribir.
+            datos: Datos serializables a JSON.
+            ensure_ascii (bool): Si es False, se guardan los caracteres no ASCII sin escapar.
+    """
+    escribir_bytes(ruta, json.dumps(datos, indent=4, ensure_ascii=ensure_ascii).encode('utf-8'))
+
+def escribir_bytes(ruta: Path, contenido: bytes):
+    """
+    Escribe un archivo completo de forma atómica, creando antes un respaldo (.json.bak) del existente.
+
+    Si hay una Transaccion activa en el hilo, el archivo solo se prepara y se reemplaza al confirmarla.
+
+        Args:
+            ruta (Path): Ruta del archivo a escribir.
+            contenido (bytes): Contenido completo del archivo.
+    """
+    registrar_bytes('escritos', ruta, len(contenido))
+    transaccion = getattr(_hilo_local, 'transaccion', None)
+    if transaccion is not None:
+        transaccion.preparar(ruta, contenido)
+        return
+
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+
+    # Crear respaldo antes de sobrescribir el archivo
+    if ruta.exists():
+        copia = ruta.with_suffix('.json.bak')
+        copyfile(ruta, copia)
+
+    # Guardar en un temporal y reemplazar el original
+    temporal = ruta.with_suffix('.json.tmp')
+    with open(temporal, 'wb') as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
+
+
+class TrabajadorPersistencia:
+    """
+    Hilo que realiza las escrituras a disco en segundo plano.
+
+    Las solicitudes se procesan en orden. Si se encola una escritura para un archivo que ya tenía
+    otra pendiente (aún no iniciada), solo se conserva la más reciente. Los resultados se entregan
+    en el hilo que llame a `procesar_resultados` (en la GUI, el hilo de Tk mediante `root.after`).
+
+        Attributes:
+            _cola (queue.Queue): Claves de las escrituras pendientes, en orden de llegada.
+            _pendientes (dict): clave -> (funcion, args, al_terminar) de la última solicitud de cada clave.
+            _resultados (queue.Queue): Tuplas (al_terminar, error, resultado) de las solicitudes ya ejecutadas.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el trabajador e inicia su hilo.
+        """
+        self._cola = queue.Queue()
+        self._pendientes = {}
+        self._bloqueo = threading.Lock()
+        self._resultados = queue.Queue()
+        self._hilo = threading.Thread(target=self._ejecutar, name="persistencia", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, clave, funcion, *args, al_terminar=None, combinar=None):
+        """
+        Agrega una escritura a la cola.
+
+            Args:
+                clave: Identifica el destino de la escritura (por ejemplo, la ruta del archivo).
+                funcion (callable): Función que realiza la escritura.
+                *args: Argumentos para la función (deben ser datos ya preparados, no objetos que se sigan modificando).
+                al_terminar (callable): Función opcional que recibe el error (o None) y el valor devuelto
+                                        por `funcion` (o None) al terminar.
+                combinar (callable): Función opcional que recibe los argumentos de la solicitud pendiente
+                                     y los de la nueva, y devuelve los argumentos a usar. Si no se indica,
+                                     la nueva solicitud reemplaza a la pendiente.
+        """
+        with self._bloqueo:
+            anterior = self._pendientes.get(clave)
+            if anterior is not None and combinar is not None:
+                args = combinar(anterior[1], args)
+            self._pendientes[clave] = (funcion, args, al_terminar)
+        if anterior is None:
+            self._cola.put(clave)
+
+    def _ejecutar(self):
+        """
+        Ciclo del hilo: toma cada solicitud de la cola y la ejecuta.
+        """
+        while True:
+            clave = self._cola.get()
+            if clave is None:
+                self._cola.task_done()
+                break
+
+            with self._bloqueo:
+                funcion, args, al_terminar = self._pendientes.pop(clave)
+            resultado = None
+            try:
+                resultado = funcion(*args)
+                error = None
+            except Exception as e:
+                error = e
+                print(f"Error al guardar en segundo plano: {e}")
+            self._resultados.put((al_terminar, error, resultado))
+            self._cola.task_done()
+
+    def pendientes(self) -> int:
+        """
+        Devuelve la cantidad de escrituras encoladas o en curso.
+
+            Returns:
+                int: Escrituras que aún no terminan.
+        """
+        return self._cola.unfinished_tasks
+
+    def procesar_resultados(self) -> list:
+        """
+        Ejecuta los callbacks de las escrituras terminadas en el hilo que llama a este método.
+
+            Returns:
+                list: Errores ocurridos desde la última llamada.
+        """
+        errores = []
+        while True:
+            try:
+                al_terminar, error, resultado = self._resultados.get_nowait()
+            except queue.Empty:
+                return errores
+            if error is not None:
+                errores.append(error)
+            if al_terminar is not None:
+                al_terminar(error, resultado)
+
+    def vaciar(self):
+        """
+        Espera a que terminen todas las escrituras pendientes.
+        """
+        self._cola.join()
+
+    def detener(self):
+        """
+        Termina las escrituras pendientes y detiene el hilo.
+        """
+        self._cola.put(None)
+        self._hilo.join()
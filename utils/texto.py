@@ -0,0 +1,39 @@
+import re
+import unicodedata
+
+# Palabras muy frecuentes que no aportan a las búsquedas
+PALABRAS_VACIAS = {
+    "a", "al", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los",
+    "o", "para", "por", "se", "sin", "su", "un", "una", "y"
+}
+
+_PATRON_TERMINO = re.compile(r"[a-z0-9]+")
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza un texto para comparaciones: minúsculas y sin acentos ni diéresis.
+
+        Args:
+            texto (str): Texto a normalizar.
+
+        Returns:
+            str: Texto normalizado (por ejemplo, 'Migraña' -> 'migrana').
+    """
+    # Un texto ASCII no tiene acentos (IDs, teléfonos y la mayoría de los nombres)
+    if texto.isascii():
+        return texto.lower()
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+def tokenizar(texto: str) -> list:
+    """
+    Divide un texto en términos normalizados, descartando palabras vacías.
+
+        Args:
+            texto (str): Texto a dividir.
+
+        Returns:
+            list: Lista de términos en el orden en que aparecen (puede tener repetidos).
+    """
+    return [termino for termino in _PATRON_TERMINO.findall(normalizar_texto(texto))
+            if termino not in PALABRAS_VACIAS]
@@ -1,7 +1,15 @@
 import re
 import json
 from typing import Dict, Any
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+
+# Patrones compilados una sola vez al importar el módulo
+_PATRON_TELEFONO = re.compile(r'^(\+?\d{10})$')
+_PATRON_NOMBRE = re.compile(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ\s]{2,}$')
+_PATRON_HORA = re.compile(r'^\d{2}:\d{2}$')
+
+# Campos que identifican a una persona al buscar duplicados
+CAMPOS_PERSONA = ('nombre', 'apellido', 'fecha_nacimiento', 'telefono')
 
 def validar_fecha_citas(fecha: str) -> bool:
     """
@@ -16,19 +24,7 @@ def validar_fecha_citas(fecha: str) -> bool:
      Returns:
          bool: True si la fecha es válida, False si no cumple los requisitos
      """
-    try:
-        # Convertir la fecha ingresada a objeto datetime
-        fecha_ingresada = datetime.strptime(fecha, "%d/%m/%Y")
-
-        # Obtener fecha actual y fecha límite (1 año después)
-        hoy = datetime.now()
-        limite_maximo = hoy + timedelta(days=365)
-
-        # Validar rango
-        return hoy < fecha_ingresada <= limite_maximo
-
-    except ValueError:
-        return False  # Formato inválido
+    return validar_fechas_citas([fecha])[0][0]
 
 def validar_fecha_paciente(fecha: str) -> bool:
     """
@@ -43,17 +39,7 @@ def validar_fecha_paciente(fecha: str) -> bool:
         Returns:
             bool: True si la fecha es válida, False si no cumple los requisitos
     """
-    try:
-        fecha_ingresada = datetime.strptime(fecha, "%d/%m/%Y").date()
-        hoy = datetime.now().date()
-
-        # Calcula la fecha mínima permitida (200 años antes de hoy)
-        fecha_minima = hoy.replace(year=hoy.year - 200)
-
-        return fecha_minima <= fecha_ingresada <= hoy
-
-    except ValueError:
-        return False  # Formato inválido o fecha imposible (ej: 29/02 en año no bisiesto)
+    return validar_fechas_paciente([fecha])[0][0]
 
 def validar_fecha_medico(fecha: str) -> bool:
     """
@@ -68,18 +54,7 @@ def validar_fecha_medico(fecha: str) -> bool:
          Returns:
              bool: True si la fecha es válida, False si no cumple los requisitos
      """
-    try:
-        fecha_nacimiento = datetime.strptime(fecha, "%d/%m/%Y").date()
-        hoy = datetime.now().date()
-
-        # Calcular edad exacta considerando mes y día
-        edad = hoy.year - fecha_nacimiento.year - (
-                    (hoy.month, hoy.day) < (fecha_nacimiento.month, fecha_nacimiento.day))
-
-        return 25 <= edad <= 70
-
-    except ValueError:
-        return False  # Formato inválido o fecha imposible
+    return validar_fechas_medico([fecha])[0][0]
 
 def validar_telefono(telefono: str) -> bool:
     """
@@ -91,7 +66,7 @@ def validar_telefono(telefono: str) -> bool:
       Returns:
           bool: True si el formato es válido, False en caso contrario.
     """
-    return re.match(r'^(\+?\d{10})$', telefono) is not None
+    return validar_telefonos([telefono])[0][0]
 
 def validar_nombre(nombre: str) -> bool:
     """
@@ -103,7 +78,7 @@ def validar_nombre(nombre: str) -> bool:
         Returns:
             bool: True si el nombre es válido, False en caso contrario.
     """
-    return re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ\s]{2,}$', nombre) is not None
+    return validar_nombres([nombre])[0][0]
 
 def validar_hora(hora: str) -> bool:
     """
@@ -115,22 +90,164 @@ def validar_hora(hora: str) -> bool:
        Returns:
            bool: True si la hora es válida, False en caso contrario.
     """
-    if not re.match(r'^\d{2}:\d{2}$', hora):
-        return False
+    return validar_horas([hora])[0][0]
 
-    # Validación adicional de rangos (opcional)
-    horas, minutos = map(int, hora.split(':'))
-    if not (0 <= horas < 24 and 0 <= minutos < 60):
-        return False
+# Validación por lotes: cada función recibe una secuencia (por ejemplo, una columna de un CSV) y
+# devuelve, en el mismo orden, tuplas (válido, valor interpretado o None). La fecha actual se toma
+# una sola vez por lote y cada valor distinto se valida una sola vez.
 
-    return True
+def _validar_lote(valores, validar) -> list:
+    """
+    Aplica una validación a cada valor de un lote, validando una sola vez los valores repetidos.
+
+        Args:
+            valores (iterable): Valores a validar.
+            validar (callable): Función que recibe un texto y devuelve (válido, valor interpretado).
 
-def validar_persona_duplicado(file_path: str, nueva_persona: Dict) -> bool:
+        Returns:
+            list: Resultados de `validar` en el orden de los valores ((False, None) para lo que no es texto).
+    """
+    memoria = {}
+    resultados = []
+    for valor in valores:
+        # Lo que no es texto (incluidos valores no hashables, como listas) es inválido
+        if not isinstance(valor, str):
+            resultados.append((False, None))
+            continue
+        resultado = memoria.get(valor)
+        if resultado is None:
+            resultado = memoria[valor] = validar(valor)
+        resultados.append(resultado)
+    return resultados
+
+def _leer_fecha(fecha: str):
     """
-    Verifica si ya existe una persona con los mismos datos en el archivo JSON.
+    Interpreta una fecha DD/MM/AAAA; devuelve None si el formato no es válido o la fecha no existe.
+    """
+    try:
+        return datetime.strptime(fecha, "%d/%m/%Y")
+    except ValueError:
+        return None
+
+def validar_fechas_citas(fechas, ahora: datetime = None) -> list:
+    """
+    Valida un lote de fechas de citas con las mismas reglas que `validar_fecha_citas`.
+
+        Args:
+            fechas (iterable): Fechas en formato DD/MM/AAAA.
+            ahora (datetime): Momento de referencia para todo el lote (por omisión, el actual).
+
+        Returns:
+            list: Tuplas (válida, fecha como datetime o None).
+    """
+    ahora = ahora or datetime.now()
+    limite_maximo = ahora + timedelta(days=365)
+
+    def validar(fecha):
+        fecha_ingresada = _leer_fecha(fecha)
+        if fecha_ingresada is None or not ahora < fecha_ingresada <= limite_maximo:
+            return False, None
+        return True, fecha_ingresada
+    return _validar_lote(fechas, validar)
+
+def validar_fechas_paciente(fechas, hoy: date = None) -> list:
+    """
+    Valida un lote de fechas de nacimiento de pacientes con las mismas reglas que `validar_fecha_paciente`.
 
         Args:
-            file_path (str): Ruta al archivo JSON que contiene la lista de personas.
+            fechas (iterable): Fechas en formato DD/MM/AAAA.
+            hoy (date): Día de referencia para todo el lote (por omisión, el actual).
+
+        Returns:
+            list: Tuplas (válida, fecha como date o None).
+    """
+    hoy = hoy or datetime.now().date()
+    # Fecha mínima permitida (200 años antes de hoy)
+    fecha_minima = hoy.replace(year=hoy.year - 200)
+
+    def validar(fecha):
+        fecha_ingresada = _leer_fecha(fecha)
+        if fecha_ingresada is None or not fecha_minima <= fecha_ingresada.date() <= hoy:
+            return False, None
+        return True, fecha_ingresada.date()
+    return _validar_lote(fechas, validar)
+
+def validar_fechas_medico(fechas, hoy: date = None) -> list:
+    """
+    Valida un lote de fechas de nacimiento de médicos con las mismas reglas que `validar_fecha_medico`.
+
+        Args:
+            fechas (iterable): Fechas en formato DD/MM/AAAA.
+            hoy (date): Día de referencia para todo el lote (por omisión, el actual).
+
+        Returns:
+            list: Tuplas (válida, fecha como date o None).
+    """
+    hoy = hoy or datetime.now().date()
+
+    def validar(fecha):
+        fecha_ingresada = _leer_fecha(fecha)
+        if fecha_ingresada is None:
+            return False, None
+        fecha_nacimiento = fecha_ingresada.date()
+        # Edad exacta considerando mes y día
+        edad = hoy.year - fecha_nacimiento.year - (
+                (hoy.month, hoy.day) < (fecha_nacimiento.month, fecha_nacimiento.day))
+        return (True, fecha_nacimiento) if 25 <= edad <= 70 else (False, None)
+    return _validar_lote(fechas, validar)
+
+def validar_telefonos(telefonos) -> list:
+    """
+    Valida un lote de teléfonos con las mismas reglas que `validar_telefono`.
+
+        Args:
+            telefonos (iterable): Números de teléfono.
+
+        Returns:
+            list: Tuplas (válido, teléfono o None).
+    """
+    return _validar_lote(telefonos, lambda telefono: (True, telefono) if _PATRON_TELEFONO.match(telefono)
+                         else (False, None))
+
+def validar_nombres(nombres) -> list:
+    """
+    Valida un lote de nombres (o apellidos) con las mismas reglas que `validar_nombre`.
+
+        Args:
+            nombres (iterable): Nombres a validar.
+
+        Returns:
+            list: Tuplas (válido, nombre o None).
+    """
+    return _validar_lote(nombres, lambda nombre: (True, nombre) if _PATRON_NOMBRE.match(nombre) else (False, None))
+
+def validar_horas(horas) -> list:
+    """
+    Valida un lote de horas con las mismas reglas que `validar_hora`.
+
+        Args:
+            horas (iterable): Horas en formato HH:MM (24 horas).
+
+        Returns:
+            list: Tuplas (válida, hora como time o None).
+    """
+    def validar(hora):
+        if not _PATRON_HORA.match(hora):
+            return False, None
+        horas, minutos = map(int, hora.split(':'))
+        if not (0 <= horas < 24 and 0 <= minutos < 60):
+            return False, None
+        return True, time(horas, minutos)
+    return _validar_lote(horas, validar)
+
+def validar_persona_duplicado(file_path, nueva_persona: Dict) -> bool:
+    """
+    Verifica si ya existe una persona con los mismos datos en el archivo JSON o en una lista de registros.
+
+        Args:
+            file_path (str | list): Ruta al archivo JSON que contiene la lista de personas, o la lista de
+                                    registros ya preparada por el gestor (incluye los cambios aún no
+                                    reescritos en el archivo).
             nueva_persona (Dict): Diccionario con los datos de la nueva persona. Debe incluir las claves:
                 - 'nombre' (str)
                 - 'apellido' (str)
@@ -140,20 +257,67 @@ def validar_persona_duplicado(file_path: str, nueva_persona: Dict) -> bool:
         Returns:
             bool: True si se encuentra un duplicado exacto, False si es único.
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            personas = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return False  # No hay duplicados si el archivo no existe o está vacío
+    if isinstance(file_path, list):
+        personas = file_path
+    else:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                personas = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False  # No hay duplicados si el archivo no existe o está vacío
+
+    clave = clave_persona(nueva_persona)
+    return any(clave_persona(persona) == clave for persona in personas)
+
+def clave_persona(persona: Dict) -> tuple:
+    """
+    Obtiene la clave con la que se comparan dos personas para detectar duplicados.
+
+    Dos personas son duplicadas si coinciden nombre, apellido, fecha de nacimiento y teléfono,
+    sin distinguir mayúsculas ni espacios al inicio o al final. La clave permite buscar duplicados
+    en un conjunto en lugar de recorrer todos los registros.
+
+        Args:
+            persona (Dict | Persona): Datos de la persona (ver CAMPOS_PERSONA), o un Paciente o Medico.
+
+        Returns:
+            tuple: Valores normalizados de los campos de CAMPOS_PERSONA.
+    """
+    if isinstance(persona, dict):
+        valores = (persona.get(campo) for campo in CAMPOS_PERSONA)
+    else:
+        valores = (getattr(persona, campo) for campo in CAMPOS_PERSONA)
+    return tuple(str(valor).strip().lower() for valor in valores)
 
-    campos_clave = ['nombre', 'apellido', 'fecha_nacimiento', 'telefono']
+def errores_personas(personas: list, validar_fechas) -> list:
+    """
+    Valida un lote de personas columna por columna y describe los campos incorrectos de cada una.
 
-    for persona in personas:
-        if all(str(persona.get(campo)).strip().lower() == str(nueva_persona.get(campo)).strip().lower()
-               for campo in campos_clave):
-            return True  # Encontró un duplicado exacto
+        Args:
+            personas (list): Diccionarios con los datos de cada persona (ver CAMPOS_PERSONA).
+            validar_fechas (callable): Validación por lotes de las fechas de nacimiento
+                                       (por ejemplo, validar_fechas_paciente).
 
-    return False
+        Returns:
+            list: Para cada persona, la lista de mensajes de error (vacía si sus datos son válidos).
+    """
+    columnas = {campo: [persona.get(campo) or "" for persona in personas] for campo in CAMPOS_PERSONA}
+    validaciones = (
+        ('nombre', validar_nombres, "Nombre no válido"),
+        ('apellido', validar_nombres, "Apellido no válido"),
+        ('fecha_nacimiento', validar_fechas, "Fecha de nacimiento no válida"),
+        ('telefono', validar_telefonos, "Teléfono no válido"),
+    )
+    resultados = [(campo, validar(columnas[campo]), mensaje) for campo, validar, mensaje in validaciones]
+
+    errores = []
+    for i in range(len(personas)):
+        faltantes = [campo for campo in CAMPOS_PERSONA if not columnas[campo][i]]
+        if faltantes:
+            errores.append([f"Faltan datos: {', '.join(faltantes)}"])
+        else:
+            errores.append([mensaje for _, validos, mensaje in resultados if not validos[i][0]])
+    return errores
 
 def generar_id(prefijo: str, ultimo_id: str) -> str:
     """
@@ -171,3 +335,18 @@ def generar_id(prefijo: str, ultimo_id: str) -> str:
 
     numero = int(ultimo_id.replace(prefijo, ""))
     return f"{prefijo}{numero + 1:03d}"
+
+def generar_ids(prefijo: str, ultimo_id: str, cantidad: int) -> list:
+    """
+    Genera un bloque de IDs consecutivos a partir del último ID registrado.
+
+        Args:
+            prefijo (str): Prefijo de los IDs (por ejemplo, 'PAC').
+            ultimo_id (str): Último ID generado, o None si no hay ninguno.
+            cantidad (int): Número de IDs a generar.
+
+        Returns:
+            list: IDs nuevos en orden (por ejemplo, ['PAC013', 'PAC014']).
+    """
+    numero = int(ultimo_id.replace(prefijo, "")) if ultimo_id else 0
+    return [f"{prefijo}{numero + i:03d}" for i in range(1, cantidad + 1)]
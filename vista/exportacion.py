@@ -0,0 +1,118 @@
+import csv
+import json
+import sys
+from controlador.cargador import cargar_gestores
+
+# Columnas de cada fila exportada (una por cita)
+COLUMNAS_EXPORTACION = (
+    'id_cita', 'fecha', 'hora', 'estado',
+    'id_paciente', 'paciente_nombre', 'paciente_apellido', 'paciente_telefono',
+    'id_medico', 'medico_nombre', 'medico_apellido', 'especialidad',
+    'id_diagnostico', 'descripcion', 'tratamiento', 'observaciones',
+)
+FORMATOS_EXPORTACION = ('csv', 'ndjson')
+
+
+def filas_exportacion(gestores: dict, desde: str = None, hasta: str = None):
+    """
+    Genera una fila por cita con los datos de su paciente, su médico, la especialidad y su diagnóstico.
+
+    Las citas se recorren con `GestorCitas.iterar_registros`, así que el historial no se carga en memoria,
+    y el diagnóstico de cada una se lee con `GestorDiagnosticos.obtener_registro_por_cita` a medida que
+    se genera su fila, sin cargar todos los diagnósticos.
+
+        Args:
+            gestores (dict): Gestores devueltos por `cargar_gestores`.
+            desde (str): Fecha inicial en formato DD/MM/AAAA, o None para no limitar.
+            hasta (str): Fecha final en formato DD/MM/AAAA, o None para no limitar.
+
+        Returns:
+            generator: Diccionarios con las claves de COLUMNAS_EXPORTACION.
+
+        Raises:
+            ValueError: Si alguna de las fechas no tiene el formato correcto.
+    """
+    registros = gestores['citas'].iterar_registros(desde, hasta)
+    return _filas(gestores, registros)
+
+def _filas(gestores: dict, registros):
+    """
+    Generador de `filas_exportacion`.
+    """
+    for cita_data in registros:
+        paciente = gestores['pacientes'].buscar_paciente(cita_data['id_paciente'])
+        medico = gestores['medicos'].buscar_medico(cita_data['id_medico'])
+        diagnostico = gestores['diagnosticos'].obtener_registro_por_cita(cita_data['id_cita'])
+        yield {
+            'id_cita': cita_data['id_cita'],
+            'fecha': cita_data['fecha'],
+            'hora': cita_data['hora'],
+            'estado': cita_data['estado'],
+            'id_paciente': cita_data['id_paciente'],
+            'paciente_nombre': paciente.nombre if paciente else None,
+            'paciente_apellido': paciente.apellido if paciente else None,
+            'paciente_telefono': paciente.telefono if paciente else None,
+            'id_medico': cita_data['id_medico'],
+            'medico_nombre': medico.nombre if medico else None,
+            'medico_apellido': medico.apellido if medico else None,
+            'especialidad': medico.especialidad.nombre if medico else None,
+            'id_diagnostico': diagnostico['id_diagnostico'] if diagnostico else None,
+            'descripcion': diagnostico['descripcion'] if diagnostico else None,
+            'tratamiento': diagnostico['tratamiento'] if diagnostico else None,
+            'observaciones': diagnostico['observaciones'] if diagnostico else None,
+        }
+
+def exportar(formato: str, ruta_salida: str, desde: str = None, hasta: str = None) -> bool:
+    """
+    Exporta las citas con sus pacientes, médicos y diagnósticos a CSV o NDJSON, sin abrir la interfaz gráfica.
+
+    Cada fila se escribe en cuanto se genera, de modo que la memoria usada no depende del
+    número de citas exportadas.
+
+        Args:
+            formato (str): 'csv' o 'ndjson' (un objeto JSON por línea).
+            ruta_salida (str): Archivo de salida, o '-' para la salida estándar.
+            desde (str): Fecha inicial en formato DD/MM/AAAA, o None para no limitar.
+            hasta (str): Fecha final en formato DD/MM/AAAA, o None para no limitar.
+
+        Returns:
+            bool: True si se exportó correctamente, False si ocurrió un error.
+    """
+    gestores, _ = cargar_gestores()
+    try:
+        filas = filas_exportacion(gestores, desde, hasta)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+
+    try:
+        if ruta_salida == '-':
+            total = _escribir_filas(formato, filas, sys.stdout)
+        else:
+            with open(ruta_salida, 'w', encoding='utf-8', newline='') as archivo:
+                total = _escribir_filas(formato, filas, archivo)
+    except OSError as e:
+        print(f"Error al exportar: {e}", file=sys.stderr)
+        return False
+    print(f"{total} citas exportadas", file=sys.stderr)
+    return True
+
+def _escribir_filas(formato: str, filas, archivo) -> int:
+    """
+    Escribe las filas en un archivo ya abierto.
+
+        Returns:
+            int: Número de filas escritas.
+    """
+    total = 0
+    if formato == 'csv':
+        escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS_EXPORTACION)
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow(fila)
+            total += 1
+    else:
+        for fila in filas:
+            archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+            total += 1
+    return total
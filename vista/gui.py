@@ -1,5 +1,7 @@
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from pathlib import Path
+from tkinter import ttk, messagebox, filedialog
 
 from controlador.gestor_diagnosticos import GestorDiagnosticos
 from controlador.gestor_pacientes import GestorPacientes
@@ -7,7 +9,44 @@ from controlador.gestor_medicos import GestorMedicos
 from controlador.gestor_citas import GestorCitas
 from controlador.gestor_estadisticas import GestorEstadisticas
 from controlador.gestor_especialidades import GestorEspecialidades
-
+from controlador.gestor_persistente import GestorPersistente
+from controlador.cargador import cargar_gestores, informe_tiempos
+from utils.instantanea import cargar_instantanea, guardar_instantanea
+from utils.persistencia import TrabajadorPersistencia, completar_transacciones
+from utils.eventos import BusEventos
+from utils import instrumentacion
+from utils.instrumentacion import instrumentada
+
+# Número máximo de pacientes sugeridos en los combobox de búsqueda mientras se escribe
+LIMITE_SUGERENCIAS = 20
+
+# Número de citas que se muestran por página en la tabla de citas
+TAMANO_PAGINA_CITAS = 50
+
+# Cada cuántos milisegundos se revisan las escrituras terminadas en segundo plano
+INTERVALO_PERSISTENCIA_MS = 100
+
+# Cada cuántos milisegundos se buscan cambios guardados por otros procesos (otra ventana o la API)
+INTERVALO_SINCRONIZACION_MS = 2000
+
+# Si es True, después de mostrar el menú se cargan en segundo plano los gestores aún no usados
+PRECARGAR_GESTORES = True
+
+# Si es True, al cerrar se guarda una instantánea de los datos cargados para acelerar el siguiente inicio
+USAR_INSTANTANEA = True
+DIR_DATOS = Path("datos")
+RUTA_INSTANTANEA = DIR_DATOS / "instantanea.pickle"
+
+# Métodos de la interfaz cuya duración se mide cuando la instrumentación está activa
+# (ver utils.instrumentacion): los que construyen las pantallas y los que actualizan las tablas
+METODOS_MEDIDOS = (
+    'crear_menu_principal', 'mostrar_formulario_paciente', 'mostrar_formulario_medico',
+    'mostrar_formulario_cita', 'mostrar_formulario_diagnostico', 'mostrar_formulario_especialidades',
+    'mostrar_lista_diagnosticos', 'mostrar_reportes', 'actualizar_lista_citas', 'mostrar_pagina_citas',
+    'actualizar_citas_pendientes', 'refrescar_fila_cita', 'agregar_fila_cita', 'sincronizar_datos',
+)
+
+@instrumentada(METODOS_MEDIDOS)
 class GUI:
     """
     Interfaz gráfica para el sistema de gestión clínica.
@@ -16,21 +55,234 @@ class GUI:
     """
     def __init__(self):
         """
-        Inicializa la ventana principal y los gestores de datos.
+        Inicializa la ventana principal.
 
         Crea la ventana principal, establece el título y la geometría, y llama a la función para crear el menú principal.
+        Los gestores de datos no se crean aquí, sino la primera vez que una pantalla los usa.
         """
-        self.gestor_pacientes = GestorPacientes()
-        self.gestor_medicos = GestorMedicos()
-        self.gestor_citas = GestorCitas()
-        self.gestor_estadisticas = GestorEstadisticas()
-        self.gestor_especialidades = GestorEspecialidades()
-        self.gestor_diagnosticos = GestorDiagnosticos(self.gestor_citas)
+        # Las escrituras a disco se hacen en segundo plano para no bloquear la interfaz
+        self.trabajador_io = TrabajadorPersistencia()
+        # Los gestores publican sus cambios aquí para que las estadísticas se actualicen sin recalcular
+        self.bus_eventos = BusEventos()
+        self._gestores = {}
+        # Protege el diccionario de gestores; se toma solo mientras se consulta o modifica
+        self._bloqueo_gestores = threading.RLock()
+        # Se toma mientras se crea y carga un gestor, para no cargarlo dos veces (por ejemplo, desde una
+        # pantalla y desde la precarga) sin bloquear a quien solo usa los gestores ya cargados
+        self._bloqueo_carga = threading.RLock()
+        # Duración de cada fase de la carga en paralelo de la precarga (fase -> segundos)
+        self.tiempos_carga = {}
+        # Antes de comparar la instantánea con los archivos, se termina cualquier guardado interrumpido
+        completar_transacciones(DIR_DATOS)
+        if USAR_INSTANTANEA:
+            self.cargar_instantanea()
 
         self.root = tk.Tk()
         self.root.title("Sistema de Gestión Clínica")
         self.root.geometry("800x600")
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self.crear_barra_estado()
         self.crear_menu_principal()
+        self.root.after(INTERVALO_PERSISTENCIA_MS, self.revisar_persistencia)
+        self.root.after(INTERVALO_SINCRONIZACION_MS, self.sincronizar_datos)
+        if PRECARGAR_GESTORES:
+            self.root.after_idle(self.precargar_gestores)
+
+    def _obtener_gestor(self, nombre: str, crear):
+        """
+        Devuelve un gestor, creándolo (y cargando sus datos) la primera vez que se pide.
+
+            Args:
+                nombre (str): Nombre del gestor.
+                crear (callable): Función que construye el gestor.
+
+            Returns:
+                Gestor ya cargado.
+        """
+        with self._bloqueo_gestores:
+            gestor = self._gestores.get(nombre)
+        if gestor is not None:
+            return gestor
+
+        with self._bloqueo_carga:
+            with self._bloqueo_gestores:
+                gestor = self._gestores.get(nombre)
+            if gestor is None:
+                gestor = crear()
+                self._conectar_gestor(gestor)
+                with self._bloqueo_gestores:
+                    self._gestores[nombre] = gestor
+            return gestor
+
+    def _conectar_gestor(self, gestor):
+        """
+        Asigna a un gestor de datos el trabajador de persistencia y el bus de eventos de la ventana.
+        """
+        if isinstance(gestor, GestorPersistente):
+            gestor.trabajador_io = self.trabajador_io
+            gestor.bus_eventos = self.bus_eventos
+
+    def cargar_instantanea(self):
+        """
+        Toma los gestores de la instantánea guardada al cerrar, si los archivos de datos no han cambiado desde entonces.
+        """
+        gestores = cargar_instantanea(RUTA_INSTANTANEA, DIR_DATOS)
+        if not gestores:
+            return
+        for gestor in gestores.values():
+            self._conectar_gestor(gestor)
+        self._gestores.update(gestores)
+
+    def guardar_instantanea(self):
+        """
+        Guarda una instantánea de los gestores ya cargados para el siguiente inicio.
+        """
+        with self._bloqueo_gestores:
+            # Las estadísticas no se guardan: sus conteos dependen de las suscripciones de esta sesión
+            gestores = {nombre: gestor for nombre, gestor in self._gestores.items()
+                        if isinstance(gestor, GestorPersistente)}
+            if gestores:
+                guardar_instantanea(RUTA_INSTANTANEA, gestores, DIR_DATOS)
+
+    @property
+    def gestor_pacientes(self) -> GestorPacientes:
+        """
+        GestorPacientes: Gestor de pacientes (se crea en el primer uso).
+        """
+        return self._obtener_gestor("pacientes", GestorPacientes)
+
+    @property
+    def gestor_medicos(self) -> GestorMedicos:
+        """
+        GestorMedicos: Gestor de médicos (se crea en el primer uso, reutilizando el gestor de especialidades).
+        """
+        return self._obtener_gestor("medicos", lambda: GestorMedicos(self.gestor_especialidades))
+
+    @property
+    def gestor_citas(self) -> GestorCitas:
+        """
+        GestorCitas: Gestor de citas (se crea en el primer uso, reutilizando los gestores de pacientes y médicos).
+        """
+        return self._obtener_gestor("citas", lambda: GestorCitas(self.gestor_pacientes, self.gestor_medicos))
+
+    @property
+    def gestor_estadisticas(self) -> GestorEstadisticas:
+        """
+        GestorEstadisticas: Gestor de estadísticas (se crea en el primer uso).
+        """
+        return self._obtener_gestor("estadisticas", lambda: GestorEstadisticas(self.bus_eventos))
+
+    @property
+    def gestor_especialidades(self) -> GestorEspecialidades:
+        """
+        GestorEspecialidades: Gestor de especialidades (se crea en el primer uso).
+        """
+        return self._obtener_gestor("especialidades", GestorEspecialidades)
+
+    @property
+    def gestor_diagnosticos(self) -> GestorDiagnosticos:
+        """
+        GestorDiagnosticos: Gestor de diagnósticos (se crea en el primer uso).
+        """
+        return self._obtener_gestor("diagnosticos", lambda: GestorDiagnosticos(self.gestor_citas))
+
+    def precargar_gestores(self):
+        """
+        Carga en un hilo aparte los gestores que aún no se han usado, una vez mostrado el menú.
+
+        Si todavía no se ha cargado ninguno, los archivos se leen en paralelo (ver `cargar_gestores`); los
+        diagnósticos se siguen cargando en la primera consulta. Si una pantalla pide un gestor mientras
+        se está cargando, espera a que termine esa carga; la sincronización periódica no espera, porque
+        solo usa los gestores ya cargados. Los tiempos de cada fase de la carga se imprimen y se muestran
+        en la pantalla de rendimiento.
+        """
+        def precargar():
+            with self._bloqueo_carga:
+                with self._bloqueo_gestores:
+                    vacio = not self._gestores
+                if vacio:
+                    gestores, tiempos = cargar_gestores()
+                    for gestor in gestores.values():
+                        self._conectar_gestor(gestor)
+                    with self._bloqueo_gestores:
+                        self._gestores.update(gestores)
+                    self.tiempos_carga = tiempos
+                    print(f"Carga inicial de los gestores:\n{informe_tiempos(tiempos)}")
+            for nombre in ("pacientes", "medicos", "especialidades", "citas", "diagnosticos"):
+                getattr(self, f"gestor_{nombre}")
+
+        threading.Thread(target=precargar, name="precarga", daemon=True).start()
+
+    def crear_barra_estado(self):
+        """
+        Crea la barra inferior que indica cuándo hay cambios guardándose en segundo plano.
+
+        La barra se conserva al cambiar de pantalla.
+        """
+        self.barra_estado = tk.Frame(self.root)
+        self.barra_estado.pack(side="bottom", fill="x")
+
+        self.lbl_estado = tk.Label(self.barra_estado, anchor="w")
+        self.lbl_estado.pack(side="left", padx=5)
+
+        self.progreso_guardado = ttk.Progressbar(self.barra_estado, mode="indeterminate", length=120)
+        self.progreso_guardado.pack(side="right", padx=5, pady=2)
+        self.guardando = False
+
+    def revisar_persistencia(self):
+        """
+        Revisa periódicamente las escrituras en segundo plano: muestra los errores y actualiza el indicador.
+        """
+        for error in self.trabajador_io.procesar_resultados():
+            messagebox.showerror("Error", f"No se pudieron guardar los cambios: {error}")
+
+        pendientes = self.trabajador_io.pendientes()
+        if pendientes and not self.guardando:
+            self.progreso_guardado.start(10)
+        elif not pendientes and self.guardando:
+            self.progreso_guardado.stop()
+        self.guardando = bool(pendientes)
+        self.lbl_estado.config(text="Guardando cambios..." if pendientes else "")
+
+        self.root.after(INTERVALO_PERSISTENCIA_MS, self.revisar_persistencia)
+
+    def sincronizar_datos(self):
+        """
+        Aplica periódicamente los cambios que otros procesos guardaron en los archivos de datos.
+
+        Solo se hace cuando no hay escrituras propias pendientes, y solo con los gestores ya cargados;
+        las pantallas muestran los cambios la próxima vez que se actualizan.
+        """
+        # Se consulta antes de procesar los resultados para no tomar una escritura propia como ajena
+        if not self.trabajador_io.pendientes():
+            for error in self.trabajador_io.procesar_resultados():
+                messagebox.showerror("Error", f"No se pudieron guardar los cambios: {error}")
+            with self._bloqueo_gestores:
+                for nombre in ('pacientes', 'medicos', 'especialidades', 'citas', 'diagnosticos'):
+                    gestor = self._gestores.get(nombre)
+                    if gestor is None:
+                        continue
+                    try:
+                        gestor.sincronizar()
+                    except Exception as e:
+                        print(f"Error al sincronizar {gestor.nombre_datos}: {e}")
+
+        self.root.after(INTERVALO_SINCRONIZACION_MS, self.sincronizar_datos)
+
+    def cerrar(self):
+        """
+        Cierra la aplicación después de terminar de guardar los cambios pendientes.
+        """
+        self.lbl_estado.config(text="Guardando cambios pendientes...")
+        self.root.update_idletasks()
+        self.trabajador_io.detener()
+        errores = self.trabajador_io.procesar_resultados()
+        for error in errores:
+            messagebox.showerror("Error", f"No se pudieron guardar los cambios: {error}")
+        # Solo se guarda la instantánea si lo que hay en memoria coincide con los archivos
+        if USAR_INSTANTANEA and not errores:
+            self.guardar_instantanea()
+        self.root.destroy()
 
     def crear_menu_principal(self):
         """
@@ -82,13 +334,18 @@ class GUI:
                                  command=self.mostrar_reportes, width=ancho_botones)
         btn_reportes.pack(pady=5, fill='x')
 
+        btn_rendimiento = tk.Button(frame_botones, text="Diagnóstico de Rendimiento",
+                                    command=self.mostrar_rendimiento, width=ancho_botones)
+        btn_rendimiento.pack(pady=5, fill='x')
+
 
     def limpiar_pantalla(self):
         """
-        Limpia la pantalla eliminando todos los widgets actualmente visibles.
+        Limpia la pantalla eliminando todos los widgets actualmente visibles, excepto la barra de estado.
         """
         for widget in self.root.winfo_children():
-            widget.destroy()
+            if widget is not self.barra_estado:
+                widget.destroy()
 
     def mostrar_formulario_paciente(self):
         """
@@ -140,6 +397,10 @@ class GUI:
                     'fecha_nacimiento': entry_fecha_nac.get(),
                     'telefono': entry_telefono.get()
                 }
+                similares = self.gestor_pacientes.buscar_similares(paciente['nombre'], paciente['apellido'])
+                if similares and not self.confirmar_posible_duplicado(
+                        [f"{p.id_paciente} - {p.get_nombre_completo()} ({p.fecha_nacimiento})" for p, _ in similares]):
+                    return
                 if not self.gestor_pacientes.agregar_paciente(paciente):
                     messagebox.showerror("Error", "Datos inválidos. Verifique:"
                                                   "\n- Nombres/apellidos solo letras"
@@ -179,6 +440,22 @@ class GUI:
                 paciente.telefono
             ))
 
+    def confirmar_posible_duplicado(self, descripciones: list) -> bool:
+        """
+        Avisa que ya existen personas con un nombre parecido y pregunta si se registra de todos modos.
+
+            Args:
+                descripciones (list): Textos que describen a las personas parecidas ya registradas.
+
+            Returns:
+                bool: True si el usuario confirma el registro, False si lo cancela.
+        """
+        return messagebox.askyesno(
+            "Posible duplicado",
+            "Ya existen registros con un nombre parecido:\n\n" + "\n".join(descripciones) +
+            "\n\n¿Desea registrarlo de todos modos?"
+        )
+
     def mostrar_formulario_medico(self):
         """
         Muestra el formulario para el registro de médicos.
@@ -252,6 +529,11 @@ class GUI:
                     'especialidad': especialidad_obj
                 }
 
+                similares = self.gestor_medicos.buscar_similares(medico['nombre'], medico['apellido'])
+                if similares and not self.confirmar_posible_duplicado(
+                        [f"{m.id_medico} - {m.get_nombre_completo()} ({m.especialidad.nombre})" for m, _ in similares]):
+                    return
+
                 if not self.gestor_medicos.agregar_medico(medico):
                     messagebox.showerror("Error", "Datos inválidos. Verifique:"
                                                   "\n- Nombres/apellidos solo letras"
@@ -302,6 +584,8 @@ class GUI:
         self.cita_seleccionada = None
         self.filtro_paciente = None
         self.filtro_medico = None
+        self.cursor_citas = None
+        self.pagina_citas = 0
 
         lbl_titulo = tk.Label(self.root, text="Registro de Citas", font=("Arial", 14))
         lbl_titulo.pack(pady=10)
@@ -319,17 +603,16 @@ class GUI:
         self.entry_hora = tk.Entry(frame_formulario)
         self.entry_hora.grid(row=2, column=1, padx=5, pady=5)
 
-        # Selección de paciente
+        # Selección de paciente (se buscan mientras se escribe)
         tk.Label(frame_formulario, text="Paciente:").grid(row=3, column=0, sticky="e", padx=5, pady=5)
-        pacientes = [f"{p.id_paciente} - {p.get_nombre_completo()}" for p in self.gestor_pacientes.listar_pacientes()]
-        self.combo_paciente = ttk.Combobox(frame_formulario, values=pacientes, state="readonly")
+        self.combo_paciente = ttk.Combobox(frame_formulario)
         self.combo_paciente.grid(row=3, column=1, padx=5, pady=5)
+        self.configurar_busqueda_pacientes(self.combo_paciente)
 
         # Selección de médico
         tk.Label(frame_formulario, text="Médico:").grid(row=4, column=0, sticky="e", padx=5, pady=5)
-        medicos = [f"{m.id_medico} - {m.get_nombre_completo()} ({m.especialidad.nombre})"
-                   for m in self.gestor_medicos.listar_medicos()]
-        self.combo_medico = ttk.Combobox(frame_formulario, values=medicos, state="readonly")
+        self.combo_medico = ttk.Combobox(frame_formulario, values=self.gestor_medicos.etiquetas(con_especialidad=True),
+                                         state="readonly")
         self.combo_medico.grid(row=4, column=1, padx=5, pady=5)
 
         frame_botones = tk.Frame(self.root)
@@ -353,23 +636,17 @@ class GUI:
         frame_filtros = tk.Frame(self.root)
         frame_filtros.pack(pady=10, fill=tk.X)
 
-        # Filtro por paciente
+        # Filtro por paciente (se buscan mientras se escribe)
         tk.Label(frame_filtros, text="Filtrar por paciente:").grid(row=0, column=0, padx=5)
-        opciones_pacientes = ["Todos"] + [f"{p.id_paciente} - {p.get_nombre_completo()}"
-                                          for p in self.gestor_pacientes.listar_pacientes()]
-        self.combo_filtro_paciente = ttk.Combobox(
-            frame_filtros,
-            values=opciones_pacientes,
-            state="readonly"
-        )
+        self.combo_filtro_paciente = ttk.Combobox(frame_filtros)
         self.combo_filtro_paciente.grid(row=0, column=1, padx=5)
+        self.configurar_busqueda_pacientes(self.combo_filtro_paciente, opciones_fijas=["Todos"])
         self.combo_filtro_paciente.set("Todos")
         self.combo_filtro_paciente.bind("<<ComboboxSelected>>", self.aplicar_filtros)
 
         # Filtro por médico
         tk.Label(frame_filtros, text="Filtrar por médico:").grid(row=0, column=2, padx=5)
-        opciones_medicos = ["Todos"] + [f"{m.id_medico} - {m.get_nombre_completo()}"
-                                        for m in self.gestor_medicos.listar_medicos()]
+        opciones_medicos = ["Todos"] + self.gestor_medicos.etiquetas()
         self.combo_filtro_medico = ttk.Combobox(
             frame_filtros,
             values=opciones_medicos,
@@ -379,9 +656,16 @@ class GUI:
         self.combo_filtro_medico.set("Todos")
         self.combo_filtro_medico.bind("<<ComboboxSelected>>", self.aplicar_filtros)
 
-        # Asegurarse que los combobox de filtros están habilitados inicialmente
-        self.combo_filtro_paciente.config(state="readonly")
-        self.combo_filtro_medico.config(state="readonly")
+        # Filtro por estado
+        tk.Label(frame_filtros, text="Filtrar por estado:").grid(row=1, column=0, padx=5, pady=5)
+        self.combo_filtro_estado = ttk.Combobox(
+            frame_filtros,
+            values=["Todos", "pendiente", "completada", "cancelada"],
+            state="readonly"
+        )
+        self.combo_filtro_estado.grid(row=1, column=1, padx=5, pady=5)
+        self.combo_filtro_estado.set("Todos")
+        self.combo_filtro_estado.bind("<<ComboboxSelected>>", self.aplicar_filtros)
 
         # Botón para limpiar filtros
         btn_limpiar = tk.Button(frame_filtros, text="Limpiar filtros", command=self.limpiar_filtros)
@@ -404,12 +688,51 @@ class GUI:
         self.tree.heading("Estado", text="Estado")
         self.tree.pack(fill="both", expand=True)
 
+        # Navegación entre páginas de citas
+        frame_paginas = tk.Frame(frame_lista)
+        frame_paginas.pack(pady=5)
+
+        self.btn_pagina_anterior = tk.Button(frame_paginas, text="< Anterior",
+                                             command=lambda: self.mostrar_pagina_citas(self.pagina_citas - 1))
+        self.btn_pagina_anterior.pack(side="left", padx=5)
+
+        self.lbl_pagina_citas = tk.Label(frame_paginas)
+        self.lbl_pagina_citas.pack(side="left", padx=5)
+
+        self.btn_pagina_siguiente = tk.Button(frame_paginas, text="Siguiente >",
+                                              command=lambda: self.mostrar_pagina_citas(self.pagina_citas + 1))
+        self.btn_pagina_siguiente.pack(side="left", padx=5)
+
         # Llenar el treeview con las citas existentes
         self.actualizar_lista_citas()
 
         # Configurar evento de selección
         self.tree.bind("<<TreeviewSelect>>", self.on_cita_seleccionada)
 
+    def configurar_busqueda_pacientes(self, combo, opciones_fijas=()):
+        """
+        Hace que un combobox de pacientes sugiera coincidencias por prefijo mientras se escribe,
+        en lugar de cargar de antemano la lista completa de pacientes.
+
+            Args:
+                combo (ttk.Combobox): Combobox editable de pacientes.
+                opciones_fijas (list): Opciones que siempre aparecen al inicio (por ejemplo, "Todos").
+        """
+        def actualizar_sugerencias(event=None):
+            """Actualiza las opciones del combobox con los pacientes que coinciden con lo escrito."""
+            if event is not None and event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+                return
+            texto = combo.get()
+            if texto in opciones_fijas:
+                texto = ""
+            # Si ya hay un paciente seleccionado ("ID - Apellido, Nombre"), se busca por su ID
+            texto = texto.split(" - ")[0]
+            pacientes = self.gestor_pacientes.buscar_por_prefijo(texto, LIMITE_SUGERENCIAS)
+            combo['values'] = list(opciones_fijas) + [self.gestor_pacientes.etiqueta(p) for p in pacientes]
+
+        combo.bind("<KeyRelease>", actualizar_sugerencias)
+        actualizar_sugerencias()
+
     def mostrar_formulario_diagnostico(self):
         """
         Muestra el formulario para gestionar diagnósticos médicos.
@@ -448,7 +771,7 @@ class GUI:
 
         tk.Label(frame_medico, text="Selecciona el médico que realizará el diagnóstico:").pack(side="left", padx=5)
 
-        medicos = [f"{m.id_medico} - {m.get_nombre_completo()}" for m in self.gestor_medicos.listar_medicos()]
+        medicos = self.gestor_medicos.etiquetas()
         self.combo_medico_diag = ttk.Combobox(frame_medico, values=medicos, state="readonly")
         self.combo_medico_diag.pack(side="left", padx=5, fill="x", expand=True)
         self.combo_medico_diag.bind("<<ComboboxSelected>>", self.actualizar_citas_pendientes)
@@ -503,8 +826,7 @@ class GUI:
         Actualiza la lista de citas pendientes del médico seleccionado en la interfaz.
         """
         # Limpiar tabla
-        for item in self.tree_citas.get_children():
-            self.tree_citas.delete(item)
+        self.tree_citas.delete(*self.tree_citas.get_children())
 
         # Obtener médico seleccionado
         medico_sel = self.combo_medico_diag.get()
@@ -514,12 +836,11 @@ class GUI:
         id_medico = medico_sel.split(" - ")[0]
 
         # Obtener citas pendientes del médico
-        citas_medico = [c for c in self.gestor_citas.listar_citas()
-                        if c.medico.id_medico == id_medico and c.estado == "pendiente"]
+        citas_medico = self.gestor_citas.consulta().medico(id_medico).estado("pendiente").ejecutar()
 
         # Llenar tabla
         for cita in citas_medico:
-            self.tree_citas.insert("", "end", values=(
+            self.tree_citas.insert("", "end", iid=cita.id_cita, values=(
                 cita.id_cita,
                 cita.fecha,
                 cita.hora,
@@ -558,7 +879,8 @@ class GUI:
                     cita=cita
             ):
                 messagebox.showinfo("Éxito", "Diagnóstico registrado correctamente")
-                self.actualizar_citas_pendientes()
+                # La cita ya no está pendiente: solo se quita su fila
+                self.tree_citas.delete(seleccion[0])
                 # Limpiar formulario
                 self.entry_descripcion.delete("1.0", tk.END)
                 self.entry_tratamiento.delete("1.0", tk.END)
@@ -569,39 +891,131 @@ class GUI:
         except Exception as e:
             messagebox.showerror("Error", f"Ocurrió un error al guardar: {str(e)}")
 
-    def actualizar_lista_citas(self):
+    def actualizar_lista_citas(self, conservar_pagina: bool = False):
         """
-        Actualiza la lista de citas según los filtros aplicados (paciente y/o médico).
+        Actualiza la lista de citas según los filtros aplicados (paciente, médico y/o estado).
+
+        Solo se muestran en la tabla las citas de la página actual.
+
+            Args:
+                conservar_pagina (bool): Si es True, se sigue mostrando la misma página; si no, se vuelve a la primera.
         """
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Aplicar filtros
+        self.cursor_citas = self.gestor_citas.consultar_citas(*self.obtener_filtros_citas())
+
+        # Llenar tabla con la página de citas filtradas
+        self.mostrar_pagina_citas(self.pagina_citas if conservar_pagina else 0)
+
+    def obtener_filtros_citas(self) -> tuple:
+        """
+        Obtiene los filtros de paciente, médico y estado seleccionados en la pantalla de citas.
+
+        Un texto a medio escribir que no corresponde a ningún paciente no filtra.
 
-        # Obtener filtros
+            Returns:
+                tuple: (id_paciente, id_medico, estado); cada uno es None si no se filtra por él.
+        """
         filtro_paciente = self.combo_filtro_paciente.get().split(" - ")[
             0] if self.combo_filtro_paciente.get() != "Todos" else None
+        if filtro_paciente is not None and not self.gestor_pacientes.buscar_paciente(filtro_paciente):
+            filtro_paciente = None
         filtro_medico = self.combo_filtro_medico.get().split(" - ")[
             0] if self.combo_filtro_medico.get() != "Todos" else None
+        filtro_estado = self.combo_filtro_estado.get() if self.combo_filtro_estado.get() != "Todos" else None
+        return filtro_paciente, filtro_medico, filtro_estado
 
-        # Aplicar filtros
-        citas_filtradas = []
-        for cita in self.gestor_citas.listar_citas():
-            cumple_paciente = (filtro_paciente is None) or (cita.paciente.id_paciente == filtro_paciente)
-            cumple_medico = (filtro_medico is None) or (cita.medico.id_medico == filtro_medico)
+    def mostrar_pagina_citas(self, numero: int):
+        """
+        Muestra en la tabla una página de las citas consultadas.
+
+            Args:
+                numero (int): Número de página, empezando en 0.
+        """
+        # Si la página quedó vacía (por ejemplo, tras un filtro), retroceder a la última con citas
+        while numero > 0 and not self.cursor_citas.hay_pagina(numero, TAMANO_PAGINA_CITAS):
+            numero -= 1
+        self.pagina_citas = numero
 
-            if cumple_paciente and cumple_medico:
-                citas_filtradas.append(cita)
+        # Limpiar tabla
+        self.tree.delete(*self.tree.get_children())
 
-        # Llenar tabla con citas filtradas
-        for cita in citas_filtradas:
-            self.tree.insert("", "end", values=(
-                cita.id_cita,
-                cita.fecha,
-                cita.hora,
-                cita.paciente.get_nombre_completo(),
-                cita.medico.get_nombre_completo(),
-                cita.estado
-            ))
+        for cita in self.cursor_citas.pagina(numero, TAMANO_PAGINA_CITAS):
+            self.tree.insert("", "end", iid=cita.id_cita, values=self.valores_fila_cita(cita))
+
+        self.lbl_pagina_citas.config(text=f"Página {numero + 1}")
+        self.btn_pagina_anterior.config(state=tk.NORMAL if numero > 0 else tk.DISABLED)
+        self.actualizar_boton_siguiente()
+
+    def actualizar_boton_siguiente(self):
+        """
+        Habilita el botón de página siguiente solo si hay citas después de la página actual.
+        """
+        hay_siguiente = self.cursor_citas.hay_pagina(self.pagina_citas + 1, TAMANO_PAGINA_CITAS)
+        self.btn_pagina_siguiente.config(state=tk.NORMAL if hay_siguiente else tk.DISABLED)
+
+    @staticmethod
+    def valores_fila_cita(cita) -> tuple:
+        """
+        Devuelve los valores de las columnas de la tabla de citas para una cita.
+        """
+        return (
+            cita.id_cita,
+            cita.fecha,
+            cita.hora,
+            cita.paciente.get_nombre_completo(),
+            cita.medico.get_nombre_completo(),
+            cita.estado
+        )
+
+    def refrescar_fila_cita(self, cita, columnas=None):
+        """
+        Actualiza en la tabla únicamente la fila de una cita modificada, si está en la página visible.
+
+        Si la cita ya no cumple los filtros (por ejemplo, se canceló mientras se filtran las pendientes),
+        se quita de la tabla y la página se completa con las citas siguientes.
+
+            Args:
+                cita (Cita): Cita modificada.
+                columnas (dict): Columnas a actualizar (nombre -> valor). Si no se indica, se actualiza la fila completa.
+        """
+        if not self.tree.exists(cita.id_cita):
+            return
+        id_paciente, id_medico, estado = self.obtener_filtros_citas()
+        if (id_paciente not in (None, cita.paciente.id_paciente)
+                or id_medico not in (None, cita.medico.id_medico)
+                or estado not in (None, cita.estado)):
+            self.actualizar_lista_citas(conservar_pagina=True)
+            return
+        if columnas is None:
+            self.tree.item(cita.id_cita, values=self.valores_fila_cita(cita))
+        else:
+            for columna, valor in columnas.items():
+                self.tree.set(cita.id_cita, columna, valor)
+
+    def agregar_fila_cita(self, cita):
+        """
+        Agrega a la tabla una cita recién agendada sin volver a dibujar la página.
+
+        Las citas nuevas quedan al final de la consulta, así que solo se insertan si la página visible es
+        la última y aún tiene espacio; en otro caso solo se habilita el paso a la página siguiente.
+
+            Args:
+                cita (Cita): Cita agendada.
+        """
+        id_paciente, id_medico, estado = self.obtener_filtros_citas()
+        # Las citas nuevas se ven al consultar de nuevo (la consulta usa los índices, no recorre todas las citas)
+        self.cursor_citas = self.gestor_citas.consultar_citas(id_paciente, id_medico, estado)
+
+        if (id_paciente not in (None, cita.paciente.id_paciente)
+                or id_medico not in (None, cita.medico.id_medico)
+                or estado not in (None, cita.estado)):
+            return
+
+        filas = self.tree.get_children()
+        if len(filas) < TAMANO_PAGINA_CITAS and not self.cursor_citas.hay_pagina(
+                self.pagina_citas + 1, TAMANO_PAGINA_CITAS):
+            self.tree.insert("", "end", iid=cita.id_cita, values=self.valores_fila_cita(cita))
+        self.actualizar_boton_siguiente()
 
     def on_cita_seleccionada(self, event):
         """
@@ -624,8 +1038,7 @@ class GUI:
             self.entry_hora.insert(0, self.cita_seleccionada.hora)
 
             # Seleccionar paciente/médico en los combobox
-            self.combo_paciente.set(
-                f"{self.cita_seleccionada.paciente.id_paciente} - {self.cita_seleccionada.paciente.get_nombre_completo()}")
+            self.combo_paciente.set(self.gestor_pacientes.etiqueta(self.cita_seleccionada.paciente))
             self.combo_medico.set(
                 f"{self.cita_seleccionada.medico.id_medico} - {self.cita_seleccionada.medico.get_nombre_completo()}")
 
@@ -651,13 +1064,14 @@ class GUI:
             fecha = self.entry_fecha.get()
             hora = self.entry_hora.get()
 
-            if not self.gestor_citas.agendar_cita(fecha,hora, paciente, medico):
+            cita = self.gestor_citas.agendar_cita(fecha,hora, paciente, medico)
+            if not cita:
                 messagebox.showerror("Error", "Datos inválidos. Verifique:"
                                               "\n- Fecha posterior a hoy (DD/MM/AAAA)"
                                               "\n- Hora en formato HH:MM")
             else:
                 messagebox.showinfo("Éxito", "Cita agendada")
-                self.actualizar_lista_citas()
+                self.agregar_fila_cita(cita)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo agendar la cita: {e}")
 
@@ -677,7 +1091,7 @@ class GUI:
             return
 
         if self.gestor_citas.cancelar_cita(self.cita_seleccionada.id_cita):
-            self.actualizar_lista_citas()
+            self.refrescar_fila_cita(self.cita_seleccionada, {"Estado": self.cita_seleccionada.estado})
             self.limpiar_formulario()
             messagebox.showinfo("Éxito", "Cita cancelada correctamente")
         else:
@@ -701,7 +1115,10 @@ class GUI:
                         nueva_hora
                 ):
                     messagebox.showinfo("Éxito", "Cita modificada correctamente")
-                    self.actualizar_lista_citas()
+                    self.refrescar_fila_cita(self.cita_seleccionada, {
+                        "Fecha": self.cita_seleccionada.fecha,
+                        "Hora": self.cita_seleccionada.hora
+                    })
                 else:
                     messagebox.showerror("Error", "No se pudo modificar la cita")
             except Exception as e:
@@ -788,32 +1205,107 @@ class GUI:
         btn_regresar = tk.Button(self.root, text="Regresar", command=self.crear_menu_principal)
         btn_regresar.pack(pady=10)
 
-    def aplicar_filtros(self, event=None):
+    def mostrar_rendimiento(self):
         """
-        Aplica los filtros de paciente y médico a la lista de citas.
+        Muestra las mediciones de la instrumentación: duración de las operaciones de los gestores y de
+        la interfaz, y bytes leídos y escritos por archivo, junto con los tiempos de la carga inicial. Permite activarla, reiniciarla y guardar
+        las mediciones en un archivo JSON.
         """
-        # Determinar qué combobox disparó el evento
-        widget_disparador = event.widget if event else None
+        self.limpiar_pantalla()
 
-        # Si se modificó el filtro de paciente
-        if widget_disparador == self.combo_filtro_paciente:
-            # Deshabilitar el filtro de médico si se seleccionó un paciente específico
-            if self.combo_filtro_paciente.get() != "Todos":
-                self.combo_filtro_medico.set("Todos")
-                self.combo_filtro_medico.config(state=tk.DISABLED)
+        lbl_titulo = tk.Label(self.root, text="Diagnóstico de Rendimiento", font=("Arial", 14))
+        lbl_titulo.pack(pady=10)
+
+        lbl_estado = tk.Label(self.root)
+        lbl_estado.pack()
+
+        lbl_carga = tk.Label(self.root, justify="left")
+        lbl_carga.pack()
+
+        frame_tiempos = tk.Frame(self.root)
+        frame_tiempos.pack(padx=10, pady=5, fill="both", expand=True)
+
+        columnas_tiempos = ("Operación", "Llamadas", "Total (ms)", "Promedio (ms)", "p95 (ms)", "Máximo (ms)")
+        tree_tiempos = ttk.Treeview(frame_tiempos, columns=columnas_tiempos, show="headings")
+        for columna in columnas_tiempos:
+            tree_tiempos.heading(columna, text=columna)
+            tree_tiempos.column(columna, width=90, anchor="e")
+        tree_tiempos.column("Operación", width=260, anchor="w")
+        barra_tiempos = ttk.Scrollbar(frame_tiempos, orient="vertical", command=tree_tiempos.yview)
+        tree_tiempos.configure(yscrollcommand=barra_tiempos.set)
+        tree_tiempos.pack(side="left", fill="both", expand=True)
+        barra_tiempos.pack(side="right", fill="y")
+
+        columnas_bytes = ("Archivo", "Tipo", "Operaciones", "Total (bytes)", "Promedio (bytes)", "Máximo (bytes)")
+        tree_bytes = ttk.Treeview(self.root, columns=columnas_bytes, show="headings", height=6)
+        for columna in columnas_bytes:
+            tree_bytes.heading(columna, text=columna)
+            tree_bytes.column(columna, width=110, anchor="e")
+        tree_bytes.column("Archivo", width=200, anchor="w")
+        tree_bytes.column("Tipo", width=80, anchor="w")
+        tree_bytes.pack(padx=10, pady=5, fill="x")
+
+        def actualizar():
+            datos = instrumentacion.resumen()
+            lbl_estado.config(text="Medición activa" if datos['activa'] else
+                              "Medición desactivada (se activa con --instrumentar o con el botón Activar)")
+            btn_activar.config(text="Desactivar" if datos['activa'] else "Activar")
+            if self.tiempos_carga:
+                fases = ", ".join(informe_tiempos(self.tiempos_carga).splitlines())
+                lbl_carga.config(text=f"Carga inicial de los gestores: {fases}")
             else:
-                self.combo_filtro_medico.config(state="readonly")
-
-        # Si se modificó el filtro de médico
-        elif widget_disparador == self.combo_filtro_medico:
-            # Deshabilitar el filtro de paciente si se seleccionó un médico específico
-            if self.combo_filtro_medico.get() != "Todos":
-                self.combo_filtro_paciente.set("Todos")
-                self.combo_filtro_paciente.config(state=tk.DISABLED)
+                lbl_carga.config(text="Carga inicial de los gestores: sin medir (se cargaron bajo demanda)")
+
+            tree_tiempos.delete(*tree_tiempos.get_children())
+            for nombre, medicion in datos['tiempos_ms'].items():
+                tree_tiempos.insert("", "end", values=(
+                    nombre, medicion['cantidad'], f"{medicion['total']:.1f}", f"{medicion['promedio']:.2f}",
+                    f"{medicion['p95']:.2f}", f"{medicion['maximo']:.2f}"))
+
+            tree_bytes.delete(*tree_bytes.get_children())
+            for tipo, por_archivo in datos['bytes'].items():
+                for archivo, medicion in por_archivo.items():
+                    tree_bytes.insert("", "end", values=(
+                        archivo, tipo, medicion['cantidad'], medicion['total'], round(medicion['promedio']),
+                        medicion['maximo']))
+
+        def alternar():
+            if instrumentacion.esta_activa():
+                instrumentacion.desactivar()
             else:
-                self.combo_filtro_paciente.config(state="readonly")
+                instrumentacion.activar()
+            actualizar()
+
+        def reiniciar():
+            instrumentacion.reiniciar()
+            actualizar()
+
+        def guardar():
+            ruta = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")],
+                                                initialfile="rendimiento.json")
+            if ruta and instrumentacion.guardar_resumen(ruta):
+                messagebox.showinfo("Éxito", f"Mediciones guardadas en {ruta}")
+            elif ruta:
+                messagebox.showerror("Error", "No se pudieron guardar las mediciones")
 
-        # Actualizar lista con filtros
+        frame_botones = tk.Frame(self.root)
+        frame_botones.pack(pady=10)
+
+        btn_activar = tk.Button(frame_botones, command=alternar)
+        btn_activar.pack(side="left", padx=5)
+        tk.Button(frame_botones, text="Actualizar", command=actualizar).pack(side="left", padx=5)
+        tk.Button(frame_botones, text="Reiniciar", command=reiniciar).pack(side="left", padx=5)
+        tk.Button(frame_botones, text="Guardar JSON", command=guardar).pack(side="left", padx=5)
+        tk.Button(frame_botones, text="Regresar", command=self.crear_menu_principal).pack(side="left", padx=5)
+
+        actualizar()
+
+    def aplicar_filtros(self, event=None):
+        """
+        Aplica los filtros de paciente, médico y estado a la lista de citas.
+
+        Los filtros se combinan: se muestran las citas que cumplen todos los seleccionados.
+        """
         self.actualizar_lista_citas()
 
     def limpiar_filtros(self):
@@ -822,9 +1314,7 @@ class GUI:
         """
         self.combo_filtro_paciente.set("Todos")
         self.combo_filtro_medico.set("Todos")
-        # Habilitar ambos combobox
-        self.combo_filtro_paciente.config(state="readonly")
-        self.combo_filtro_medico.config(state="readonly")
+        self.combo_filtro_estado.set("Todos")
         self.actualizar_lista_citas()
 
     def mostrar_formulario_especialidades(self):
@@ -858,7 +1348,7 @@ class GUI:
             if nombre and desc:
                 if self.gestor_especialidades.agregar_especialidad(nombre, desc):
                     messagebox.showinfo("Éxito", "Especialidad agregada")
-                    actualizar_lista()
+                    tree.insert("", "end", iid=nombre, values=(nombre, desc))
                     entry_nombre.delete(0, tk.END)
                     entry_desc.delete(0, tk.END)
                 else:
@@ -873,11 +1363,10 @@ class GUI:
             """Elimina la especialidad seleccionada."""
             seleccion = tree.selection()
             if seleccion:
-                item = tree.item(seleccion[0])
-                nombre = item['values'][0]
+                nombre = seleccion[0]
                 if self.gestor_especialidades.eliminar_especialidad(nombre):
                     messagebox.showinfo("Éxito", "Especialidad eliminada")
-                    actualizar_lista()
+                    tree.delete(nombre)
                 else:
                     messagebox.showerror("Error", "No se pudo eliminar")
 
@@ -903,7 +1392,7 @@ class GUI:
             """Actualiza la lista de especialidades."""
             tree.delete(*tree.get_children())
             for esp in self.gestor_especialidades.listar_especialidades():
-                tree.insert("", "end", values=(esp.nombre, esp.descripcion))
+                tree.insert("", "end", iid=esp.nombre, values=(esp.nombre, esp.descripcion))
 
         actualizar_lista()
 
@@ -937,6 +1426,14 @@ class GUI:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+        # Búsqueda por texto en descripción, tratamiento y observaciones
+        frame_busqueda = tk.Frame(scrollable_frame)
+        frame_busqueda.pack(pady=10, fill="x")
+
+        tk.Label(frame_busqueda, text="Buscar:").pack(side="left", padx=5)
+        entry_busqueda = tk.Entry(frame_busqueda, width=40)
+        entry_busqueda.pack(side="left", padx=5)
+
         # Tabla de diagnósticos
         frame_tabla = tk.Frame(scrollable_frame)
         frame_tabla.pack(pady=10, fill="both", expand=True)
@@ -976,18 +1473,39 @@ class GUI:
 
         tree.pack(fill="both", expand=True)
 
+        def llenar_tabla(diagnosticos=None):
+            """Muestra en la tabla los diagnósticos indicados (todos si no se indican)."""
+            tree.delete(*tree.get_children())
+            for diag in self.gestor_diagnosticos.obtener_diagnosticos_completos(diagnosticos):
+                tree.insert("", "end", values=(
+                    diag['id_diagnostico'],
+                    diag['id_cita'],
+                    diag['paciente'],
+                    diag['medico'],
+                    diag['descripcion'],
+                    diag['tratamiento'],
+                    diag['observaciones']
+                ))
+
+        def buscar(event=None):
+            """Filtra la tabla con los diagnósticos que coinciden con el texto buscado."""
+            consulta = entry_busqueda.get().strip()
+            if consulta:
+                llenar_tabla(self.gestor_diagnosticos.buscar_diagnosticos(consulta))
+            else:
+                llenar_tabla()
+
+        def limpiar_busqueda():
+            """Borra el texto buscado y muestra todos los diagnósticos."""
+            entry_busqueda.delete(0, tk.END)
+            llenar_tabla()
+
+        entry_busqueda.bind("<Return>", buscar)
+        tk.Button(frame_busqueda, text="Buscar", command=buscar).pack(side="left", padx=5)
+        tk.Button(frame_busqueda, text="Mostrar todos", command=limpiar_busqueda).pack(side="left", padx=5)
+
         # Obtener y mostrar datos
-        diagnosticos = self.gestor_diagnosticos.obtener_diagnosticos_completos()
-        for diag in diagnosticos:
-            tree.insert("", "end", values=(
-                diag['id_diagnostico'],
-                diag['id_cita'],
-                diag['paciente'],
-                diag['medico'],
-                diag['descripcion'],
-                diag['tratamiento'],
-                diag['observaciones']
-            ))
+        llenar_tabla()
 
         # Botones
         frame_botones = tk.Frame(scrollable_frame)
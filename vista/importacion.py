@@ -0,0 +1,69 @@
+import csv
+from pathlib import Path
+from controlador.cargador import cargar_gestores
+from utils.persistencia import obtener_diario
+
+# Columnas obligatorias del CSV de cada tipo de datos que se puede importar
+COLUMNAS_IMPORTACION = {
+    'pacientes': ('nombre', 'apellido', 'fecha_nacimiento', 'telefono'),
+    'medicos': ('nombre', 'apellido', 'fecha_nacimiento', 'telefono', 'especialidad'),
+}
+
+
+def importar_csv(tipo: str, ruta_csv: Path, ruta_errores: Path = None) -> bool:
+    """
+    Importa pacientes o médicos desde un archivo CSV con encabezados, sin abrir la interfaz gráfica.
+
+    Todas las filas válidas se agregan y se guardan una sola vez. Las filas rechazadas se escriben en
+    un informe CSV con su número de fila (la primera después de los encabezados es la 1), sus columnas
+    originales y el motivo del rechazo.
+
+        Args:
+            tipo (str): 'pacientes' o 'medicos'.
+            ruta_csv (Path): Archivo CSV a importar (UTF-8, con o sin BOM).
+            ruta_errores (Path): Archivo del informe de errores; por omisión, `<archivo>.errores.csv`.
+
+        Returns:
+            bool: True si se pudo leer el archivo (aunque haya filas rechazadas), False si no.
+    """
+    ruta_csv = Path(ruta_csv)
+    if ruta_errores is None:
+        ruta_errores = ruta_csv.with_name(ruta_csv.stem + ".errores.csv")
+
+    try:
+        with open(ruta_csv, 'r', encoding='utf-8-sig', newline='') as archivo:
+            lector = csv.DictReader(archivo)
+            columnas = lector.fieldnames or []
+            faltantes = [columna for columna in COLUMNAS_IMPORTACION[tipo] if columna not in columnas]
+            if faltantes:
+                print(f"Error: al archivo le faltan las columnas {', '.join(faltantes)}")
+                return False
+            filas = list(lector)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"Error al leer {ruta_csv}: {e}")
+        return False
+
+    gestores, _ = cargar_gestores()
+    if tipo == 'pacientes':
+        importados, errores = gestores['pacientes'].importar_pacientes(filas)
+    else:
+        importados, errores = gestores['medicos'].importar_medicos(
+            filas, gestores['especialidades'].listar_especialidades())
+
+    # El proceso termina enseguida, así que el punto de control se escribe aquí y no en segundo plano
+    if importados:
+        obtener_diario().compactar()
+
+    print(f"{len(importados)} {tipo} importados, {len(errores)} filas rechazadas")
+    if errores:
+        try:
+            with open(ruta_errores, 'w', encoding='utf-8', newline='') as archivo:
+                escritor = csv.writer(archivo)
+                escritor.writerow(['fila', *columnas, 'error'])
+                for numero, mensaje in errores:
+                    fila = filas[numero]
+                    escritor.writerow([numero + 1, *(fila.get(columna) for columna in columnas), mensaje])
+            print(f"Detalle de las filas rechazadas: {ruta_errores}")
+        except OSError as e:
+            print(f"Error al guardar el informe de errores: {e}")
+    return True
@@ -0,0 +1,629 @@
+import asyncio
+import json
+import re
+import signal
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs, unquote
+from controlador.cargador import cargar_gestores, informe_tiempos
+from controlador.gestor_estadisticas import GestorEstadisticas
+from utils.persistencia import TrabajadorPersistencia
+from utils.eventos import BusEventos
+from utils.instrumentacion import resumen
+
+# Tamaño máximo del cuerpo de una solicitud, en bytes
+TAMANO_MAXIMO_CUERPO = 1024 * 1024
+# Segundos que se mantiene abierta una conexión sin recibir solicitudes
+TIEMPO_ESPERA_S = 30
+# Cada cuántos segundos se revisan los errores de las escrituras en segundo plano y los cambios
+# guardados por otros procesos
+INTERVALO_PERSISTENCIA_S = 1
+# Número de elementos por página si la solicitud no indica `limite`
+LIMITE_PREDETERMINADO = 50
+
+
+class ErrorApi(Exception):
+    """
+    Error que se devuelve al cliente con un código HTTP y un mensaje.
+
+        Attributes:
+            estado (int): Código de estado HTTP.
+            mensaje (str): Descripción del error.
+    """
+
+    def __init__(self, estado: int, mensaje: str):
+        """
+        Inicializa el error.
+
+            Args:
+                estado (int): Código de estado HTTP.
+                mensaje (str): Descripción del error.
+        """
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+def paciente_a_dict(paciente) -> dict:
+    """
+    Convierte un Paciente en un diccionario serializable a JSON.
+    """
+    return {
+        'id_paciente': paciente.id_paciente,
+        'nombre': paciente.nombre,
+        'apellido': paciente.apellido,
+        'fecha_nacimiento': paciente.fecha_nacimiento,
+        'telefono': paciente.telefono,
+    }
+
+def especialidad_a_dict(especialidad) -> dict:
+    """
+    Convierte una Especialidad en un diccionario serializable a JSON.
+    """
+    return {'nombre': especialidad.nombre, 'descripcion': especialidad.descripcion}
+
+def medico_a_dict(medico) -> dict:
+    """
+    Convierte un Medico en un diccionario serializable a JSON.
+    """
+    return {
+        'id_medico': medico.id_medico,
+        'nombre': medico.nombre,
+        'apellido': medico.apellido,
+        'fecha_nacimiento': medico.fecha_nacimiento,
+        'telefono': medico.telefono,
+        'especialidad': especialidad_a_dict(medico.especialidad),
+    }
+
+def cita_a_dict(cita) -> dict:
+    """
+    Convierte una Cita en un diccionario serializable a JSON (con el nombre del paciente y del médico).
+    """
+    return {
+        'id_cita': cita.id_cita,
+        'fecha': cita.fecha,
+        'hora': cita.hora,
+        'estado': cita.estado,
+        'id_paciente': cita.paciente.id_paciente,
+        'paciente': cita.paciente.get_nombre_completo(),
+        'id_medico': cita.medico.id_medico,
+        'medico': cita.medico.get_nombre_completo(),
+        'especialidad': cita.medico.especialidad.nombre,
+    }
+
+def diagnostico_a_dict(diagnostico) -> dict:
+    """
+    Convierte un Diagnostico en un diccionario serializable a JSON.
+    """
+    return {
+        'id_diagnostico': diagnostico.id_diagnostico,
+        'id_cita': diagnostico.cita.id_cita,
+        'descripcion': diagnostico.descripcion,
+        'tratamiento': diagnostico.tratamiento,
+        'observaciones': diagnostico.observaciones,
+    }
+
+def pagina_a_dict(pagina, convertir) -> dict:
+    """
+    Convierte una Pagina en un diccionario serializable a JSON.
+
+        Args:
+            pagina (Pagina): Página de resultados.
+            convertir (callable): Función que convierte cada elemento en diccionario.
+    """
+    return {
+        'elementos': [convertir(elemento) for elemento in pagina.elementos],
+        'total': pagina.total,
+        'siguiente_cursor': pagina.siguiente_cursor,
+    }
+
+
+class ServidorApi:
+    """
+    Servidor HTTP/JSON sin interfaz gráfica sobre los gestores del sistema.
+
+    Todos los gestores viven en un único proceso, de modo que varios puestos de recepción comparten
+    los mismos datos en memoria. Las solicitudes se atienden en un solo hilo con asyncio: las
+    lecturas se responden en cuanto llegan, y las escrituras se encolan y las aplica una única tarea,
+    una tras otra, en el orden en que llegaron. El guardado en disco se hace en segundo plano con
+    un TrabajadorPersistencia.
+
+        Attributes:
+            host (str): Dirección en la que se escucha.
+            puerto (int): Puerto en el que se escucha.
+            gestores (dict): Nombre -> gestor ('pacientes', 'medicos', 'especialidades', 'citas', 'diagnosticos').
+            _cola_escrituras (asyncio.Queue): Escrituras pendientes (futuro, función, argumentos).
+            _rutas (list): Tuplas (método, patrón, manejador, es_escritura).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 8080):
+        """
+        Inicializa el servidor y carga los datos.
+
+            Args:
+                host (str): Dirección en la que se escucha.
+                puerto (int): Puerto en el que se escucha.
+        """
+        self.host = host
+        self.puerto = puerto
+        self.trabajador_io = TrabajadorPersistencia()
+        self.bus_eventos = BusEventos()
+        self.gestores, tiempos = cargar_gestores()
+        for gestor in self.gestores.values():
+            gestor.trabajador_io = self.trabajador_io
+            gestor.bus_eventos = self.bus_eventos
+        print(f"Datos cargados:\n{informe_tiempos(tiempos)}")
+        self.gestor_estadisticas = GestorEstadisticas(self.bus_eventos)
+        self._cola_escrituras = None
+
+        self._rutas = [
+            ("GET", r"/pacientes", self.listar_pacientes, False),
+            ("GET", r"/pacientes/buscar", self.buscar_pacientes, False),
+            ("GET", r"/pacientes/(?P<id_paciente>[^/]+)", self.obtener_paciente, False),
+            ("POST", r"/pacientes", self.agregar_paciente, True),
+            ("GET", r"/medicos", self.listar_medicos, False),
+            ("GET", r"/medicos/(?P<id_medico>[^/]+)", self.obtener_medico, False),
+            ("POST", r"/medicos", self.agregar_medico, True),
+            ("GET", r"/especialidades", self.listar_especialidades, False),
+            ("GET", r"/citas", self.listar_citas, False),
+            ("GET", r"/citas/(?P<id_cita>[^/]+)", self.obtener_cita, False),
+            ("POST", r"/citas", self.agendar_cita, True),
+            ("POST", r"/citas/(?P<id_cita>[^/]+)/cancelar", self.cancelar_cita, True),
+            ("POST", r"/citas/(?P<id_cita>[^/]+)/reagendar", self.reagendar_cita, True),
+            ("GET", r"/diagnosticos", self.listar_diagnosticos, False),
+            ("GET", r"/diagnosticos/cita/(?P<id_cita>[^/]+)", self.obtener_diagnostico_por_cita, False),
+            ("POST", r"/diagnosticos", self.registrar_diagnostico, True),
+            ("GET", r"/estadisticas", self.obtener_estadisticas, False),
+            ("GET", r"/rendimiento", self.obtener_rendimiento, False),
+        ]
+        self._rutas = [(metodo, re.compile(f"^{patron}$"), manejador, escritura)
+                       for metodo, patron, manejador, escritura in self._rutas]
+
+    def ejecutar(self):
+        """
+        Inicia el servidor y atiende solicitudes hasta que se interrumpa (Ctrl+C).
+
+        Al terminar (Ctrl+C o SIGTERM), espera a que se guarden los cambios pendientes.
+        """
+        try:
+            asyncio.run(self.iniciar())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        finally:
+            self.trabajador_io.detener()
+            for error in self.trabajador_io.procesar_resultados():
+                print(f"No se pudieron guardar los cambios: {error}")
+
+    async def iniciar(self):
+        """
+        Abre el puerto y atiende conexiones indefinidamente.
+        """
+        self._cola_escrituras = asyncio.Queue()
+        tareas = [
+            asyncio.create_task(self._procesar_escrituras()),
+            asyncio.create_task(self._revisar_persistencia()),
+        ]
+        servidor = await asyncio.start_server(self._atender_conexion, self.host, self.puerto)
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, servidor.close)
+        except NotImplementedError:
+            # En Windows no hay manejadores de señales en el bucle de eventos
+            pass
+        print(f"API disponible en http://{self.host}:{self.puerto}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            for tarea in tareas:
+                tarea.cancel()
+
+    async def _procesar_escrituras(self):
+        """
+        Aplica las escrituras encoladas de una en una, en el orden en que llegaron.
+        """
+        while True:
+            futuro, funcion, args = await self._cola_escrituras.get()
+            try:
+                resultado = funcion(*args)
+            except Exception as e:
+                if not futuro.cancelled():
+                    futuro.set_exception(e)
+            else:
+                if not futuro.cancelled():
+                    futuro.set_result(resultado)
+
+    async def _revisar_persistencia(self):
+        """
+        Informa periódicamente los errores de las escrituras a disco en segundo plano y, cuando no hay
+        escrituras propias pendientes, aplica los cambios que otros procesos guardaron en los archivos.
+        """
+        while True:
+            await asyncio.sleep(INTERVALO_PERSISTENCIA_S)
+            # Se consulta antes de procesar los resultados para no tomar una escritura propia como ajena
+            sin_pendientes = not self.trabajador_io.pendientes() and self._cola_escrituras.empty()
+            for error in self.trabajador_io.procesar_resultados():
+                print(f"No se pudieron guardar los cambios: {error}")
+            if sin_pendientes:
+                for gestor in self.gestores.values():
+                    try:
+                        gestor.sincronizar()
+                    except Exception as e:
+                        print(f"Error al sincronizar {gestor.nombre_datos}: {e}")
+
+    async def _atender_conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """
+        Atiende las solicitudes de una conexión hasta que el cliente la cierre o quede inactiva.
+        """
+        try:
+            while True:
+                try:
+                    solicitud = await asyncio.wait_for(self._leer_solicitud(lector), TIEMPO_ESPERA_S)
+                except ErrorApi as e:
+                    self._responder(escritor, e.estado, {'error': e.mensaje}, False)
+                    break
+                except ValueError:
+                    # Por ejemplo, una línea más larga que el límite del lector
+                    self._responder(escritor, 400, {'error': "Solicitud no válida"}, False)
+                    break
+                if solicitud is None:
+                    break
+
+                metodo, ruta, consulta, cuerpo, mantener = solicitud
+                estado, datos = await self._despachar(metodo, ruta, consulta, cuerpo)
+                self._responder(escritor, estado, datos, mantener)
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _leer_solicitud(lector: asyncio.StreamReader):
+        """
+        Lee una solicitud HTTP completa.
+
+            Returns:
+                tuple | None: (método, ruta, parámetros de consulta, cuerpo JSON, mantener conexión),
+                              o None si el cliente cerró la conexión.
+
+            Raises:
+                ErrorApi: Si la solicitud no es válida.
+        """
+        linea = await lector.readline()
+        if not linea:
+            return None
+        try:
+            metodo, objetivo, version = linea.decode('latin-1').split()
+        except ValueError:
+            raise ErrorApi(400, "Línea de solicitud no válida")
+
+        encabezados = {}
+        while True:
+            linea = await lector.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            nombre, _, valor = linea.decode('latin-1').partition(":")
+            encabezados[nombre.strip().lower()] = valor.strip()
+
+        cuerpo = None
+        try:
+            longitud = int(encabezados.get('content-length') or 0)
+        except ValueError:
+            raise ErrorApi(400, "Content-Length no válido")
+        if longitud < 0:
+            raise ErrorApi(400, "Content-Length no válido")
+        if longitud > TAMANO_MAXIMO_CUERPO:
+            raise ErrorApi(413, "El cuerpo de la solicitud es demasiado grande")
+        if longitud:
+            datos = await lector.readexactly(longitud)
+            try:
+                cuerpo = json.loads(datos)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ErrorApi(400, "El cuerpo de la solicitud no es JSON válido")
+
+        conexion = encabezados.get('connection', '').lower()
+        mantener = conexion == 'keep-alive' if version == 'HTTP/1.0' else conexion != 'close'
+
+        partes = urlsplit(objetivo)
+        consulta = {clave: valores[-1] for clave, valores in parse_qs(partes.query).items()}
+        return metodo.upper(), unquote(partes.path).rstrip('/') or '/', consulta, cuerpo, mantener
+
+    async def _despachar(self, metodo: str, ruta: str, consulta: dict, cuerpo) -> tuple:
+        """
+        Busca el manejador de la ruta y lo ejecuta (las escrituras, a través de la cola).
+
+            Returns:
+                tuple: (código de estado HTTP, datos de la respuesta).
+        """
+        ruta_encontrada = False
+        for metodo_ruta, patron, manejador, escritura in self._rutas:
+            coincidencia = patron.match(ruta)
+            if not coincidencia:
+                continue
+            ruta_encontrada = True
+            if metodo_ruta != metodo:
+                continue
+
+            try:
+                argumentos = (coincidencia.groupdict(), consulta, cuerpo or {})
+                if escritura:
+                    futuro = asyncio.get_running_loop().create_future()
+                    await self._cola_escrituras.put((futuro, manejador, argumentos))
+                    return await futuro
+                return manejador(*argumentos)
+            except ErrorApi as e:
+                return e.estado, {'error': e.mensaje}
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            except Exception as e:
+                print(f"Error al atender {metodo} {ruta}: {e}")
+                return 500, {'error': "Error interno del servidor"}
+
+        if ruta_encontrada:
+            return 405, {'error': f"Método {metodo} no permitido en {ruta}"}
+        return 404, {'error': f"Ruta no encontrada: {ruta}"}
+
+    @staticmethod
+    def _responder(escritor: asyncio.StreamWriter, estado: int, datos, mantener: bool):
+        """
+        Escribe una respuesta HTTP con cuerpo JSON.
+        """
+        contenido = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        encabezados = (
+            f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(contenido)}\r\n"
+            f"Connection: {'keep-alive' if mantener else 'close'}\r\n"
+            "\r\n"
+        )
+        escritor.write(encabezados.encode('latin-1') + contenido)
+
+    @staticmethod
+    def _entero(consulta: dict, nombre: str, predeterminado: int) -> int:
+        """
+        Lee un parámetro entero de la consulta.
+
+            Raises:
+                ErrorApi: Si el parámetro no es un número entero.
+        """
+        try:
+            return int(consulta.get(nombre, predeterminado))
+        except ValueError:
+            raise ErrorApi(400, f"El parámetro '{nombre}' debe ser un número entero")
+
+    @staticmethod
+    def _campos(cuerpo: dict, *nombres) -> list:
+        """
+        Obtiene campos obligatorios del cuerpo de la solicitud.
+
+            Raises:
+                ErrorApi: Si falta alguno de los campos.
+        """
+        faltantes = [nombre for nombre in nombres if nombre not in cuerpo]
+        if faltantes:
+            raise ErrorApi(400, f"Faltan campos: {', '.join(faltantes)}")
+        return [cuerpo[nombre] for nombre in nombres]
+
+    def _paginar(self, consulta: dict, listar, convertir) -> tuple:
+        """
+        Responde con una página de un método `listar_*_pagina` según los parámetros de la consulta.
+        """
+        argumentos = {
+            'offset': self._entero(consulta, 'offset', 0),
+            'limite': self._entero(consulta, 'limite', LIMITE_PREDETERMINADO),
+            'cursor': consulta.get('cursor'),
+        }
+        if 'orden' in consulta:
+            argumentos['orden'] = consulta['orden']
+        return 200, pagina_a_dict(listar(**argumentos), convertir)
+
+    # Pacientes
+
+    def listar_pacientes(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /pacientes?offset=&limite=&orden=&cursor=
+        """
+        return self._paginar(consulta, self.gestores['pacientes'].listar_pacientes_pagina, paciente_a_dict)
+
+    def buscar_pacientes(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /pacientes/buscar?q=&limite= (por prefijo de ID, nombre, apellido o teléfono)
+        """
+        pacientes = self.gestores['pacientes'].buscar_por_prefijo(consulta.get('q', ''),
+                                                                  self._entero(consulta, 'limite', 20))
+        return 200, [paciente_a_dict(paciente) for paciente in pacientes]
+
+    def obtener_paciente(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /pacientes/{id_paciente}
+        """
+        paciente = self.gestores['pacientes'].buscar_paciente(parametros['id_paciente'])
+        if not paciente:
+            raise ErrorApi(404, f"No existe el paciente {parametros['id_paciente']}")
+        return 200, paciente_a_dict(paciente)
+
+    def agregar_paciente(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        POST /pacientes {nombre, apellido, fecha_nacimiento, telefono}
+        """
+        nombre, apellido, fecha_nacimiento, telefono = self._campos(
+            cuerpo, 'nombre', 'apellido', 'fecha_nacimiento', 'telefono')
+        gestor = self.gestores['pacientes']
+        if not gestor.agregar_paciente({'nombre': nombre, 'apellido': apellido,
+                                        'fecha_nacimiento': fecha_nacimiento, 'telefono': telefono}):
+            raise ErrorApi(400, "Datos del paciente no válidos")
+        return 201, paciente_a_dict(gestor.listar_pacientes()[-1])
+
+    # Médicos y especialidades
+
+    def listar_medicos(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /medicos?offset=&limite=&orden=&cursor=
+        """
+        return self._paginar(consulta, self.gestores['medicos'].listar_medicos_pagina, medico_a_dict)
+
+    def obtener_medico(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /medicos/{id_medico}
+        """
+        medico = self.gestores['medicos'].buscar_medico(parametros['id_medico'])
+        if not medico:
+            raise ErrorApi(404, f"No existe el médico {parametros['id_medico']}")
+        return 200, medico_a_dict(medico)
+
+    def agregar_medico(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        POST /medicos {nombre, apellido, fecha_nacimiento, telefono, especialidad}
+        """
+        nombre, apellido, fecha_nacimiento, telefono, nombre_especialidad = self._campos(
+            cuerpo, 'nombre', 'apellido', 'fecha_nacimiento', 'telefono', 'especialidad')
+        especialidad = self.gestores['especialidades'].buscar_especialidad(nombre_especialidad)
+        if not especialidad:
+            raise ErrorApi(400, f"No existe la especialidad {nombre_especialidad}")
+        gestor = self.gestores['medicos']
+        if not gestor.agregar_medico({'nombre': nombre, 'apellido': apellido, 'fecha_nacimiento': fecha_nacimiento,
+                                      'telefono': telefono, 'especialidad': especialidad}):
+            raise ErrorApi(400, "Datos del médico no válidos")
+        return 201, medico_a_dict(gestor.listar_medicos()[-1])
+
+    def listar_especialidades(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /especialidades?offset=&limite=&orden=&cursor=
+        """
+        return self._paginar(consulta, self.gestores['especialidades'].listar_especialidades_pagina,
+                             especialidad_a_dict)
+
+    # Citas
+
+    def listar_citas(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /citas?paciente=&medico=&especialidad=&estado=&desde=&hasta=&hora_desde=&hora_hasta=
+                   &historial=1&orden=&offset=&limite=&cursor=
+        """
+        citas = (self.gestores['citas'].consulta()
+                 .paciente(consulta.get('paciente'))
+                 .medico(consulta.get('medico'))
+                 .especialidad(consulta.get('especialidad'))
+                 .estado(consulta.get('estado'))
+                 .fechas(consulta.get('desde'), consulta.get('hasta'))
+                 .horas(consulta.get('hora_desde'), consulta.get('hora_hasta')))
+        if consulta.get('historial') == '1':
+            citas.con_historial()
+        return self._paginar(consulta, citas.pagina, cita_a_dict)
+
+    def _buscar_cita(self, id_cita: str):
+        """
+        Busca una cita o responde 404 si no existe.
+        """
+        cita = self.gestores['citas'].buscar_cita(id_cita)
+        if not cita:
+            raise ErrorApi(404, f"No existe la cita {id_cita}")
+        return cita
+
+    def obtener_cita(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /citas/{id_cita}
+        """
+        return 200, cita_a_dict(self._buscar_cita(parametros['id_cita']))
+
+    def agendar_cita(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        POST /citas {fecha, hora, id_paciente, id_medico}
+        """
+        fecha, hora, id_paciente, id_medico = self._campos(cuerpo, 'fecha', 'hora', 'id_paciente', 'id_medico')
+        paciente = self.gestores['pacientes'].buscar_paciente(id_paciente)
+        medico = self.gestores['medicos'].buscar_medico(id_medico)
+        if not paciente or not medico:
+            raise ErrorApi(404, "Paciente o médico no encontrado")
+        cita = self.gestores['citas'].agendar_cita(fecha, hora, paciente, medico)
+        if cita is None:
+            raise ErrorApi(400, "Fecha u hora no válidas")
+        return 201, cita_a_dict(cita)
+
+    def cancelar_cita(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        POST /citas/{id_cita}/cancelar
+        """
+        cita = self._buscar_cita(parametros['id_cita'])
+        if cita.estado != "pendiente":
+            raise ErrorApi(409, f"La cita {cita.id_cita} no está pendiente")
+        if not self.gestores['citas'].cancelar_cita(cita.id_cita):
+            raise ErrorApi(500, "No se pudo cancelar la cita")
+        return 200, cita_a_dict(cita)
+
+    def reagendar_cita(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        POST /citas/{id_cita}/reagendar {fecha, hora}
+        """
+        fecha, hora = self._campos(cuerpo, 'fecha', 'hora')
+        cita = self._buscar_cita(parametros['id_cita'])
+        if cita.estado != "pendiente":
+            raise ErrorApi(409, f"La cita {cita.id_cita} no está pendiente")
+        if not self.gestores['citas'].reagendar_cita(cita.id_cita, fecha, hora):
+            raise ErrorApi(400, "Fecha u hora no válidas, o iguales a las actuales")
+        return 200, cita_a_dict(cita)
+
+    # Diagnósticos
+
+    def listar_diagnosticos(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /diagnosticos?q=&limite= (búsqueda por texto) o GET /diagnosticos?offset=&limite=&orden=&cursor=
+        """
+        gestor = self.gestores['diagnosticos']
+        if 'q' in consulta:
+            diagnosticos = gestor.buscar_diagnosticos(consulta['q'],
+                                                      self._entero(consulta, 'limite', LIMITE_PREDETERMINADO))
+            return 200, [diagnostico_a_dict(diagnostico) for diagnostico in diagnosticos]
+        return self._paginar(consulta, gestor.listar_diagnosticos_pagina, diagnostico_a_dict)
+
+    def obtener_diagnostico_por_cita(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /diagnosticos/cita/{id_cita}
+        """
+        diagnostico = self.gestores['diagnosticos'].obtener_diagnostico_por_cita(parametros['id_cita'])
+        if not diagnostico:
+            raise ErrorApi(404, f"La cita {parametros['id_cita']} no tiene diagnóstico")
+        return 200, diagnostico_a_dict(diagnostico)
+
+    def registrar_diagnostico(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        POST /diagnosticos {id_cita, descripcion, tratamiento, observaciones}
+        """
+        id_cita, descripcion, tratamiento = self._campos(cuerpo, 'id_cita', 'descripcion', 'tratamiento')
+        cita = self._buscar_cita(id_cita)
+        if cita.estado != "pendiente":
+            raise ErrorApi(409, f"La cita {cita.id_cita} no está pendiente")
+        gestor = self.gestores['diagnosticos']
+        diagnostico = gestor.registrar_diagnostico(descripcion, tratamiento, cuerpo.get('observaciones', ''), cita)
+        if not diagnostico:
+            raise ErrorApi(500, "No se pudo registrar el diagnóstico")
+        return 201, diagnostico_a_dict(diagnostico)
+
+    # Estadísticas
+
+    def obtener_estadisticas(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /estadisticas
+        """
+        estadisticas = self.gestor_estadisticas
+        gestor_citas = self.gestores['citas']
+        medico, citas_medico = estadisticas.medico_mas_solicitado(self.gestores['medicos'], gestor_citas)
+        paciente, citas_paciente = estadisticas.paciente_con_mas_citas(self.gestores['pacientes'], gestor_citas)
+        return 200, {
+            'consultas_por_especialidad': estadisticas.calcular_consultas_por_especialidad(
+                self.gestores['medicos'], gestor_citas),
+            'medico_mas_solicitado': {'medico': medico_a_dict(medico) if medico else None, 'citas': citas_medico},
+            'paciente_con_mas_citas': {'paciente': paciente_a_dict(paciente) if paciente else None,
+                                       'citas': citas_paciente},
+            'promedio_atencion_mensual': estadisticas.promedio_atencion_mensual(gestor_citas),
+        }
+
+    def obtener_rendimiento(self, parametros: dict, consulta: dict, cuerpo: dict) -> tuple:
+        """
+        GET /rendimiento
+
+        Devuelve las mediciones de duración y de bytes leídos y escritos (ver utils.instrumentacion);
+        están vacías si el servidor no se inició con --instrumentar.
+        """
+        return 200, resumen()